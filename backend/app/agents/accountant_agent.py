@@ -1,6 +1,7 @@
 """Accountant agent for financial analysis."""
 from typing import List, Dict, Any
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from openai import AsyncOpenAI
 from loguru import logger
 
@@ -35,7 +36,7 @@ Tu ne dois PAS:
 - Inventer des informations qui ne sont pas dans les documents
 """
     
-    def __init__(self, db: Session, user_id: int):
+    def __init__(self, db: AsyncSession, user_id: int):
         self.db = db
         self.user_id = user_id
         self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
@@ -53,7 +54,7 @@ Tu ne dois PAS:
         """
         try:
             # Get conversation history
-            messages = self._get_conversation_history(conversation_id)
+            messages = await self._get_conversation_history(conversation_id)
             
             # Search relevant documents using RAG
             relevant_docs = await self.rag_service.search_documents(
@@ -63,7 +64,7 @@ Tu ne dois PAS:
             )
             
             # Get user's transactions for context
-            recent_transactions = self._get_recent_transactions(limit=10)
+            recent_transactions = await self._get_recent_transactions(limit=10)
             
             # Build context
             context = self._build_context(relevant_docs, recent_transactions)
@@ -99,7 +100,7 @@ Tu ne dois PAS:
             logger.error(f"Error in accountant agent: {e}")
             return "Désolé, j'ai rencontré une erreur lors du traitement de votre message. Veuillez réessayer."
     
-    def _get_conversation_history(self, conversation_id: int) -> List[Dict[str, str]]:
+    async def _get_conversation_history(self, conversation_id: int) -> List[Dict[str, str]]:
         """Get conversation history for context.
         
         Args:
@@ -108,25 +109,23 @@ Tu ne dois PAS:
         Returns:
             List of messages in OpenAI format
         """
-        from app.models.conversation import Conversation
-        
-        conversation = self.db.query(Conversation).filter(
-            Conversation.id == conversation_id
-        ).first()
-        
-        if not conversation:
-            return []
+        result = await self.db.execute(
+            select(Message.role, Message.content)
+            .where(Message.conversation_id == conversation_id)
+            .order_by(Message.id)
+        )
+        rows = result.all()
         
         messages = []
-        for msg in conversation.messages[:-1]:  # Exclude current message
+        for role, content in rows[:-1]:  # Exclude current message
             messages.append({
-                "role": msg.role.value,
-                "content": msg.content
+                "role": role.value,
+                "content": content
             })
         
         return messages
     
-    def _get_recent_transactions(self, limit: int = 10) -> List[Transaction]:
+    async def _get_recent_transactions(self, limit: int = 10) -> List[Transaction]:
         """Get user's recent transactions.
         
         Args:
@@ -135,13 +134,14 @@ Tu ne dois PAS:
         Returns:
             List of transactions
         """
-        transactions = self.db.query(Transaction)\
-            .filter(Transaction.user_id == self.user_id)\
-            .order_by(Transaction.transaction_date.desc())\
-            .limit(limit)\
-            .all()
+        result = await self.db.scalars(
+            select(Transaction)
+            .where(Transaction.user_id == self.user_id)
+            .order_by(Transaction.transaction_date.desc())
+            .limit(limit)
+        )
         
-        return transactions
+        return list(result)
     
     def _build_context(
         self,
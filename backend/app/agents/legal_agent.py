@@ -1,11 +1,13 @@
 """Legal agent specialized in Swiss law."""
 from typing import List, Dict, Any
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from openai import AsyncOpenAI
 from loguru import logger
 
 from app.config import settings
 from app.services.rag_service import RAGService
+from app.models.conversation import Message
 
 
 class LegalAgent:
@@ -37,7 +39,7 @@ Tu ne dois PAS:
 Note importante: Tu donnes des informations générales, pas des conseils juridiques personnalisés. Pour des situations complexes, recommande toujours de consulter un avocat.
 """
     
-    def __init__(self, db: Session, user_id: int):
+    def __init__(self, db: AsyncSession, user_id: int):
         self.db = db
         self.user_id = user_id
         self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
@@ -55,7 +57,7 @@ Note importante: Tu donnes des informations générales, pas des conseils juridi
         """
         try:
             # Get conversation history
-            messages = self._get_conversation_history(conversation_id)
+            messages = await self._get_conversation_history(conversation_id)
             
             # Search relevant documents using RAG
             relevant_docs = await self.rag_service.search_documents(
@@ -98,7 +100,7 @@ Note importante: Tu donnes des informations générales, pas des conseils juridi
             logger.error(f"Error in legal agent: {e}")
             return "Désolé, j'ai rencontré une erreur lors du traitement de votre message. Veuillez réessayer."
     
-    def _get_conversation_history(self, conversation_id: int) -> List[Dict[str, str]]:
+    async def _get_conversation_history(self, conversation_id: int) -> List[Dict[str, str]]:
         """Get conversation history for context.
         
         Args:
@@ -107,20 +109,18 @@ Note importante: Tu donnes des informations générales, pas des conseils juridi
         Returns:
             List of messages in OpenAI format
         """
-        from app.models.conversation import Conversation
-        
-        conversation = self.db.query(Conversation).filter(
-            Conversation.id == conversation_id
-        ).first()
-        
-        if not conversation:
-            return []
+        result = await self.db.execute(
+            select(Message.role, Message.content)
+            .where(Message.conversation_id == conversation_id)
+            .order_by(Message.id)
+        )
+        rows = result.all()
         
         messages = []
-        for msg in conversation.messages[:-1]:  # Exclude current message
+        for role, content in rows[:-1]:  # Exclude current message
             messages.append({
-                "role": msg.role.value,
-                "content": msg.content
+                "role": role.value,
+                "content": content
             })
         
         return messages
@@ -1,9 +1,10 @@
 """Chat API endpoints."""
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
 
-from app.models.database import get_db
+from app.models.database import get_async_db
 from app.models.user import User
 from app.models.conversation import Conversation, Message, AgentType, MessageRole
 from app.schemas.chat import ChatRequest, ChatResponse
@@ -18,19 +19,20 @@ router = APIRouter()
 async def chat_with_accountant(
     request: ChatRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Chat with the accountant agent."""
     try:
         # Get or create conversation
         if request.conversation_id:
-            conversation = db.query(Conversation)\
-                .filter(
+            conversation = await db.scalar(
+                select(Conversation)
+                .where(
                     Conversation.id == request.conversation_id,
                     Conversation.user_id == current_user.id,
                     Conversation.agent_type == AgentType.ACCOUNTANT
-                )\
-                .first()
+                )
+            )
             if not conversation:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -43,8 +45,7 @@ async def chat_with_accountant(
                 title=request.message[:50]  # First 50 chars as title
             )
             db.add(conversation)
-            db.commit()
-            db.refresh(conversation)
+            await db.flush()  # Assigns conversation.id
         
         # Save user message
         user_message = Message(
@@ -53,7 +54,7 @@ async def chat_with_accountant(
             content=request.message
         )
         db.add(user_message)
-        db.commit()
+        await db.commit()
         
         # Get agent response
         agent = AccountantAgent(db, current_user.id)
@@ -66,7 +67,7 @@ async def chat_with_accountant(
             content=response
         )
         db.add(agent_message)
-        db.commit()
+        await db.commit()
         
         return ChatResponse(
             conversation_id=conversation.id,
@@ -86,19 +87,20 @@ async def chat_with_accountant(
 async def chat_with_legal(
     request: ChatRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Chat with the legal agent."""
     try:
         # Get or create conversation
         if request.conversation_id:
-            conversation = db.query(Conversation)\
-                .filter(
+            conversation = await db.scalar(
+                select(Conversation)
+                .where(
                     Conversation.id == request.conversation_id,
                     Conversation.user_id == current_user.id,
                     Conversation.agent_type == AgentType.LEGAL
-                )\
-                .first()
+                )
+            )
             if not conversation:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -111,8 +113,7 @@ async def chat_with_legal(
                 title=request.message[:50]
             )
             db.add(conversation)
-            db.commit()
-            db.refresh(conversation)
+            await db.flush()  # Assigns conversation.id
         
         # Save user message
         user_message = Message(
@@ -121,7 +122,7 @@ async def chat_with_legal(
             content=request.message
         )
         db.add(user_message)
-        db.commit()
+        await db.commit()
         
         # Get agent response
         agent = LegalAgent(db, current_user.id)
@@ -134,7 +135,7 @@ async def chat_with_legal(
             content=response
         )
         db.add(agent_message)
-        db.commit()
+        await db.commit()
         
         return ChatResponse(
             conversation_id=conversation.id,
@@ -1,18 +1,38 @@
 """Dashboard API endpoints."""
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import text
 from decimal import Decimal
 
 from app.models.database import get_db
 from app.models.user import User
-from app.models.document import Document
-from app.models.transaction import Transaction
 from app.schemas.dashboard import DashboardStats, CategorySpending
 from app.api.auth import get_current_user
 
 router = APIRouter()
 
+# Document count from user_document_stats and spending aggregated per
+# category (idx_transactions_user_category), in one round trip
+DASHBOARD_SQL = text("""
+    WITH spending AS (
+        SELECT category, sum(amount) AS amount, count(*) AS count
+        FROM transactions
+        WHERE user_id = :user_id
+        GROUP BY category
+    )
+    SELECT
+        coalesce((SELECT total_documents FROM user_document_stats WHERE user_id = :user_id), 0)
+            AS total_documents,
+        coalesce((SELECT sum(count) FROM spending), 0) AS total_transactions,
+        coalesce((SELECT sum(amount) FROM spending), 0) AS total_spending,
+        coalesce(
+            (SELECT json_agg(json_build_object('category', category, 'amount', amount, 'count', count)
+                             ORDER BY amount DESC)
+             FROM spending),
+            '[]'::json
+        ) AS spending_by_category
+""")
+
 
 @router.get("/", response_model=DashboardStats)
 def get_dashboard_stats(
@@ -20,47 +40,23 @@ def get_dashboard_stats(
     db: Session = Depends(get_db)
 ):
     """Get dashboard statistics for the user."""
-    # Count documents
-    total_documents = db.query(Document)\
-        .filter(Document.user_id == current_user.id)\
-        .count()
-    
-    # Count transactions
-    total_transactions = db.query(Transaction)\
-        .filter(Transaction.user_id == current_user.id)\
-        .count()
-    
-    # Calculate total spending
-    total_spending_result = db.query(func.sum(Transaction.amount))\
-        .filter(Transaction.user_id == current_user.id)\
-        .scalar()
-    total_spending = total_spending_result if total_spending_result else Decimal(0)
-    
-    # Group by category
-    category_stats = db.query(
-        Transaction.category,
-        func.sum(Transaction.amount).label('total'),
-        func.count(Transaction.id).label('count')
-    )\
-        .filter(Transaction.user_id == current_user.id)\
-        .group_by(Transaction.category)\
-        .all()
+    row = db.execute(DASHBOARD_SQL, {"user_id": current_user.id}).one()
+    total_transactions = int(row.total_transactions)
     
     spending_by_category = [
         CategorySpending(
-            category=stat.category or "Non catégorisé",
-            amount=stat.total,
-            count=stat.count
+            category=stat['category'] or "Non catégorisé",
+            amount=Decimal(str(stat['amount'])),
+            count=stat['count']
         )
-        for stat in category_stats
+        for stat in row.spending_by_category
     ]
     
     return DashboardStats(
-        total_documents=total_documents,
+        total_documents=row.total_documents,
         total_transactions=total_transactions,
-        total_spending=total_spending,
+        total_spending=row.total_spending,
         currency="CHF",
         spending_by_category=spending_by_category,
         recent_transactions_count=min(total_transactions, 10)
     )
-
@@ -1,43 +1,58 @@
 """Document API endpoints."""
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, BackgroundTasks, Query
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import AsyncIterator, Dict, List, Optional
 from datetime import datetime, timedelta, date
 from loguru import logger
+import asyncio
+import json
 import os
 from jose import JWTError, jwt
 
-from app.models.database import get_db
+from app.models.database import get_db, get_async_db, AsyncSessionLocal
 from app.models.user import User
-from app.models.document import Document, DocumentStatus, DocumentType
+from app.models.document import Document, DocumentStatus, DocumentType, document_summary_options
+from app.models.document_batch import DocumentBatch
 from app.schemas.document import (
-    DocumentResponse, DocumentUploadResponse, DocumentStatistics, 
+    DocumentResponse, DocumentSummary, DocumentText, DocumentUploadResponse, DocumentStatistics, 
     DocumentUpdate, FilingCabinetHierarchicalOverview, CategoryStats,
-    DocumentSearchResult
+    DocumentSearchResult, DocumentSearchHit,
+    DocumentBatchUploadResponse, DocumentBatchItem, DocumentBatchProgress, DocumentDuplicateFile
 )
 from app.api.auth import get_current_user
 from app.config import settings
-from app.services.document_service import DocumentService
-from app.services.embedding_service import EmbeddingService
-from app.services.document_analysis_service import DocumentAnalysisService
-from app.services.duplicate_detection_service import DuplicateDetectionService
-from app.services.pdf_conversion_service import PDFConversionService
+from app.services.document_service import DocumentService, FileTooLargeError
 from app.services.filing_cabinet_service import FilingCabinetService
-from app.services.image_preprocessing_service import ImagePreprocessingService
+from app.services.job_queue_service import JobQueueService
+from app.services.document_processing_service import DocumentProcessingService
+from app.services.document_search_service import DocumentSearchService
+from app.services.duplicate_detection_service import DuplicateDetectionService
+from app.services.document_stats_service import DocumentStatsService
+from app.services.progress_service import progress_broker, progress_event, stage_progress, is_final
+from app.services.pagination_service import (
+    PaginationService, KeysetOrder, NEXT_CURSOR_HEADER,
+    NEWEST_FIRST, MOST_IMPORTANT_FIRST, CLOSEST_DEADLINE_FIRST
+)
 from app.config import settings
 
 router = APIRouter()
 
+# Header of a 409 response to an upload, carrying the ID of the document with the same content
+DUPLICATE_OF_HEADER = "X-Duplicate-Of"
+
 
 def get_user_from_token_or_header(
-    token: Optional[str] = Query(None),
-    current_user: Optional[User] = Depends(get_current_user)
+    token: Optional[str],
+    db: Session,
+    current_user: Optional[User] = None
 ) -> User:
     """
     Get user from token in URL query parameter or from Authorization header.
     Used for endpoints that need to work with direct URLs (downloads, previews).
+    The user is loaded with the request's session.
     """
     # If we have a user from header auth, use it
     if current_user:
@@ -64,228 +79,90 @@ def get_user_from_token_or_header(
             detail="Invalid authentication credentials"
         )
     
-    # Get user from database
-    from app.models.database import SessionLocal
-    db = SessionLocal()
-    try:
-        user = db.query(User).filter(User.id == int(user_id)).first()
-        if user is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found"
-            )
-        return user
-    finally:
-        db.close()
+    user = db.query(User).filter(User.id == int(user_id)).first()
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    return user
 
 
-async def process_document_async(
-    document_id: int,
+def new_uploaded_document(
+    user_id: int,
+    original_filename: str,
     file_path: str,
+    saved_filename: str,
+    file_size: int,
+    file_hash: str,
     mime_type: Optional[str],
-    db: Session
-):
-    """Process document in background with enhanced analysis and filing cabinet organization."""
-    try:
-        doc_service = DocumentService()
-        embedding_service = EmbeddingService()
-        analysis_service = DocumentAnalysisService()
-        duplicate_service = DuplicateDetectionService()
-        pdf_conversion_service = PDFConversionService()
-        filing_cabinet_service = FilingCabinetService()
-        preprocessing_service = ImagePreprocessingService()
-        
-        # Update status to processing
-        document = db.query(Document).filter(Document.id == document_id).first()
-        if not document:
-            logger.error(f"Document {document_id} not found")
-            return
-            
-        document.status = DocumentStatus.PROCESSING
-        db.commit()
-        
-        # Step 1: Calculate file hash for duplicate detection
-        file_hash = duplicate_service.calculate_file_hash(file_path)
-        if file_hash:
-            document.file_hash = file_hash
-            db.commit()
-        
-        # Step 2: Preprocess image (auto-crop, deskew, enhance) if it's an image
-        preprocessed_path = file_path
-        if mime_type and mime_type.startswith('image/'):
-            logger.info(f"Preprocessing image for document {document_id}")
-            import tempfile
-            with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as temp_preprocessed:
-                temp_preprocessed_path = temp_preprocessed.name
-            
-            success, preprocessed_path = preprocessing_service.preprocess_for_ocr(
-                file_path,
-                temp_preprocessed_path
-            )
-            
-            if success:
-                logger.info(f"✓ Image preprocessing successful for document {document_id}")
-            else:
-                logger.warning(f"Image preprocessing failed, using original")
-                preprocessed_path = file_path
-        
-        # Step 3: Perform complete document analysis (OCR + AI) on preprocessed image
-        logger.info(f"Starting intelligent analysis for document {document_id}")
-        analysis_result = await analysis_service.analyze_document(preprocessed_path, mime_type)
-        
-        # Step 4: Update document with analysis results
-        db_fields = analysis_service.prepare_database_fields(analysis_result)
-        
-        # Update all fields
-        for field, value in db_fields.items():
-            setattr(document, field, value)
-        
-        db.commit()
-        db.refresh(document)
-        
-        importance_str = f"{document.importance_score:.1f}" if document.importance_score else "N/A"
-        logger.info(f"Document {document_id} metadata updated: "
-                   f"type={document.document_type}, "
-                   f"importance={importance_str}")
-        
-        # Step 5: Determine storage year for filing cabinet
-        storage_year = filing_cabinet_service.determine_storage_year(
-            document.document_date,
-            document.created_at
-        )
-        document.storage_year = storage_year
-        db.commit()
-        logger.info(f"Document {document_id} storage year: {storage_year}")
-        
-        # Step 6: Convert to searchable PDF with OCR layer using preprocessed image
-        logger.info(f"Converting document {document_id} to searchable PDF")
-        import tempfile
-        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_ocr:
-            temp_ocr_path = temp_ocr.name
-        
-        try:
-            # Use preprocessed image for PDF creation (better quality)
-            success, ocr_pdf_path, error = await pdf_conversion_service.ensure_searchable_pdf(
-                preprocessed_path,
-                temp_ocr_path,
-                languages=['fra', 'deu', 'eng']
-            )
-            
-            if success:
-                logger.info(f"Successfully created searchable PDF for document {document_id}")
-                
-                # Step 7: Organize files in filing cabinet structure (3-level hierarchy)
-                # Use original file (not preprocessed) for storage, but preprocessed was used for OCR/PDF
-                category = analysis_result.get('metadata', {}).get('category', 'General')
-                organized_original_path, organized_ocr_path = await filing_cabinet_service.store_document(
-                    original_file_path=file_path,
-                    ocr_pdf_path=ocr_pdf_path,
-                    year=storage_year,
-                    document_type=document.document_type,
-                    original_filename=document.original_filename,
-                    category=category
-                )
-                
-                # Update category in database
-                document.category = category
-                
-                # Update paths in database
-                document.file_path = organized_original_path
-                document.ocr_pdf_path = organized_ocr_path
-                db.commit()
-                
-                logger.info(f"Document {document_id} organized in filing cabinet: "
-                          f"{storage_year}/{category}/{document.document_type.value}")
-                
-                # Extract text from searchable PDF for better RAG quality
-                extracted_text = pdf_conversion_service.extract_text_from_searchable_pdf(organized_ocr_path)
-                if extracted_text:
-                    document.extracted_text = extracted_text
-                    db.commit()
-                    logger.info(f"Extracted text from searchable PDF for document {document_id}")
-            else:
-                logger.warning(f"PDF conversion failed for document {document_id}: {error}")
-                # Continue with original file
-                extracted_text = analysis_result.get('extracted_text', '')
-        finally:
-            # Clean up temp files
-            if os.path.exists(temp_ocr_path):
-                os.remove(temp_ocr_path)
-            # Clean up preprocessed image if it was created
-            if preprocessed_path != file_path and os.path.exists(preprocessed_path):
-                os.remove(preprocessed_path)
-        
-        # Step 8: Generate chunks and embeddings for RAG
-        extracted_text = document.extracted_text or analysis_result.get('extracted_text', '')
-        if extracted_text:
-            chunks = doc_service.create_chunks(extracted_text)
-            await embedding_service.create_embeddings(document_id, chunks, db)
-            logger.info(f"Created {len(chunks)} embeddings for document {document_id}")
-        
-        # Step 9: Detect duplicates - BLOCK if exact duplicate found
-        try:
-            is_duplicate, original_id, similarity, method = await duplicate_service.detect_duplicate(
-                document_id=document_id,
-                file_path=document.file_path,
-                user_id=document.user_id,
-                db=db,
-                extracted_text=extracted_text,
-                metadata=analysis_result.get('metadata', {})
-            )
-            
-            if is_duplicate and similarity >= 0.95:  # Very high similarity = exact duplicate
-                # Delete the duplicate and keep only the original
-                logger.warning(f"🚫 EXACT DUPLICATE detected for document {document_id}: "
-                             f"original={original_id}, similarity={similarity:.2f}, method={method}")
-                logger.warning(f"🗑️ Rejecting duplicate and keeping original document {original_id}")
-                
-                # Delete files
-                filing_cabinet_service.delete_document_files(document)
-                
-                # Delete from database
-                db.delete(document)
-                db.commit()
-                
-                logger.info(f"✅ Duplicate document {document_id} removed, original {original_id} kept")
-                return  # Exit processing
-            elif is_duplicate:
-                # Mark as potential duplicate but keep it
-                document.is_duplicate = True
-                document.duplicate_of_id = original_id
-                document.similarity_score = similarity
-                db.commit()
-                logger.warning(f"⚠️ Potential duplicate detected for document {document_id}: "
-                             f"original={original_id}, similarity={similarity:.2f}, method={method}")
-            else:
-                logger.info(f"✅ No duplicate found for document {document_id}")
-        except Exception as e:
-            # Don't fail the whole process if duplicate detection fails
-            logger.error(f"Error in duplicate detection for document {document_id}: {e}")
-            # Rollback any failed transaction
-            db.rollback()
-            # Refresh document state
-            db.refresh(document)
-        
-        # Step 10: Mark as completed
-        document.status = DocumentStatus.COMPLETED
-        db.commit()
-        
-        category_str = document.category or 'General'
-        logger.info(f"✅ Document {document_id} processed successfully and filed in {storage_year}/{category_str}/{document.document_type.value}")
-        
-    except Exception as e:
-        logger.error(f"❌ Error processing document {document_id}: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
-        document = db.query(Document).filter(Document.id == document_id).first()
-        if document:
-            document.status = DocumentStatus.FAILED
-            db.commit()
+    document_type: DocumentType,
+    batch_id: Optional[int] = None
+) -> Document:
+    """Document record of a saved upload, pending processing."""
+    return Document(
+        filename=saved_filename,
+        original_filename=original_filename,
+        file_path=file_path,
+        file_size=file_size,
+        file_hash=file_hash,
+        mime_type=mime_type,
+        document_type=document_type,
+        status=DocumentStatus.PENDING,
+        user_id=user_id,
+        batch_id=batch_id
+    )
+
+
+def duplicate_upload(db: Session, user_id: int, file_hash: str, file_path: str) -> Optional[HTTPException]:
+    """
+    Check a saved upload against the user's documents by file hash.
+    
+    A byte-identical file is rejected before it is queued: its saved copy is
+    deleted and the 409 to raise is returned (None if the file is new).
+    """
+    original_id = DuplicateDetectionService().find_exact_duplicates(user_id, [file_hash], db).get(file_hash)
+    if original_id is None:
+        return None
+    
+    DocumentService().delete_file(file_path)
+    logger.info(f"Rejected upload of user {user_id}: same content as document {original_id}")
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="This file has already been uploaded",
+        headers={DUPLICATE_OF_HEADER: str(original_id)}
+    )
+
+
+def create_uploaded_document(
+    db: Session,
+    user_id: int,
+    original_filename: str,
+    file_path: str,
+    saved_filename: str,
+    file_size: int,
+    file_hash: str,
+    mime_type: Optional[str],
+    document_type: DocumentType
+) -> Document:
+    """
+    Create the document record of a saved upload and queue its processing.
+    The caller commits, so the document and its job are stored together.
+    """
+    document = new_uploaded_document(
+        user_id, original_filename, file_path, saved_filename,
+        file_size, file_hash, mime_type, document_type
+    )
+    db.add(document)
+    db.flush()
+    
+    # Queue processing in the same transaction; a worker picks it up
+    JobQueueService().enqueue(db, document.id, commit=False)
+    return document
 
 
 @router.post("/upload", response_model=DocumentUploadResponse)
 async def upload_document(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     document_type: DocumentType = DocumentType.OTHER,
     current_user: User = Depends(get_current_user),
@@ -299,64 +176,225 @@ async def upload_document(
             detail="No file provided"
         )
     
-    # Check file size
-    content = await file.read()
-    file_size = len(content)
+    # Save file in chunks, hashing it and checking its size on the way
+    doc_service = DocumentService()
     max_size = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
-    
-    if file_size > max_size:
+    try:
+        file_path, saved_filename, file_size, file_hash = await doc_service.save_upload(
+            file.filename, file, max_size
+        )
+    except FileTooLargeError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"File size exceeds maximum allowed size of {settings.MAX_UPLOAD_SIZE_MB}MB"
         )
     
-    # Save file
-    doc_service = DocumentService()
-    file_path, saved_filename = await doc_service.save_file(file.filename, content)
+    duplicate = duplicate_upload(db, current_user.id, file_hash, file_path)
+    if duplicate:
+        raise duplicate
     
-    # Create document record
-    document = Document(
-        filename=saved_filename,
-        original_filename=file.filename,
-        file_path=file_path,
-        file_size=file_size,
-        mime_type=file.content_type,
-        document_type=document_type,
-        status=DocumentStatus.PENDING,
-        user_id=current_user.id
+    document = create_uploaded_document(
+        db, current_user.id, file.filename, file_path, saved_filename,
+        file_size, file_hash, file.content_type, document_type
     )
-    db.add(document)
     db.commit()
     db.refresh(document)
     
-    # Process document in background
-    background_tasks.add_task(process_document_async, document.id, file_path, file.content_type, db)
-    
     return DocumentUploadResponse(
         message="Document uploaded successfully and is being processed",
         document=DocumentResponse.from_orm(document)
     )
 
 
-@router.get("/", response_model=List[DocumentResponse])
+@router.post("/upload/batch", response_model=DocumentBatchUploadResponse)
+async def upload_documents_batch(
+    files: List[UploadFile] = File(...),
+    document_type: DocumentType = DocumentType.OTHER,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Upload several documents in one request.
+    
+    The documents are created together and processed by a single batch job;
+    follow them with GET /documents/batches/{batch_id}. Files the user
+    already uploaded (or that appear twice) are not stored and are listed in
+    duplicates; 409 if no file is new.
+    """
+    if not files or any(not file.filename for file in files):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No file provided"
+        )
+    if len(files) > settings.MAX_BATCH_UPLOAD_FILES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.MAX_BATCH_UPLOAD_FILES} files can be uploaded at once"
+        )
+    
+    # Save files in chunks, hashing them and checking their size on the way
+    doc_service = DocumentService()
+    max_size = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+    saved = []
+    
+    def delete_saved():
+        for _, (file_path, *_) in saved:
+            doc_service.delete_file(file_path)
+    
+    try:
+        for file in files:
+            saved.append((file, await doc_service.save_upload(file.filename, file, max_size)))
+    except FileTooLargeError:
+        delete_saved()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File {file.filename} exceeds maximum allowed size of {settings.MAX_UPLOAD_SIZE_MB}MB"
+        )
+    except BaseException:  # Client disconnect, disk full...
+        delete_saved()
+        raise
+    
+    try:
+        # Exact duplicates of existing documents, or of an earlier file of the batch
+        originals = DuplicateDetectionService().find_exact_duplicates(
+            current_user.id, [file_hash for _, (*_, file_hash) in saved], db
+        )
+        new_files, duplicate_files = [], []
+        batch_hashes = set()
+        for file, saved_file in saved:
+            file_hash = saved_file[3]
+            if file_hash in originals or file_hash in batch_hashes:
+                doc_service.delete_file(saved_file[0])
+                duplicate_files.append((file.filename, file_hash))
+            else:
+                batch_hashes.add(file_hash)
+                new_files.append((file, saved_file))
+        
+        if not new_files:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="All files have already been uploaded"
+            )
+        
+        batch = DocumentBatch(user_id=current_user.id, total_documents=len(new_files))
+        db.add(batch)
+        db.flush()
+        
+        # One flush inserts all documents in a multi-row INSERT ... RETURNING
+        documents = [
+            new_uploaded_document(
+                current_user.id, file.filename, file_path, saved_filename,
+                file_size, file_hash, file.content_type, document_type, batch_id=batch.id
+            )
+            for file, (file_path, saved_filename, file_size, file_hash) in new_files
+        ]
+        db.add_all(documents)
+        db.flush()
+        
+        originals = {**{doc.file_hash: doc.id for doc in documents}, **originals}
+        JobQueueService().enqueue_batch(db, batch.id, commit=False)
+        response = DocumentBatchUploadResponse(
+            message=f"{len(documents)} documents uploaded successfully and are being processed",
+            batch_id=batch.id,
+            documents=[DocumentSummary.from_orm(doc) for doc in documents],
+            duplicates=[
+                DocumentDuplicateFile(filename=filename, duplicate_of_id=originals[file_hash])
+                for filename, file_hash in duplicate_files
+            ]
+        )
+        db.commit()
+    except BaseException:
+        # No document rows were committed: none of the saved files is referenced
+        db.rollback()
+        delete_saved()
+        raise
+    
+    logger.info(f"Batch {batch.id}: {len(documents)} documents uploaded by user {current_user.id}")
+    return response
+
+
+@router.get("/batches/{batch_id}", response_model=DocumentBatchProgress)
+def get_batch_progress(
+    batch_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get the processing progress of a batch upload, per document."""
+    batch = db.query(DocumentBatch)\
+        .filter(DocumentBatch.id == batch_id, DocumentBatch.user_id == current_user.id)\
+        .first()
+    
+    if not batch:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Batch not found"
+        )
+    
+    documents = db.query(Document)\
+        .options(document_summary_options())\
+        .filter(Document.batch_id == batch_id, Document.user_id == current_user.id)\
+        .order_by(Document.id)\
+        .all()
+    
+    counts = {document_status: 0 for document_status in DocumentStatus}
+    for document in documents:
+        counts[document.status] += 1
+    
+    return DocumentBatchProgress(
+        batch_id=batch.id,
+        total_documents=batch.total_documents,
+        completed=counts[DocumentStatus.COMPLETED],
+        processing=counts[DocumentStatus.PROCESSING],
+        pending=counts[DocumentStatus.PENDING],
+        failed=counts[DocumentStatus.FAILED],
+        removed=batch.total_documents - len(documents),
+        documents=[
+            DocumentBatchItem(**DocumentSummary.from_orm(doc).dict(), progress=stage_progress(doc.processing_stage))
+            for doc in documents
+        ]
+    )
+
+
+def paginate_documents(
+    query,
+    order: KeysetOrder,
+    response: Response,
+    limit: int,
+    cursor: Optional[str],
+    skip: int
+) -> List[Document]:
+    """Fetch one page of documents, returning the next page's cursor in X-Next-Cursor."""
+    try:
+        documents, next_cursor = PaginationService().paginate(query, order, limit, cursor=cursor, skip=skip)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return documents
+
+
+@router.get("/", response_model=List[DocumentSummary])
 def get_documents(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page (replaces skip)"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get list of user's documents."""
-    documents = db.query(Document)\
-        .filter(Document.user_id == current_user.id)\
-        .order_by(Document.created_at.desc())\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+    """Get list of user's documents, newest first."""
+    query = db.query(Document)\
+        .options(document_summary_options())\
+        .filter(Document.user_id == current_user.id)
+    documents = paginate_documents(query, NEWEST_FIRST, response, limit, cursor, skip)
     
-    return [DocumentResponse.from_orm(doc) for doc in documents]
+    return [DocumentSummary.from_orm(doc) for doc in documents]
 
 
-@router.get("/urgent", response_model=List[DocumentResponse])
+@router.get("/urgent", response_model=List[DocumentSummary])
 def get_urgent_documents(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -366,6 +404,7 @@ def get_urgent_documents(
     
     # Documents with upcoming deadlines OR high importance score
     documents = db.query(Document)\
+        .options(document_summary_options())\
         .filter(Document.user_id == current_user.id)\
         .filter(
             (Document.deadline <= seven_days_from_now) |
@@ -374,59 +413,60 @@ def get_urgent_documents(
         .order_by(Document.importance_score.desc().nullslast(), Document.deadline.asc().nullslast())\
         .all()
     
-    return [DocumentResponse.from_orm(doc) for doc in documents]
+    return [DocumentSummary.from_orm(doc) for doc in documents]
 
 
-@router.get("/by-importance", response_model=List[DocumentResponse])
+@router.get("/by-importance", response_model=List[DocumentSummary])
 def get_documents_by_importance(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page (replaces skip)"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get documents sorted by importance score (highest first)."""
-    documents = db.query(Document)\
-        .filter(Document.user_id == current_user.id)\
-        .order_by(Document.importance_score.desc().nullslast(), Document.created_at.desc())\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+    query = db.query(Document)\
+        .options(document_summary_options())\
+        .filter(Document.user_id == current_user.id)
+    documents = paginate_documents(query, MOST_IMPORTANT_FIRST, response, limit, cursor, skip)
     
-    return [DocumentResponse.from_orm(doc) for doc in documents]
+    return [DocumentSummary.from_orm(doc) for doc in documents]
 
 
-@router.get("/by-deadline", response_model=List[DocumentResponse])
+@router.get("/by-deadline", response_model=List[DocumentSummary])
 def get_documents_by_deadline(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page (replaces skip)"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get documents sorted by deadline (closest first)."""
-    documents = db.query(Document)\
+    query = db.query(Document)\
+        .options(document_summary_options())\
         .filter(Document.user_id == current_user.id)\
-        .filter(Document.deadline.isnot(None))\
-        .order_by(Document.deadline.asc())\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+        .filter(Document.deadline.isnot(None))
+    documents = paginate_documents(query, CLOSEST_DEADLINE_FIRST, response, limit, cursor, skip)
     
-    return [DocumentResponse.from_orm(doc) for doc in documents]
+    return [DocumentSummary.from_orm(doc) for doc in documents]
 
 
-@router.get("/duplicates", response_model=List[DocumentResponse])
+@router.get("/duplicates", response_model=List[DocumentSummary])
 def get_duplicate_documents(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get all potential duplicate documents (similarity < 95%)."""
     documents = db.query(Document)\
+        .options(document_summary_options())\
         .filter(Document.user_id == current_user.id)\
         .filter(Document.is_duplicate == True)\
         .order_by(Document.similarity_score.desc())\
         .all()
     
-    return [DocumentResponse.from_orm(doc) for doc in documents]
+    return [DocumentSummary.from_orm(doc) for doc in documents]
 
 
 @router.delete("/duplicates/cleanup")
@@ -466,69 +506,150 @@ def get_document_statistics(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get statistics about user's documents."""
-    from sqlalchemy import func
+    """
+    Get statistics about user's documents.
     
-    # Total documents
-    total_documents = db.query(func.count(Document.id))\
-        .filter(Document.user_id == current_user.id)\
-        .scalar()
+    Counters come from user_document_stats (kept in sync on every document
+    change); overdue and upcoming deadlines are counted in the same query.
+    """
+    stats = DocumentStatsService().get_statistics(current_user.id, db)
+    return DocumentStatistics(**stats)
+
+
+@router.get("/categories", response_model=List[str])
+async def get_all_categories(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get list of all unique categories for the current user."""
+    filing_cabinet_service = FilingCabinetService()
+    categories = await db.run_sync(
+        lambda session: filing_cabinet_service.get_all_categories(current_user.id, session)
+    )
+    return categories
+
+
+@router.get("/search", response_model=List[DocumentSearchHit])
+def search_documents(
+    q: str = Query(..., description="Search query"),
+    skip: int = 0,
+    limit: int = 100,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Full-text search in display_name, original_filename, keywords and extracted_text.
     
-    # Documents by type
-    type_counts = db.query(Document.document_type, func.count(Document.id))\
-        .filter(Document.user_id == current_user.id)\
-        .group_by(Document.document_type)\
-        .all()
+    Results are ranked with ts_rank and include a highlighted snippet. The last
+    word matches as a prefix (search-as-you-type); names also match substrings.
+    """
+    if not q or len(q.strip()) < 2:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search query must be at least 2 characters"
+        )
     
-    documents_by_type = {doc_type.value: count for doc_type, count in type_counts}
+    search_service = DocumentSearchService()
+    results = search_service.search(current_user.id, q, db, skip=skip, limit=limit)
     
-    # Documents with deadlines
-    documents_with_deadline = db.query(func.count(Document.id))\
-        .filter(Document.user_id == current_user.id)\
-        .filter(Document.deadline.isnot(None))\
-        .scalar()
+    hits = []
+    for result in results:
+        hit = DocumentSearchHit.from_orm(result['document'])
+        hit.rank = result['rank']
+        hit.snippet = result['snippet']
+        hits.append(hit)
+    return hits
+
+
+def format_event(event: Dict) -> str:
+    """Server-sent event frame of a progress event."""
+    return f"event: progress\ndata: {json.dumps(event)}\n\n"
+
+
+@router.get("/events")
+async def stream_progress_events(
+    request: Request,
+    document_id: Optional[int] = Query(None, description="Only this document; the stream ends when it is done"),
+    batch_id: Optional[int] = Query(None, description="Only this batch; the stream ends when all its documents are done"),
+    token: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Stream processing progress as server-sent events (text/event-stream).
     
-    # Overdue documents
-    overdue_documents = db.query(func.count(Document.id))\
-        .filter(Document.user_id == current_user.id)\
-        .filter(Document.deadline < date.today())\
-        .scalar()
+    The current state of the watched documents (all unfinished documents of
+    the user without a filter) is sent first, then one event per completed
+    pipeline stage: hashed, preprocessed, ocr_completed, analyzed,
+    year_assigned, filed, embedded, dedup_checked and completed, plus
+    processing, removed (exact duplicate) and status changes (failed,
+    pending for a retry). The token is passed in the URL because EventSource
+    cannot send an Authorization header.
+    """
+    user = await db.run_sync(lambda session: get_user_from_token_or_header(token, session))
+    user_id = user.id
     
-    # Upcoming deadlines (next 7 days)
-    seven_days_from_now = date.today() + timedelta(days=7)
-    upcoming_deadlines = db.query(func.count(Document.id))\
-        .filter(Document.user_id == current_user.id)\
-        .filter(Document.deadline >= date.today())\
-        .filter(Document.deadline <= seven_days_from_now)\
-        .scalar()
+    if document_id is not None and await db.scalar(
+        select(Document.id).where(Document.id == document_id, Document.user_id == user_id)
+    ) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+    if batch_id is not None and await db.scalar(
+        select(DocumentBatch.id).where(DocumentBatch.id == batch_id, DocumentBatch.user_id == user_id)
+    ) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Batch not found")
+    await db.close()  # No connection is held while the stream is open
     
-    # High importance documents (score > 80)
-    high_importance = db.query(func.count(Document.id))\
-        .filter(Document.user_id == current_user.id)\
-        .filter(Document.importance_score > 80)\
-        .scalar()
+    def watched(event: Dict) -> bool:
+        if document_id is not None:
+            return event["document_id"] == document_id
+        if batch_id is not None:
+            return event["batch_id"] == batch_id
+        return True
     
-    # Average importance score
-    avg_importance = db.query(func.avg(Document.importance_score))\
-        .filter(Document.user_id == current_user.id)\
-        .filter(Document.importance_score.isnot(None))\
-        .scalar()
+    async def events() -> AsyncIterator[str]:
+        async with progress_broker.subscribe(user_id) as queue:
+            # Current state, read after subscribing so no event is missed in between
+            query = select(
+                Document.id, Document.user_id, Document.batch_id, Document.status, Document.processing_stage
+            ).where(Document.user_id == user_id).order_by(Document.id)
+            if document_id is not None:
+                query = query.where(Document.id == document_id)
+            elif batch_id is not None:
+                query = query.where(Document.batch_id == batch_id)
+            else:
+                query = query.where(Document.status.in_([DocumentStatus.PENDING, DocumentStatus.PROCESSING]))
+            async with AsyncSessionLocal() as session:
+                snapshot = [progress_event(row) for row in await session.execute(query)]
+            
+            open_documents = set()
+            for event in snapshot:
+                yield format_event(event)
+                if not is_final(event):
+                    open_documents.add(event["document_id"])
+            
+            scoped = document_id is not None or batch_id is not None
+            while not scoped or open_documents:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    await progress_broker.ensure_listening()  # Reconnect a lost listener
+                    yield ": keep-alive\n\n"
+                    continue
+                
+                if not watched(event):
+                    continue
+                yield format_event(event)
+                if is_final(event):
+                    open_documents.discard(event["document_id"])
+                else:
+                    open_documents.add(event["document_id"])
     
-    # Total amount from invoices/receipts
-    total_amount = db.query(func.sum(Document.extracted_amount))\
-        .filter(Document.user_id == current_user.id)\
-        .filter(Document.extracted_amount.isnot(None))\
-        .scalar()
-    
-    return DocumentStatistics(
-        total_documents=total_documents or 0,
-        documents_by_type=documents_by_type,
-        documents_with_deadline=documents_with_deadline or 0,
-        overdue_documents=overdue_documents or 0,
-        upcoming_deadlines=upcoming_deadlines or 0,
-        high_importance_documents=high_importance or 0,
-        average_importance_score=float(avg_importance) if avg_importance else 0.0,
-        total_amount_extracted=float(total_amount) if total_amount else 0.0
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # An encoding set here also keeps GZipMiddleware from buffering the events
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Content-Encoding": "identity"}
     )
 
 
@@ -552,6 +673,30 @@ def get_document(
     return DocumentResponse.from_orm(document)
 
 
+@router.get("/{document_id}/text", response_model=DocumentText)
+def get_document_text(
+    document_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get the extracted (OCR) text of a document, which list endpoints leave out."""
+    row = db.query(Document.id, Document.extracted_text)\
+        .filter(Document.id == document_id, Document.user_id == current_user.id)\
+        .first()
+    
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    return DocumentText(
+        id=row.id,
+        extracted_text=row.extracted_text,
+        length=len(row.extracted_text or "")
+    )
+
+
 @router.patch("/{document_id}", response_model=DocumentResponse)
 def update_document(
     document_id: int,
@@ -603,6 +748,7 @@ def delete_document(
     # Delete files using filing cabinet service
     filing_cabinet_service = FilingCabinetService()
     filing_cabinet_service.delete_document_files(document)
+    DocumentProcessingService.remove_work_dir(document.id)
     
     # Delete from database
     db.delete(document)
@@ -611,52 +757,95 @@ def delete_document(
     return {"message": "Document deleted successfully"}
 
 
+@router.post("/{document_id}/retry", response_model=DocumentResponse)
+def retry_document_processing(
+    document_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Re-queue a failed document; processing resumes after its last completed stage."""
+    document = db.query(Document)\
+        .filter(Document.id == document_id, Document.user_id == current_user.id)\
+        .first()
+    
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    if document.status != DocumentStatus.FAILED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only failed documents can be retried"
+        )
+    
+    document.status = DocumentStatus.PENDING
+    JobQueueService().enqueue(db, document.id, commit=False)
+    db.commit()
+    db.refresh(document)
+    
+    logger.info(f"Document {document_id} re-queued from stage '{document.processing_stage or 'start'}'")
+    
+    return DocumentResponse.from_orm(document)
+
+
 # ============================================================================
 # FILING CABINET ENDPOINTS
 # ============================================================================
+# FilingCabinetService runs on the asyncpg engine through AsyncSession.run_sync,
+# so these handlers never block the event loop on the database.
 
 @router.get("/filing-cabinet/years", response_model=List[int])
-def get_filing_cabinet_years(
+async def get_filing_cabinet_years(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get list of years with documents in filing cabinet."""
     filing_cabinet_service = FilingCabinetService()
-    years = filing_cabinet_service.get_years_with_documents(current_user.id, db)
+    years = await db.run_sync(
+        lambda session: filing_cabinet_service.get_years_with_documents(current_user.id, session)
+    )
     return years
 
 
 @router.get("/filing-cabinet/overview")
-def get_filing_cabinet_overview(
+async def get_filing_cabinet_overview(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get complete filing cabinet overview with all years and stats."""
     filing_cabinet_service = FilingCabinetService()
-    overview = filing_cabinet_service.get_filing_cabinet_overview(current_user.id, db)
+    overview = await db.run_sync(
+        lambda session: filing_cabinet_service.get_filing_cabinet_overview(current_user.id, session)
+    )
     return overview
 
 
 @router.get("/filing-cabinet/hierarchical-overview", response_model=FilingCabinetHierarchicalOverview)
-def get_hierarchical_filing_cabinet_overview(
+async def get_hierarchical_filing_cabinet_overview(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get hierarchical filing cabinet overview: Year > Category > Type."""
     filing_cabinet_service = FilingCabinetService()
-    overview = filing_cabinet_service.get_hierarchical_overview(current_user.id, db)
+    overview = await db.run_sync(
+        lambda session: filing_cabinet_service.get_hierarchical_overview(current_user.id, session)
+    )
     return overview
 
 
 @router.get("/filing-cabinet/{year}")
-def get_year_stats(
+async def get_year_stats(
     year: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get document statistics for a specific year."""
     filing_cabinet_service = FilingCabinetService()
-    stats = filing_cabinet_service.get_document_stats_by_year(current_user.id, year, db)
+    stats = await db.run_sync(
+        lambda session: filing_cabinet_service.get_document_stats_by_year(current_user.id, year, session)
+    )
     
     return {
         "year": year,
@@ -665,14 +854,16 @@ def get_year_stats(
     }
 
 
-@router.get("/filing-cabinet/{year}/{document_type}", response_model=List[DocumentResponse])
-def get_documents_by_year_type(
+@router.get("/filing-cabinet/{year}/{document_type}", response_model=List[DocumentSummary])
+async def get_documents_by_year_type(
     year: int,
     document_type: str,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page (replaces skip)"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get documents for specific year and type."""
     try:
@@ -684,27 +875,40 @@ def get_documents_by_year_type(
         )
     
     filing_cabinet_service = FilingCabinetService()
-    documents = filing_cabinet_service.get_documents_by_year_type(
-        current_user.id,
-        year,
-        doc_type,
-        db,
-        skip,
-        limit
-    )
+    try:
+        documents, next_cursor = await db.run_sync(
+            lambda session: filing_cabinet_service.get_documents_by_year_type(
+                current_user.id,
+                year,
+                doc_type,
+                session,
+                skip,
+                limit,
+                cursor
+            )
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     
-    return [DocumentResponse.from_orm(doc) for doc in documents]
+    return [DocumentSummary.from_orm(doc) for doc in documents]
 
 
 @router.get("/filing-cabinet/{year}/categories")
-def get_year_categories(
+async def get_year_categories(
     year: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get categories and document counts for a specific year."""
     filing_cabinet_service = FilingCabinetService()
-    categories = filing_cabinet_service.get_categories_by_year(current_user.id, year, db)
+    categories = await db.run_sync(
+        lambda session: filing_cabinet_service.get_categories_by_year(current_user.id, year, session)
+    )
     
     return {
         "year": year,
@@ -712,15 +916,17 @@ def get_year_categories(
     }
 
 
-@router.get("/filing-cabinet/{year}/{category}/{document_type}", response_model=List[DocumentResponse])
-def get_documents_by_year_category_type(
+@router.get("/filing-cabinet/{year}/{category}/{document_type}", response_model=List[DocumentSummary])
+async def get_documents_by_year_category_type(
     year: int,
     category: str,
     document_type: str,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page (replaces skip)"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get documents for specific year, category, and type."""
     try:
@@ -732,62 +938,28 @@ def get_documents_by_year_category_type(
         )
     
     filing_cabinet_service = FilingCabinetService()
-    documents = filing_cabinet_service.get_documents_by_year_category_type(
-        current_user.id,
-        year,
-        category,
-        doc_type,
-        db,
-        skip,
-        limit
-    )
-    
-    return [DocumentResponse.from_orm(doc) for doc in documents]
-
-
-@router.get("/categories", response_model=List[str])
-def get_all_categories(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Get list of all unique categories for the current user."""
-    filing_cabinet_service = FilingCabinetService()
-    categories = filing_cabinet_service.get_all_categories(current_user.id, db)
-    return categories
-
-
-@router.get("/search", response_model=List[DocumentResponse])
-def search_documents(
-    q: str = Query(..., description="Search query"),
-    skip: int = 0,
-    limit: int = 100,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Search documents by text content (display_name, extracted_text, keywords)."""
-    if not q or len(q.strip()) < 2:
+    try:
+        documents, next_cursor = await db.run_sync(
+            lambda session: filing_cabinet_service.get_documents_by_year_category_type(
+                current_user.id,
+                year,
+                category,
+                doc_type,
+                session,
+                skip,
+                limit,
+                cursor
+            )
+        )
+    except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Search query must be at least 2 characters"
+            detail=str(e)
         )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     
-    search_term = f"%{q.lower()}%"
-    
-    # Search in display_name, extracted_text, and original_filename
-    documents = db.query(Document)\
-        .filter(Document.user_id == current_user.id)\
-        .filter(
-            (func.lower(Document.display_name).like(search_term)) |
-            (func.lower(Document.original_filename).like(search_term)) |
-            (func.lower(Document.extracted_text).like(search_term)) |
-            (func.lower(Document.keywords).like(search_term))
-        )\
-        .order_by(Document.importance_score.desc().nullslast(), Document.created_at.desc())\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
-    
-    return [DocumentResponse.from_orm(doc) for doc in documents]
+    return [DocumentSummary.from_orm(doc) for doc in documents]
 
 
 @router.get("/{document_id}/download/original")
@@ -798,7 +970,7 @@ def download_original_document(
 ):
     """Download original uploaded document."""
     # Get user from token (URL) or header
-    user = get_user_from_token_or_header(token, None)
+    user = get_user_from_token_or_header(token, db)
     
     document = db.query(Document)\
         .filter(Document.id == document_id, Document.user_id == user.id)\
@@ -832,7 +1004,7 @@ def download_ocr_pdf(
 ):
     """Download searchable PDF with OCR layer."""
     # Get user from token (URL) or header
-    user = get_user_from_token_or_header(token, None)
+    user = get_user_from_token_or_header(token, db)
     
     document = db.query(Document)\
         .filter(Document.id == document_id, Document.user_id == user.id)\
@@ -870,7 +1042,7 @@ def preview_document(
 ):
     """Preview document (serves OCR PDF for viewing)."""
     # Get user from token (URL) or header
-    user = get_user_from_token_or_header(token, None)
+    user = get_user_from_token_or_header(token, db)
     
     document = db.query(Document)\
         .filter(Document.id == document_id, Document.user_id == user.id)\
@@ -0,0 +1,182 @@
+"""Resumable upload API endpoints.
+
+Protocol:
+    POST   /api/uploads                     start an upload (file name, size, type)
+    GET    /api/uploads/{upload_id}         current offset, to resume after a dropped connection
+    PUT    /api/uploads/{upload_id}?offset  append the raw bytes of the next part
+    POST   /api/uploads/{upload_id}/complete  create the document and queue its processing
+    DELETE /api/uploads/{upload_id}         cancel
+"""
+import asyncio
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.database import get_async_db
+from app.models.user import User
+from app.models.upload_session import UploadSession
+from app.schemas.document import DocumentResponse, DocumentUploadResponse
+from app.schemas.upload import UploadSessionCreate, UploadSessionResponse
+from app.api.auth import get_current_user
+from app.api.documents import create_uploaded_document, duplicate_upload
+from app.services.document_service import FileTooLargeError
+from app.services.upload_session_service import UploadSessionService, UploadConflictError
+
+router = APIRouter()
+
+# Response header carrying the current offset of an upload
+UPLOAD_OFFSET_HEADER = "Upload-Offset"
+
+
+def upload_state(upload: UploadSession, offset: int, response: Response) -> UploadSessionResponse:
+    response.headers[UPLOAD_OFFSET_HEADER] = str(offset)
+    return UploadSessionResponse(
+        upload_id=upload.id,
+        offset=offset,
+        size=upload.total_size,
+        part_size=settings.UPLOAD_PART_SIZE_MB * 1024 * 1024,
+        expires_at=upload.expires_at
+    )
+
+
+async def get_user_upload(upload_id: str, user: User, db: AsyncSession) -> UploadSession:
+    """Load an unexpired upload session of the user, or raise 404."""
+    upload = await db.get(UploadSession, upload_id)
+    if not upload or upload.user_id != user.id or upload.expires_at < datetime.utcnow():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+    return upload
+
+
+def conflict(error: UploadConflictError) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=str(error),
+        headers={UPLOAD_OFFSET_HEADER: str(error.offset)}
+    )
+
+
+@router.post("", response_model=UploadSessionResponse, status_code=status.HTTP_201_CREATED)
+async def create_upload(
+    request: UploadSessionCreate,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Start a resumable upload."""
+    upload_service = UploadSessionService()
+    try:
+        upload = upload_service.new_session(
+            current_user.id,
+            request.filename,
+            request.size,
+            mime_type=request.mime_type,
+            document_type=request.document_type
+        )
+    except FileTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File size exceeds maximum allowed size of {settings.MAX_RESUMABLE_UPLOAD_SIZE_MB}MB"
+        )
+
+    await db.run_sync(upload_service.delete_expired)
+    db.add(upload)
+    await db.commit()
+
+    return upload_state(upload, 0, response)
+
+
+@router.get("/{upload_id}", response_model=UploadSessionResponse)
+async def get_upload(
+    upload_id: str,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the current offset of an upload."""
+    upload = await get_user_upload(upload_id, current_user, db)
+    return upload_state(upload, UploadSessionService().get_offset(upload.id), response)
+
+
+@router.put("/{upload_id}", response_model=UploadSessionResponse)
+async def upload_part(
+    upload_id: str,
+    request: Request,
+    response: Response,
+    offset: int = Query(..., ge=0, description="Offset of the first byte of the part (current offset)"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Append the request body (raw bytes) to an upload."""
+    upload = await get_user_upload(upload_id, current_user, db)
+    await db.close()  # No connection is held while the part is received
+
+    try:
+        new_offset = await UploadSessionService().append_part(upload, offset, request.stream())
+    except UploadConflictError as e:
+        raise conflict(e)
+    except FileTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Part goes past the declared size of {upload.total_size} bytes"
+        )
+
+    return upload_state(upload, new_offset, response)
+
+
+@router.post("/{upload_id}/complete", response_model=DocumentUploadResponse)
+async def complete_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Turn a fully received upload into a document and queue its processing."""
+    upload = await get_user_upload(upload_id, current_user, db)
+    upload_service = UploadSessionService()
+    try:
+        # May re-hash the whole file (parts received by another process): off the event loop
+        file_path, saved_filename, file_size, file_hash = await asyncio.to_thread(upload_service.complete, upload)
+    except UploadConflictError as e:
+        raise conflict(e)
+
+    try:
+        duplicate = await db.run_sync(
+            lambda session: duplicate_upload(session, current_user.id, file_hash, file_path)
+        )
+        if not duplicate:
+            document = await db.run_sync(lambda session: create_uploaded_document(
+                session, current_user.id, upload.original_filename, file_path, saved_filename,
+                file_size, file_hash, upload.mime_type, upload.document_type
+            ))
+        await db.delete(upload)
+        await db.commit()
+    except Exception:
+        # The upload session is kept: put the bytes back so completing can be retried
+        await db.rollback()
+        await asyncio.to_thread(upload_service.restore, upload_id, file_path)
+        raise
+
+    if duplicate:
+        raise duplicate
+    await db.refresh(document)
+
+    return DocumentUploadResponse(
+        message="Document uploaded successfully and is being processed",
+        document=DocumentResponse.from_orm(document)
+    )
+
+
+@router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Cancel an upload and delete the bytes received so far."""
+    upload = await get_user_upload(upload_id, current_user, db)
+    UploadSessionService().discard(upload.id)
+    await db.delete(upload)
+    await db.commit()
@@ -1,12 +1,20 @@
 """Main FastAPI application."""
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from loguru import logger
 import sys
 
 from app.config import settings
-from app.api import auth, documents, chat, dashboard
-from app.models.database import engine, Base
+from app.api import auth, documents, chat, dashboard, uploads
+from app.api.documents import DUPLICATE_OF_HEADER
+from app.api.uploads import UPLOAD_OFFSET_HEADER
+from sqlalchemy.orm import Session
+from app.models.database import engine, Base, get_db, get_pool_stats
+from app.services.analysis_cache_service import AnalysisCacheService
+from app.services.pagination_service import NEXT_CURSOR_HEADER
+from app.process_pool import shutdown_process_pool
+from app.upload_limits import UploadSizeLimitMiddleware, MULTIPART_OVERHEAD_BYTES
 
 # Configure logging
 logger.remove()
@@ -25,6 +33,17 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Cut off oversized uploads while they are received (the endpoint checks the file itself)
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    limits={
+        "/api/documents/upload": settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024 + MULTIPART_OVERHEAD_BYTES,
+        "/api/documents/upload/batch": settings.MAX_BATCH_UPLOAD_FILES * (
+            settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024 + MULTIPART_OVERHEAD_BYTES
+        ),
+    }
+)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -32,8 +51,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, UPLOAD_OFFSET_HEADER, DUPLICATE_OF_HEADER],
 )
 
+# Compress JSON responses for clients sending Accept-Encoding: gzip
+app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MINIMUM_SIZE)
+
 
 @app.on_event("startup")
 async def startup_event():
@@ -53,6 +76,7 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown."""
     logger.info("Shutting down AgentCFO API")
+    shutdown_process_pool()
 
 
 @app.get("/")
@@ -71,8 +95,21 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/health/analysis-cache")
+def analysis_cache_stats(db: Session = Depends(get_db)):
+    """OCR/analysis cache hit and miss counters."""
+    return AnalysisCacheService.get_stats(db)
+
+
+@app.get("/health/db-pool")
+async def db_pool_stats():
+    """Database connection pool usage of this API process."""
+    return get_pool_stats()
+
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(documents.router, prefix="/api/documents", tags=["Documents"])
+app.include_router(uploads.router, prefix="/api/uploads", tags=["Uploads"])
 app.include_router(chat.router, prefix="/api/chat", tags=["Chat"])
 app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
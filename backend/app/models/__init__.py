@@ -4,6 +4,14 @@ from app.models.user import User
 from app.models.document import Document, DocumentChunk
 from app.models.transaction import Transaction
 from app.models.conversation import Conversation, Message
+from app.models.job import ProcessingJob
+from app.models.analysis_cache import AnalysisCacheEntry
+from app.models.embedding_cache import EmbeddingCacheEntry
+from app.models.filing_cabinet_cache import FilingCabinetCache
+from app.models.user_document_stats import UserDocumentStats
+from app.models.upload_session import UploadSession
+from app.models.document_batch import DocumentBatch
+from app.models.minhash_band import DocumentMinHashBand
 
 __all__ = [
     "Base",
@@ -14,4 +22,12 @@ __all__ = [
     "Transaction",
     "Conversation",
     "Message",
+    "ProcessingJob",
+    "AnalysisCacheEntry",
+    "EmbeddingCacheEntry",
+    "FilingCabinetCache",
+    "UserDocumentStats",
+    "UploadSession",
+    "DocumentBatch",
+    "DocumentMinHashBand",
 ]
@@ -0,0 +1,42 @@
+"""Content-addressed cache of OCR and analysis results."""
+from sqlalchemy import Column, Integer, String, DateTime, Text, Float, UniqueConstraint
+from datetime import datetime
+from app.models.database import Base
+
+
+class AnalysisCacheEntry(Base):
+    """OCR text and DocumentAgent metadata for one file content.
+
+    Keyed by the SHA-256 of the uploaded file plus everything that changes the
+    result (OCR engine, language set, pipeline version), so identical files
+    are never OCRed or sent to the LLM twice.
+    """
+
+    __tablename__ = "analysis_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Cache key
+    file_hash = Column(String, nullable=False)
+    ocr_engine = Column(String, nullable=False)
+    languages = Column(String, nullable=False)  # e.g. "fra+deu+eng"
+    pipeline_version = Column(String, nullable=False)
+
+    # OCR result
+    extracted_text = Column(Text, nullable=True)
+    ocr_confidence = Column(Float, nullable=True)
+    ocr_method = Column(String, nullable=True)
+    ocr_pages = Column(Integer, nullable=True)
+    pdf_path = Column(String, nullable=True)  # Cached searchable PDF
+
+    # DocumentAgent metadata (JSON)
+    analysis_metadata = Column(Text, nullable=True)
+
+    hit_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("file_hash", "ocr_engine", "languages", "pipeline_version",
+                         name="uq_analysis_cache_key"),
+    )
@@ -1,27 +1,109 @@
-"""Database connection and session management."""
-from sqlalchemy import create_engine
+"""Database connection and session management.
+
+The engines of the application: the API, the worker and the scripts all use
+this engine, SessionLocal and get_db (the worker pipeline uses
+ShortSessionLocal for its per-stage transactions). Async route handlers use the asyncpg
+engine through AsyncSessionLocal and get_async_db, so database round trips
+do not block the event loop.
+"""
+import threading
+import time
+from typing import Dict, Any
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from app.config import settings
 
-# Create database engine with optimized connection pooling
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._checkouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._timeouts = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self._timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self._checkouts += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+
+    def wait_stats(self) -> Dict[str, Any]:
+        """Checkout count, wait times (including connects) and pool timeouts."""
+        with self._stats_lock:
+            return {
+                'checkouts': self._checkouts,
+                'wait_seconds_total': round(self._wait_total, 3),
+                'wait_seconds_avg': round(self._wait_total / self._checkouts, 4) if self._checkouts else 0.0,
+                'wait_seconds_max': round(self._wait_max, 3),
+                'timeouts': self._timeouts,
+            }
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """InstrumentedQueuePool for the asyncpg engine."""
+
+
+connect_args = {"connect_timeout": settings.DB_CONNECT_TIMEOUT}
+if settings.DB_STATEMENT_TIMEOUT_MS:
+    connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+
+# Create database engine (pool sized by DB_POOL_SIZE / DB_MAX_OVERFLOW)
 engine = create_engine(
     settings.DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
     pool_pre_ping=True,  # Verify connections before using
-    pool_size=20,  # Increased pool size for better concurrency
-    max_overflow=40,  # Allow more connections during peak
-    pool_recycle=3600,  # Recycle connections after 1 hour
-    pool_timeout=30,  # Timeout for getting connection from pool
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
     echo=False,  # Set to True for SQL query logging in development
-    connect_args={
-        "connect_timeout": 10,
-        "options": "-c statement_timeout=30000"  # 30 second query timeout
-    }
+    connect_args=connect_args
 )
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Short units of work on objects kept between them (the processing worker):
+# objects stay loaded after commit and close, and are re-attached with add()
+ShortSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, expire_on_commit=False)
+
+async_connect_args = {"timeout": settings.DB_CONNECT_TIMEOUT}
+if settings.DB_STATEMENT_TIMEOUT_MS:
+    async_connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+
+# Same database through asyncpg (pool sized by DB_ASYNC_POOL_SIZE / DB_ASYNC_MAX_OVERFLOW)
+async_engine = create_async_engine(
+    make_url(settings.DATABASE_URL).set(drivername="postgresql+asyncpg"),
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_pre_ping=True,
+    pool_size=settings.DB_ASYNC_POOL_SIZE,
+    max_overflow=settings.DB_ASYNC_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    echo=False,
+    connect_args=async_connect_args
+)
+
+# Objects stay usable after commit (no implicit refresh, which would need an await)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Base class for models
 Base = declarative_base()
 
@@ -34,3 +116,27 @@ def get_db():
     finally:
         db.close()
 
+
+async def get_async_db():
+    """Dependency to get an async (asyncpg) database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _pool_stats(pool, max_overflow: int) -> Dict[str, Any]:
+    return {
+        'pool_size': pool.size(),
+        'max_overflow': max_overflow,
+        'checked_out': pool.checkedout(),
+        'checked_in': pool.checkedin(),
+        'overflow': max(0, pool.overflow()),
+        **pool.wait_stats(),
+    }
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Connection pool usage of this process, per engine."""
+    return {
+        'sync': _pool_stats(engine.pool, settings.DB_MAX_OVERFLOW),
+        'async': _pool_stats(async_engine.pool, settings.DB_ASYNC_MAX_OVERFLOW),
+    }
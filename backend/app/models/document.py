@@ -1,6 +1,7 @@
 """Document models for file storage and RAG."""
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum as SQLEnum, Float, Numeric, Date
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum as SQLEnum, Float, Numeric, Date, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR, ARRAY
+from sqlalchemy.orm import relationship, deferred, load_only
 from datetime import datetime, date
 import enum
 from app.models.database import Base
@@ -24,6 +25,47 @@ class DocumentStatus(str, enum.Enum):
     FAILED = "failed"
 
 
+class ProcessingStage(str, enum.Enum):
+    """Ingestion pipeline stages, in execution order.
+
+    A document's processing_stage holds the last stage that completed, so a
+    retried job resumes with the stage that follows it.
+    """
+    HASHED = "hashed"
+    PREPROCESSED = "preprocessed"
+    OCR_COMPLETED = "ocr_completed"
+    ANALYZED = "analyzed"
+    YEAR_ASSIGNED = "year_assigned"
+    FILED = "filed"
+    EMBEDDED = "embedded"
+    DEDUP_CHECKED = "dedup_checked"
+    COMPLETED = "completed"
+
+
+# Full-text search vector over names, keywords and OCR text, for French,
+# German and English (weights: names A, keywords B, text C). Text is capped
+# to stay below the 1 MB tsvector limit.
+SEARCH_VECTOR_EXPRESSION = """
+    setweight(to_tsvector('french'::regconfig, coalesce(display_name, '') || ' ' || coalesce(original_filename, '')), 'A') ||
+    setweight(to_tsvector('german'::regconfig, coalesce(display_name, '') || ' ' || coalesce(original_filename, '')), 'A') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(display_name, '') || ' ' || coalesce(original_filename, '')), 'A') ||
+    setweight(to_tsvector('french'::regconfig, coalesce(keywords, '')), 'B') ||
+    setweight(to_tsvector('german'::regconfig, coalesce(keywords, '')), 'B') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(keywords, '')), 'B') ||
+    setweight(to_tsvector('french'::regconfig, left(coalesce(extracted_text, ''), 100000)), 'C') ||
+    setweight(to_tsvector('german'::regconfig, left(coalesce(extracted_text, ''), 100000)), 'C') ||
+    setweight(to_tsvector('english'::regconfig, left(coalesce(extracted_text, ''), 100000)), 'C')
+"""
+
+
+# Full-text search vector over chunk content, for hybrid RAG retrieval
+CHUNK_SEARCH_VECTOR_EXPRESSION = """
+    to_tsvector('french'::regconfig, content) ||
+    to_tsvector('german'::regconfig, content) ||
+    to_tsvector('english'::regconfig, content)
+"""
+
+
 class Document(Base):
     """Document model for uploaded files."""
     
@@ -40,6 +82,8 @@ class Document(Base):
     document_type = Column(SQLEnum(DocumentType), default=DocumentType.OTHER)
     category = Column(String, nullable=True, index=True)  # Theme/category (Impots, Assurance, etc.)
     status = Column(SQLEnum(DocumentStatus), default=DocumentStatus.PENDING)
+    processing_stage = Column(String, nullable=True)  # Last completed ProcessingStage value
+    processing_state = Column(Text, nullable=True)  # JSON checkpoint of stage outputs for resuming
     storage_year = Column(Integer, nullable=True, index=True)  # Year for filing cabinet organization
     
     # Extracted metadata
@@ -60,9 +104,14 @@ class Document(Base):
     is_duplicate = Column(Integer, default=False)  # Boolean: is this a duplicate?
     duplicate_of_id = Column(Integer, ForeignKey("documents.id"), nullable=True)  # Reference to original
     similarity_score = Column(Float, nullable=True)  # Similarity score with original (0-1)
+    minhash_signature = deferred(Column(ARRAY(Integer), nullable=True))  # MinHash of the text (near-duplicates)
+    
+    # Full-text search (generated by Postgres, never loaded with the document)
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True)))
     
     # Ownership and timestamps
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    batch_id = Column(Integer, ForeignKey("document_batches.id", ondelete="SET NULL"), nullable=True)  # Batch upload, if any
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -71,12 +120,32 @@ class Document(Base):
     chunks = relationship("DocumentChunk", back_populates="document", cascade="all, delete-orphan")
     transactions = relationship("Transaction", back_populates="document", cascade="all, delete-orphan")
     
-    # Index for filing cabinet queries: (user_id, storage_year, document_type)
+    # Composite and partial indexes for the per-user query shapes are created by
+    # migrations 004, 014-017 and 019 (checked by tests/test_query_plans.py)
     __table_args__ = (
         {"extend_existing": True}
     )
 
 
+def document_summary_options():
+    """
+    Loader option for list views (DocumentSummary): skips the text blobs
+    (extracted_text, extracted_data, processing_state), which load on access.
+    
+    Built per query: creating it configures the mappers, which needs all
+    related models (DocumentChunk, Conversation, ...) to be defined.
+    """
+    return load_only(
+        Document.id, Document.filename, Document.original_filename, Document.display_name,
+        Document.file_size, Document.document_type, Document.status, Document.processing_stage,
+        Document.created_at, Document.storage_year, Document.category, Document.ocr_pdf_path,
+        Document.importance_score, Document.document_date, Document.deadline,
+        Document.extracted_amount, Document.currency, Document.keywords,
+        Document.classification_confidence, Document.is_duplicate, Document.duplicate_of_id,
+        Document.similarity_score, Document.user_id
+    )
+
+
 class DocumentChunk(Base):
     """Document chunk for RAG with vector embeddings."""
     
@@ -84,12 +153,16 @@ class DocumentChunk(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)  # Denormalized for per-user vector search
     content = Column(Text, nullable=False)
     chunk_index = Column(Integer, nullable=False)  # Order in document
     
     # Vector embedding (1536 dimensions for text-embedding-3-small)
     embedding = Column(Vector(1536), nullable=True)
     
+    # Full-text search for hybrid retrieval (generated by Postgres)
+    search_vector = deferred(Column(TSVECTOR, Computed(CHUNK_SEARCH_VECTOR_EXPRESSION, persisted=True)))
+    
     # Metadata
     page_number = Column(Integer, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
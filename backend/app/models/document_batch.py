@@ -0,0 +1,15 @@
+"""Document batch model for multi-file uploads."""
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from datetime import datetime
+from app.models.database import Base
+
+
+class DocumentBatch(Base):
+    """Documents uploaded together, processed by a single batch job."""
+
+    __tablename__ = "document_batches"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    total_documents = Column(Integer, nullable=False)  # Files uploaded (rejected duplicates are deleted later)
+    created_at = Column(DateTime, default=datetime.utcnow)
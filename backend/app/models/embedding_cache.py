@@ -0,0 +1,16 @@
+"""Persistent cache of embedding vectors."""
+from sqlalchemy import Column, String, DateTime
+from datetime import datetime
+from app.models.database import Base
+from pgvector.sqlalchemy import Vector
+
+
+class EmbeddingCacheEntry(Base):
+    """Embedding of a normalized text, shared by all users and documents."""
+
+    __tablename__ = "embedding_cache"
+
+    model = Column(String, primary_key=True)
+    text_hash = Column(String(64), primary_key=True)  # SHA-256 of the normalized text
+    embedding = Column(Vector(1536), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,21 @@
+"""Cached filing cabinet tree per user."""
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Text
+from datetime import datetime
+from app.models.database import Base
+
+
+class FilingCabinetCache(Base):
+    """Year > Category > Type document counts of one user.
+
+    ``version`` is bumped in the same transaction as any document insert,
+    move or delete; the cached ``tree`` is valid while ``tree_version``
+    equals ``version``.
+    """
+
+    __tablename__ = "filing_cabinet_cache"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+    tree_version = Column(Integer, nullable=True)  # Version the tree was computed at
+    tree = Column(Text, nullable=True)  # JSON {year: {category: {type: count}}}
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
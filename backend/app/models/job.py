@@ -0,0 +1,47 @@
+"""Processing job model for the durable document queue."""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum as SQLEnum, Index, CheckConstraint
+from datetime import datetime
+import enum
+from app.models.database import Base
+
+
+class JobStatus(str, enum.Enum):
+    """Processing job status."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ProcessingJob(Base):
+    """Queued document processing job, claimed by workers with SKIP LOCKED.
+
+    A job processes either one document (document_id) or all documents of
+    a batch upload (batch_id).
+    """
+
+    __tablename__ = "processing_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), nullable=True, index=True)
+    batch_id = Column(Integer, ForeignKey("document_batches.id", ondelete="CASCADE"), nullable=True)
+    status = Column(SQLEnum(JobStatus), default=JobStatus.QUEUED, nullable=False)
+
+    # Retry bookkeeping
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    run_after = Column(DateTime, default=datetime.utcnow, nullable=False)  # Earliest time the job may run
+    last_error = Column(Text, nullable=True)
+
+    # Lease held by the worker currently running the job
+    locked_by = Column(String, nullable=True)  # "<hostname>:<pid>"
+    locked_at = Column(DateTime, nullable=True)  # Refreshed by the worker heartbeat
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Index for the claim query: next runnable job in FIFO order
+    __table_args__ = (
+        Index("idx_processing_jobs_claim", "status", "run_after", "id"),
+        CheckConstraint("document_id IS NOT NULL OR batch_id IS NOT NULL", name="ck_processing_jobs_target"),
+    )
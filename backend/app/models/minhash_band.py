@@ -0,0 +1,24 @@
+"""MinHash LSH band model."""
+from sqlalchemy import Column, Integer, SmallInteger, BigInteger, ForeignKey, Index
+from app.models.database import Base
+
+
+class DocumentMinHashBand(Base):
+    """One LSH band of a document's MinHash signature.
+
+    Documents of the same user with an equal band hash are near-duplicate
+    candidates (see app.services.minhash_service); the full signature is
+    stored on the document.
+    """
+
+    __tablename__ = "document_minhash_bands"
+
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True)
+    band = Column(SmallInteger, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    band_hash = Column(BigInteger, nullable=False)
+
+    # Index for the candidate lookup: band hashes of a user
+    __table_args__ = (
+        Index("idx_minhash_bands_user_hash", "user_id", "band_hash"),
+    )
@@ -0,0 +1,28 @@
+"""Resumable upload session model."""
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Enum as SQLEnum
+from datetime import datetime
+from app.models.database import Base
+from app.models.document import DocumentType
+
+
+class UploadSession(Base):
+    """File being uploaded in parts, before it becomes a Document.
+
+    The received bytes live in a part file under UPLOAD_DIR (see
+    app.services.upload_session_service); its size is the current offset,
+    so bytes written before a dropped connection are never sent again.
+    """
+
+    __tablename__ = "upload_sessions"
+
+    id = Column(String(36), primary_key=True)  # UUID, used in the upload URLs
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # Document to create on completion
+    original_filename = Column(String, nullable=False)
+    mime_type = Column(String, nullable=True)
+    document_type = Column(SQLEnum(DocumentType), default=DocumentType.OTHER, nullable=False)
+    total_size = Column(BigInteger, nullable=False)  # Declared file size in bytes
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -0,0 +1,33 @@
+"""Incrementally maintained document counters per user."""
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Float, Numeric
+from datetime import datetime
+from app.models.database import Base
+
+
+class UserDocumentStats(Base):
+    """Summary counters of a user's documents.
+
+    Updated in the same transaction as every document insert, update and
+    delete (see app.services.document_stats_service), so statistics never
+    need to aggregate the documents table.
+    """
+
+    __tablename__ = "user_document_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total_documents = Column(Integer, default=0, nullable=False)
+
+    # Documents by type
+    invoice_count = Column(Integer, default=0, nullable=False)
+    letter_count = Column(Integer, default=0, nullable=False)
+    contract_count = Column(Integer, default=0, nullable=False)
+    receipt_count = Column(Integer, default=0, nullable=False)
+    other_count = Column(Integer, default=0, nullable=False)
+
+    documents_with_deadline = Column(Integer, default=0, nullable=False)
+    high_importance_documents = Column(Integer, default=0, nullable=False)  # importance_score > 80
+    importance_score_count = Column(Integer, default=0, nullable=False)  # For the average
+    importance_score_sum = Column(Float, default=0.0, nullable=False)
+    total_amount_extracted = Column(Numeric(14, 2), default=0, nullable=False)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,64 @@
+"""Shared process pool for CPU-bound document processing."""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+from loguru import logger
+
+from app.config import settings
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Get the shared process pool, creating it on first use.
+
+    Workers are started with the 'spawn' method (no fork of a process that
+    already runs threads and DB connections) and recycled after
+    PROCESS_POOL_MAX_TASKS_PER_CHILD tasks to release OpenCV/Tesseract memory.
+    """
+    global _pool
+    if _pool is None:
+        size = settings.PROCESS_POOL_SIZE or os.cpu_count() or 1
+        _pool = ProcessPoolExecutor(
+            max_workers=size,
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=settings.PROCESS_POOL_MAX_TASKS_PER_CHILD or None
+        )
+        logger.info(f"Started process pool with {size} workers")
+    return _pool
+
+
+async def run_in_process_pool(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a picklable, module-level function in the shared process pool.
+
+    The event loop stays free while the function runs.
+
+    Args:
+        func: Module-level function to run
+        *args: Positional arguments (must be picklable)
+        **kwargs: Keyword arguments (must be picklable)
+
+    Returns:
+        Function result
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), partial(func, *args, **kwargs))
+
+
+def shutdown_process_pool(wait: bool = True):
+    """
+    Shut down the shared process pool.
+
+    Args:
+        wait: Wait for running tasks to finish (graceful shutdown)
+    """
+    global _pool
+    if _pool is not None:
+        logger.info("Shutting down process pool")
+        _pool.shutdown(wait=wait, cancel_futures=not wait)
+        _pool = None
@@ -1,8 +1,9 @@
 """Pydantic schemas for request/response validation."""
 from app.schemas.user import UserCreate, UserLogin, UserResponse, Token
-from app.schemas.document import DocumentCreate, DocumentResponse, DocumentUploadResponse
+from app.schemas.document import DocumentCreate, DocumentSummary, DocumentResponse, DocumentUploadResponse
 from app.schemas.chat import ChatRequest, ChatResponse, ConversationResponse
 from app.schemas.dashboard import DashboardStats
+from app.schemas.upload import UploadSessionCreate, UploadSessionResponse
 
 __all__ = [
     "UserCreate",
@@ -10,10 +11,13 @@ __all__ = [
     "UserResponse",
     "Token",
     "DocumentCreate",
+    "DocumentSummary",
     "DocumentResponse",
     "DocumentUploadResponse",
     "ChatRequest",
     "ChatResponse",
     "ConversationResponse",
     "DashboardStats",
+    "UploadSessionCreate",
+    "UploadSessionResponse",
 ]
@@ -22,8 +22,8 @@ class DocumentMetadata(BaseModel):
     classification_confidence: Optional[float] = None
 
 
-class DocumentResponse(BaseModel):
-    """Schema for document response."""
+class DocumentSummary(BaseModel):
+    """Schema for documents in lists (everything but the extracted text)."""
     id: int
     filename: str
     original_filename: str
@@ -31,8 +31,8 @@ class DocumentResponse(BaseModel):
     file_size: Optional[int]
     document_type: DocumentType
     status: DocumentStatus
+    processing_stage: Optional[str] = None
     created_at: datetime
-    extracted_text: Optional[str]
     
     # Filing cabinet fields
     storage_year: Optional[int] = None
@@ -57,6 +57,24 @@ class DocumentResponse(BaseModel):
         from_attributes = True
 
 
+class DocumentResponse(DocumentSummary):
+    """Schema for document response."""
+    extracted_text: Optional[str]
+
+
+class DocumentText(BaseModel):
+    """Schema for the extracted text of a document."""
+    id: int
+    extracted_text: Optional[str]
+    length: int
+
+
+class DocumentSearchHit(DocumentSummary):
+    """Schema for a full-text search result."""
+    rank: Optional[float] = None
+    snippet: Optional[str] = None  # Matching text with <mark> highlights
+
+
 class DocumentUpdate(BaseModel):
     """Schema for updating document metadata."""
     display_name: Optional[str] = None
@@ -87,6 +105,37 @@ class DocumentUploadResponse(BaseModel):
     document: DocumentResponse
 
 
+class DocumentDuplicateFile(BaseModel):
+    """Schema for an uploaded file rejected as an exact duplicate."""
+    filename: str
+    duplicate_of_id: int  # Document with the same content
+
+
+class DocumentBatchUploadResponse(BaseModel):
+    """Schema for batch upload response."""
+    message: str
+    batch_id: int
+    documents: List[DocumentSummary]
+    duplicates: List[DocumentDuplicateFile] = []  # Not stored (already uploaded, or twice in the batch)
+
+
+class DocumentBatchItem(DocumentSummary):
+    """Schema for a document in batch progress."""
+    progress: float  # Share of pipeline stages completed (0-1)
+
+
+class DocumentBatchProgress(BaseModel):
+    """Schema for the processing progress of a batch upload."""
+    batch_id: int
+    total_documents: int
+    completed: int
+    processing: int
+    pending: int
+    failed: int
+    removed: int  # Rejected as exact duplicates (deleted)
+    documents: List[DocumentBatchItem]
+
+
 class DocumentStatistics(BaseModel):
     """Schema for document statistics."""
     total_documents: int
@@ -136,7 +185,7 @@ class FilingCabinetHierarchicalOverview(BaseModel):
 
 class DocumentSearchResult(BaseModel):
     """Schema for document search result with hierarchy context."""
-    document: DocumentResponse
+    document: DocumentSummary
     year: int
     category: str
     document_type: str
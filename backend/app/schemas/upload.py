@@ -0,0 +1,22 @@
+"""Resumable upload schemas."""
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional
+from app.models.document import DocumentType
+
+
+class UploadSessionCreate(BaseModel):
+    """Schema for starting a resumable upload."""
+    filename: str = Field(..., min_length=1)
+    size: int = Field(..., gt=0)  # Total file size in bytes
+    mime_type: Optional[str] = None
+    document_type: DocumentType = DocumentType.OTHER
+
+
+class UploadSessionResponse(BaseModel):
+    """Schema for the state of a resumable upload."""
+    upload_id: str
+    offset: int  # Bytes received; the next part starts here
+    size: int
+    part_size: int  # Suggested part size in bytes
+    expires_at: datetime
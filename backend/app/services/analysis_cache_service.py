@@ -0,0 +1,184 @@
+"""Content-addressed cache of OCR and analysis results."""
+import json
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from loguru import logger
+
+from app.config import settings
+from app.models.analysis_cache import AnalysisCacheEntry
+
+
+class AnalysisCacheService:
+    """Service to look up and store OCR/analysis results by file hash.
+
+    A hit gives the pipeline the OCR text, its confidence, the DocumentAgent
+    metadata and a copy of the searchable PDF, so neither OCR nor the OpenAI
+    call run again for a file that was already analyzed.
+    """
+
+    # Process-wide counters (the persistent hit count lives on each entry)
+    hits = 0
+    misses = 0
+
+    def __init__(self, ocr_engine: str, languages: List[str]):
+        self.enabled = settings.ANALYSIS_CACHE_ENABLED
+        self.ocr_engine = ocr_engine
+        self.languages = "+".join(languages)
+        self.pipeline_version = settings.PIPELINE_VERSION
+        self.pdf_dir = Path(settings.UPLOAD_DIR) / ".cache" / "ocr"
+
+    def lookup(self, db: Session, file_hash: str) -> Optional[AnalysisCacheEntry]:
+        """
+        Find the cached result for a file.
+
+        Args:
+            db: Database session
+            file_hash: SHA-256 of the file content
+
+        Returns:
+            Cache entry, or None on a miss
+        """
+        if not self.enabled or not file_hash:
+            return None
+
+        entry = db.query(AnalysisCacheEntry)\
+            .filter(AnalysisCacheEntry.file_hash == file_hash)\
+            .filter(AnalysisCacheEntry.ocr_engine == self.ocr_engine)\
+            .filter(AnalysisCacheEntry.languages == self.languages)\
+            .filter(AnalysisCacheEntry.pipeline_version == self.pipeline_version)\
+            .first()
+
+        if entry is None:
+            AnalysisCacheService.misses += 1
+            logger.debug(f"Analysis cache miss for {file_hash[:12]}")
+            return None
+
+        AnalysisCacheService.hits += 1
+        entry.hit_count += 1
+        entry.last_used_at = datetime.utcnow()
+        logger.info(f"♻️ Analysis cache hit for {file_hash[:12]} (entry {entry.id})")
+        return entry
+
+    def store(
+        self,
+        db: Session,
+        file_hash: str,
+        ocr: Dict[str, Any],
+        extracted_text: str,
+        metadata: Dict[str, Any],
+        pdf_path: Optional[str] = None
+    ) -> Optional[AnalysisCacheEntry]:
+        """
+        Store OCR and analysis results for a file.
+
+        Runs in its own savepoint so a concurrent insert of the same key does
+        not abort the caller's transaction.
+
+        Args:
+            db: Database session
+            file_hash: SHA-256 of the file content
+            ocr: OCR result summary ('confidence', 'method', 'pages')
+            extracted_text: OCR text
+            metadata: DocumentAgent metadata
+            pdf_path: Searchable PDF to keep a copy of
+
+        Returns:
+            Created entry, or None if nothing was cached
+        """
+        if not self.enabled or not file_hash or not extracted_text:
+            return None
+        if not metadata.get('confidence'):
+            # Default metadata from a failed LLM call: let the next run retry
+            return None
+
+        entry = AnalysisCacheEntry(
+            file_hash=file_hash,
+            ocr_engine=self.ocr_engine,
+            languages=self.languages,
+            pipeline_version=self.pipeline_version,
+            extracted_text=extracted_text,
+            ocr_confidence=ocr.get('confidence'),
+            ocr_method=ocr.get('method'),
+            ocr_pages=ocr.get('pages'),
+            analysis_metadata=json.dumps(metadata, default=str)
+        )
+
+        try:
+            with db.begin_nested():
+                db.add(entry)
+                db.flush()
+        except IntegrityError:
+            logger.debug(f"Analysis cache entry for {file_hash[:12]} already stored")
+            return None
+
+        if pdf_path and Path(pdf_path).exists():
+            try:
+                self.pdf_dir.mkdir(parents=True, exist_ok=True)
+                cached_pdf = self.pdf_dir / f"{entry.id}.pdf"
+                shutil.copy2(pdf_path, cached_pdf)
+                entry.pdf_path = str(cached_pdf)
+            except OSError as e:
+                logger.warning(f"Could not cache searchable PDF: {e}")
+
+        logger.info(f"Stored analysis cache entry {entry.id} for {file_hash[:12]}")
+        return entry
+
+    def copy_cached_pdf(self, entry: AnalysisCacheEntry, output_path: str) -> Optional[str]:
+        """
+        Copy the cached searchable PDF of an entry.
+
+        Args:
+            entry: Cache entry
+            output_path: Destination path
+
+        Returns:
+            Output path, or None if no cached PDF is available
+        """
+        if not entry.pdf_path or not Path(entry.pdf_path).exists():
+            return None
+        shutil.copy2(entry.pdf_path, output_path)
+        return output_path
+
+    @staticmethod
+    def get_metadata(entry: AnalysisCacheEntry) -> Dict[str, Any]:
+        """Decoded DocumentAgent metadata of an entry."""
+        try:
+            return json.loads(entry.analysis_metadata) if entry.analysis_metadata else {}
+        except (ValueError, TypeError):
+            return {}
+
+    @classmethod
+    def get_stats(cls, db: Session) -> Dict[str, Any]:
+        """
+        Cache statistics.
+
+        Every entry was created by a miss that ran OCR and the LLM, so the
+        persistent miss count equals the number of entries.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Dict with persistent totals and counters of the current process
+        """
+        entries, total_hits = db.query(
+            func.count(AnalysisCacheEntry.id),
+            func.coalesce(func.sum(AnalysisCacheEntry.hit_count), 0)
+        ).one()
+        lookups = entries + total_hits
+
+        return {
+            'entries': entries,
+            'hits': int(total_hits),
+            'misses': entries,
+            'hit_rate': round(total_hits / lookups, 3) if lookups else 0.0,
+            'process': {
+                'hits': cls.hits,
+                'misses': cls.misses,
+            }
+        }
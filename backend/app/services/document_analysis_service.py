@@ -1,5 +1,5 @@
 """Document analysis orchestration service."""
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 from pathlib import Path
 from loguru import logger
 import json
@@ -35,41 +35,16 @@ class DocumentAnalysisService:
             logger.info(f"Starting analysis for document: {file_path}")
             
             # Step 1: Extract text using OCR
-            ocr_result = await self._extract_text(file_path, mime_type)
-            extracted_text = ocr_result['text']
-            ocr_confidence = ocr_result['confidence']
-            ocr_method = ocr_result['method']
+            ocr_result = await self.extract_text(file_path, mime_type)
             
-            if not extracted_text or not extracted_text.strip():
-                logger.warning(f"No text extracted from document: {file_path}")
-                return {
-                    'extracted_text': '',
-                    'ocr_confidence': 0.0,
-                    'ocr_method': ocr_method,
-                    'metadata': self._get_empty_metadata()
-                }
-            
-            logger.info(f"Extracted {len(extracted_text)} characters using {ocr_method} (confidence: {ocr_confidence:.2f})")
-            
-            # Step 2: Analyze with DocumentAgent
-            analysis_result = await self.document_agent.analyze_document(
-                extracted_text=extracted_text,
-                ocr_confidence=ocr_confidence
+            # Step 2: Analyze extracted text
+            return await self.analyze_text(
+                extracted_text=ocr_result['text'],
+                ocr_confidence=ocr_result['confidence'],
+                ocr_method=ocr_result['method'],
+                ocr_words=ocr_result.get('words', [])
             )
             
-            # Step 3: Prepare final result
-            result = {
-                'extracted_text': extracted_text,
-                'ocr_confidence': ocr_confidence,
-                'ocr_method': ocr_method,
-                'metadata': analysis_result
-            }
-            
-            logger.info(f"Document analysis complete: type={analysis_result.get('document_type')}, "
-                       f"importance={analysis_result.get('importance_score'):.1f}")
-            
-            return result
-            
         except Exception as e:
             logger.error(f"Error in document analysis pipeline: {e}")
             return {
@@ -79,7 +54,60 @@ class DocumentAnalysisService:
                 'metadata': self._get_empty_metadata()
             }
     
-    async def _extract_text(self, file_path: str, mime_type: Optional[str]) -> Dict[str, Any]:
+    async def analyze_text(
+        self,
+        extracted_text: str,
+        ocr_confidence: float,
+        ocr_method: str,
+        ocr_words: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        AI analysis of text that was already extracted (no OCR pass).
+        
+        Args:
+            extracted_text: Document text
+            ocr_confidence: OCR confidence (0.0-1.0)
+            ocr_method: Engine that produced the text
+            ocr_words: Optional word boxes from local OCR
+            
+        Returns:
+            Dict with all extracted data and metadata
+        """
+        ocr_words = ocr_words or []
+        
+        if not extracted_text or not extracted_text.strip():
+            logger.warning(f"No text extracted from document")
+            return {
+                'extracted_text': '',
+                'ocr_confidence': 0.0,
+                'ocr_method': ocr_method,
+                'ocr_words': ocr_words,
+                'metadata': self._get_empty_metadata()
+            }
+        
+        logger.info(f"Extracted {len(extracted_text)} characters using {ocr_method} (confidence: {ocr_confidence:.2f})")
+        
+        # Analyze with DocumentAgent
+        analysis_result = await self.document_agent.analyze_document(
+            extracted_text=extracted_text,
+            ocr_confidence=ocr_confidence
+        )
+        
+        # Prepare final result
+        result = {
+            'extracted_text': extracted_text,
+            'ocr_confidence': ocr_confidence,
+            'ocr_method': ocr_method,
+            'ocr_words': ocr_words,  # Word boxes (local OCR only)
+            'metadata': analysis_result
+        }
+        
+        logger.info(f"Document analysis complete: type={analysis_result.get('document_type')}, "
+                    f"importance={analysis_result.get('importance_score'):.1f}")
+        
+        return result
+    
+    async def extract_text(self, file_path: str, mime_type: Optional[str]) -> Dict[str, Any]:
         """
         Extract text from document based on file type.
         
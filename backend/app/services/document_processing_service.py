@@ -0,0 +1,616 @@
+"""Document processing pipeline run by the background worker."""
+import asyncio
+import os
+import json
+import shutil
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable, Awaitable, NamedTuple
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from app.config import settings
+from app.models.database import ShortSessionLocal
+from app.models.document import Document, DocumentChunk, DocumentStatus, ProcessingStage
+from app.models.analysis_cache import AnalysisCacheEntry
+from app.services.document_service import DocumentService
+from app.services.embedding_service import EmbeddingService, EmbeddingRequestError
+from app.services.document_analysis_service import DocumentAnalysisService
+from app.services.duplicate_detection_service import DuplicateDetectionService
+from app.services.minhash_service import MinHashService
+from app.services.pdf_conversion_service import PDFConversionService
+from app.services.filing_cabinet_service import FilingCabinetService
+from app.services.image_preprocessing_service import ImagePreprocessingService
+from app.services.analysis_cache_service import AnalysisCacheService
+from app.services.progress_service import ProgressService, REMOVED_EVENT
+from app.services import document_stats_service  # noqa: F401 - keeps user_document_stats in sync
+
+
+# Stage order; processing_stage stores the last completed entry
+PIPELINE_STAGES: List[ProcessingStage] = list(ProcessingStage)
+
+# OCR engine and languages (part of the analysis cache key)
+OCR_ENGINE = "ocrmypdf"
+OCR_LANGUAGES = ['fra', 'deu', 'eng']
+
+# Database write queued by a stage, run in the transaction of its checkpoint
+StageWrite = Callable[[Session], None]
+
+
+class PipelineRun(NamedTuple):
+    """Detached document being processed, its checkpoint state and the stages left."""
+    document: Document
+    state: Dict[str, Any]
+    remaining: List[ProcessingStage]
+
+
+class DocumentProcessingService:
+    """Service running the ingestion pipeline for a document (or a batch) as resumable stages.
+
+    Each stage stores its output (on the Document row or in the JSON
+    ``processing_state`` checkpoint) and records itself in
+    ``processing_stage`` in the same commit. Intermediate files live in a
+    per-document work directory under UPLOAD_DIR instead of /tmp, so a retried
+    or reclaimed job continues after the last completed stage.
+
+    The document is kept detached between stages. Every database access
+    opens its own short session, so no connection is held while OCR, the
+    LLM or the embeddings API run; stage results are written by the
+    checkpoint transaction, which also publishes the stage as a progress
+    event (see app.services.progress_service).
+    """
+
+    def __init__(self):
+        self.session_factory = ShortSessionLocal
+        self.doc_service = DocumentService()
+        self.embedding_service = EmbeddingService()
+        self.analysis_service = DocumentAnalysisService()
+        self.duplicate_service = DuplicateDetectionService()
+        self.minhash_service = MinHashService()
+        self.pdf_conversion_service = PDFConversionService()
+        self.filing_cabinet_service = FilingCabinetService()
+        self.preprocessing_service = ImagePreprocessingService()
+        self.analysis_cache = AnalysisCacheService(OCR_ENGINE, OCR_LANGUAGES)
+
+    @staticmethod
+    def get_work_dir(document_id: int) -> Path:
+        """Directory holding intermediate pipeline files for a document."""
+        return Path(settings.UPLOAD_DIR) / ".work" / str(document_id)
+
+    @classmethod
+    def remove_work_dir(cls, document_id: int):
+        """Delete intermediate pipeline files for a document."""
+        work_dir = cls.get_work_dir(document_id)
+        if work_dir.exists():
+            shutil.rmtree(work_dir, ignore_errors=True)
+            logger.debug(f"Removed work directory: {work_dir}")
+
+    def _stage_handlers(self) -> Dict[ProcessingStage, Callable[[Document, Dict[str, Any], List[StageWrite]], Awaitable[bool]]]:
+        return {
+            ProcessingStage.HASHED: self._hash_file,
+            ProcessingStage.PREPROCESSED: self._preprocess_image,
+            ProcessingStage.OCR_COMPLETED: self._run_ocr,
+            ProcessingStage.ANALYZED: self._analyze,
+            ProcessingStage.YEAR_ASSIGNED: self._assign_storage_year,
+            ProcessingStage.FILED: self._file_document,
+            ProcessingStage.EMBEDDED: self._embed_chunks,
+            ProcessingStage.DEDUP_CHECKED: self._detect_duplicates,
+            ProcessingStage.COMPLETED: self._complete,
+        }
+
+    async def process_document(self, document_id: int):
+        """
+        Process document with enhanced analysis and filing cabinet organization.
+
+        Resumes after the last checkpointed stage. Exceptions propagate to the
+        caller so the job queue can retry the job.
+
+        Args:
+            document_id: Document to process
+        """
+        run = self._start(document_id)
+        if run is not None:
+            await self._run_stages(run.document, run.state, run.remaining)
+
+    async def process_batch(self, batch_id: int):
+        """
+        Process all documents of a batch upload.
+
+        Documents run the stages before embedding concurrently
+        (BATCH_PROCESSING_CONCURRENCY at a time) on this service's OCR
+        process pool and API clients; their chunks are then embedded
+        together, so embedding requests are filled across documents. A
+        failing document does not stop the others: the error is raised at
+        the end so the job is retried, and finished documents are skipped.
+
+        Args:
+            batch_id: Batch to process
+        """
+        with self.session_factory() as db:
+            document_ids = [
+                document_id for (document_id,) in db.query(Document.id)
+                .filter(Document.batch_id == batch_id)
+                .order_by(Document.id)
+            ]
+
+        runs = [run for run in map(self._start, document_ids) if run is not None]
+        logger.info(f"Processing batch {batch_id}: {len(runs)} of {len(document_ids)} documents to process")
+
+        failures: Dict[int, Exception] = {}
+        semaphore = asyncio.Semaphore(max(1, settings.BATCH_PROCESSING_CONCURRENCY))
+
+        async def run_stages(run: PipelineRun, stages: List[ProcessingStage]) -> bool:
+            async with semaphore:
+                try:
+                    return await self._run_stages(run.document, run.state, stages)
+                except Exception as e:
+                    logger.error(f"❌ Error processing document {run.document.id} of batch {batch_id}: {e}")
+                    failures[run.document.id] = e
+                    return False
+
+        embedding_index = PIPELINE_STAGES.index(ProcessingStage.EMBEDDED)
+
+        def before_embedding(run: PipelineRun) -> List[ProcessingStage]:
+            return [stage for stage in run.remaining if PIPELINE_STAGES.index(stage) < embedding_index]
+
+        def after_embedding(run: PipelineRun) -> List[ProcessingStage]:
+            return [stage for stage in run.remaining if PIPELINE_STAGES.index(stage) > embedding_index]
+
+        keep_going = await asyncio.gather(*(run_stages(run, before_embedding(run)) for run in runs))
+        runs = [run for run, keep in zip(runs, keep_going) if keep]
+
+        to_embed = [run for run in runs if ProcessingStage.EMBEDDED in run.remaining]
+        try:
+            embedding_failures = await self._embed_documents(to_embed)
+        except Exception as e:
+            embedding_failures = {run.document.id: e for run in to_embed}
+        for document_id, e in embedding_failures.items():
+            logger.error(f"❌ Error embedding document {document_id} of batch {batch_id}: {e}")
+        failures.update(embedding_failures)
+        runs = [run for run in runs if run.document.id not in embedding_failures]
+
+        await asyncio.gather(*(run_stages(run, after_embedding(run)) for run in runs))
+
+        if failures:
+            details = "; ".join(f"document {document_id}: {e}" for document_id, e in failures.items())
+            raise RuntimeError(f"{len(failures)} of {len(document_ids)} documents of batch {batch_id} failed: {details}")
+
+    def _start(self, document_id: int) -> Optional[PipelineRun]:
+        """Load the document, mark it as processing and return it detached with its checkpoint."""
+        with self.session_factory() as db:
+            document = db.get(Document, document_id)
+            if not document:
+                logger.error(f"Document {document_id} not found")
+                return None
+
+            if document.processing_stage == ProcessingStage.COMPLETED.value:
+                logger.info(f"Document {document_id} already processed")
+                return None
+
+            # Update status to processing
+            document.status = DocumentStatus.PROCESSING
+            ProgressService.publish(db, document, "processing")
+            db.commit()
+
+        if document.processing_stage:
+            logger.info(f"Resuming document {document_id} after stage '{document.processing_stage}'")
+        return PipelineRun(document, self._load_state(document), self._remaining_stages(document.processing_stage))
+
+    async def _run_stages(self, document: Document, state: Dict[str, Any], stages: List[ProcessingStage]) -> bool:
+        """Run stages in order, checkpointing each; False if the document was removed (exact duplicate)."""
+        handlers = self._stage_handlers()
+        for stage in stages:
+            writes: List[StageWrite] = []
+            keep_going = await handlers[stage](document, state, writes)
+            if not keep_going:
+                return False
+            self._checkpoint(document, stage, state, writes)
+        return True
+
+    def _remaining_stages(self, last_completed: str) -> List[ProcessingStage]:
+        if not last_completed:
+            return PIPELINE_STAGES
+        try:
+            index = PIPELINE_STAGES.index(ProcessingStage(last_completed))
+        except ValueError:
+            logger.warning(f"Unknown processing stage '{last_completed}', restarting pipeline")
+            return PIPELINE_STAGES
+        return PIPELINE_STAGES[index + 1:]
+
+    def _load_state(self, document: Document) -> Dict[str, Any]:
+        if not document.processing_state:
+            return {}
+        try:
+            return json.loads(document.processing_state)
+        except (ValueError, TypeError):
+            logger.warning(f"Invalid processing state for document {document.id}, ignoring it")
+            return {}
+
+    def _checkpoint(self, document: Document, stage: ProcessingStage, state: Dict[str, Any], writes: List[StageWrite]):
+        """Persist stage output, queued writes and marker in one short transaction."""
+        with self.session_factory() as db:
+            db.add(document)  # Re-attach; only the attributes changed by the stage are updated
+            for write in writes:
+                write(db)
+            document.processing_stage = stage.value
+            document.processing_state = json.dumps(state, default=str)
+            ProgressService.publish(db, document)
+            db.commit()
+        logger.debug(f"Document {document.id} checkpoint: {stage.value}")
+
+    async def _hash_file(self, document: Document, state: Dict[str, Any], writes: List[StageWrite]) -> bool:
+        """Step 1: Reject exact duplicates, then look up the analysis cache by file hash (computed at upload)."""
+        if not document.file_hash:  # Uploaded before hashes were stored at upload time
+            file_hash = self.duplicate_service.calculate_file_hash(document.file_path)
+            if file_hash:
+                document.file_hash = file_hash
+
+        # Identical content already analyzed: reuse OCR text and metadata
+        state['cache_entry_id'] = None
+        with self.session_factory() as db:
+            # Same file as an older document of the user (e.g. uploaded concurrently): no need to go further
+            original_id = self.duplicate_service.find_exact_duplicates(
+                document.user_id, [document.file_hash], db, before_id=document.id
+            ).get(document.file_hash)
+            if original_id is not None:
+                db.rollback()
+                logger.warning(f"🚫 EXACT DUPLICATE detected for document {document.id}: "
+                               f"original={original_id}, method=exact_hash")
+                self._remove_duplicate(document, original_id)
+                return False
+
+            entry = self.analysis_cache.lookup(db, document.file_hash)
+            db.commit()  # Hit counter
+        if entry:
+            state['cache_entry_id'] = entry.id
+            document.extracted_text = entry.extracted_text
+            state['ocr'] = {
+                'confidence': entry.ocr_confidence,
+                'method': entry.ocr_method,
+                'pages': entry.ocr_pages
+            }
+        return True
+
+    def _cache_entry(self, state: Dict[str, Any]) -> Optional[AnalysisCacheEntry]:
+        """Cache entry found when hashing, if it still exists (detached)."""
+        entry_id = state.get('cache_entry_id')
+        if not entry_id:
+            return None
+        with self.session_factory() as db:
+            return db.get(AnalysisCacheEntry, entry_id)
+
+    async def _preprocess_image(self, document: Document, state: Dict[str, Any], writes: List[StageWrite]) -> bool:
+        """Step 2: Preprocess image (auto-crop, deskew, enhance) if it's an image."""
+        state['preprocessed_path'] = None
+        if not (document.mime_type and document.mime_type.startswith('image/')):
+            return True
+        if state.get('cache_entry_id'):
+            return True  # OCR is skipped, nothing to preprocess for
+
+        logger.info(f"Preprocessing image for document {document.id}")
+        work_dir = self.get_work_dir(document.id)
+        work_dir.mkdir(parents=True, exist_ok=True)
+
+        success, preprocessed_path = await self.preprocessing_service.preprocess_for_ocr_async(
+            document.file_path,
+            str(work_dir / "preprocessed.jpg")
+        )
+
+        if success:
+            state['preprocessed_path'] = preprocessed_path
+            logger.info(f"✓ Image preprocessing successful for document {document.id}")
+        else:
+            logger.warning("Image preprocessing failed, using original")
+        return True
+
+    def _ocr_source_path(self, document: Document, state: Dict[str, Any]) -> str:
+        """Preprocessed image when available, otherwise the original file."""
+        preprocessed_path = state.get('preprocessed_path')
+        if preprocessed_path and os.path.exists(preprocessed_path):
+            return preprocessed_path
+        return document.file_path
+
+    async def _run_ocr(self, document: Document, state: Dict[str, Any], writes: List[StageWrite]) -> bool:
+        """Step 3: Single OCR pass producing both the searchable PDF and the document text."""
+        logger.info(f"Running OCR for document {document.id}")
+        work_dir = self.get_work_dir(document.id)
+        work_dir.mkdir(parents=True, exist_ok=True)
+        sidecar_path = work_dir / "ocr.txt"
+        if sidecar_path.exists():
+            sidecar_path.unlink()  # Left over from an interrupted attempt
+
+        entry = self._cache_entry(state)
+        if entry:
+            cached_pdf = self.analysis_cache.copy_cached_pdf(entry, str(work_dir / "searchable.pdf"))
+            if cached_pdf:
+                state['pdf_path'] = cached_pdf
+                logger.info(f"Reused cached OCR for document {document.id}")
+                return True
+            # Text is cached but the PDF is gone: rebuild the PDF only
+            sidecar_path = None
+        elif state.get('cache_entry_id'):
+            state['cache_entry_id'] = None  # Entry was removed meanwhile
+
+        source_path = self._ocr_source_path(document, state)
+        success, ocr_pdf_path, error = await self.pdf_conversion_service.ensure_searchable_pdf(
+            source_path,
+            str(work_dir / "searchable.pdf"),
+            languages=OCR_LANGUAGES,
+            sidecar_path=str(sidecar_path) if sidecar_path else None
+        )
+
+        if success:
+            state['pdf_path'] = ocr_pdf_path
+            logger.info(f"Successfully created searchable PDF for document {document.id}")
+        else:
+            # Continue with original file
+            state['pdf_path'] = None
+            logger.warning(f"PDF conversion failed for document {document.id}: {error}")
+
+        if entry:
+            return True
+
+        ocr_result = self.pdf_conversion_service.read_sidecar_text(str(sidecar_path)) if success else None
+        if not ocr_result or not ocr_result['text']:
+            # No sidecar (PDF with an existing text layer) or OCRmyPDF failed:
+            # read the text layer, or OCR the file directly
+            ocr_result = await self.analysis_service.extract_text(source_path, document.mime_type)
+
+        document.extracted_text = ocr_result['text']
+        state['ocr'] = {
+            'confidence': ocr_result['confidence'],
+            'method': ocr_result['method'],
+            'pages': ocr_result.get('pages', 1)
+        }
+        # Word boxes are only available from the direct Tesseract fallback
+        state['ocr_words'] = ocr_result.get('words', [])
+
+        logger.info(f"Extracted {len(document.extracted_text)} characters from document {document.id} "
+                    f"using {ocr_result['method']}")
+        return True
+
+    async def _analyze(self, document: Document, state: Dict[str, Any], writes: List[StageWrite]) -> bool:
+        """Step 4: AI analysis of the OCR text and metadata update."""
+        ocr = state.get('ocr', {})
+        entry = self._cache_entry(state)
+        if entry:
+            logger.info(f"Using cached analysis for document {document.id}")
+            analysis_result = {
+                'extracted_text': entry.extracted_text,
+                'ocr_confidence': entry.ocr_confidence,
+                'ocr_method': entry.ocr_method,
+                'metadata': self.analysis_cache.get_metadata(entry)
+            }
+        else:
+            logger.info(f"Starting intelligent analysis for document {document.id}")
+            analysis_result = await self.analysis_service.analyze_text(
+                extracted_text=document.extracted_text or '',
+                ocr_confidence=ocr.get('confidence', 0.0),
+                ocr_method=ocr.get('method', 'unknown')
+            )
+            with self.session_factory() as db:
+                self.analysis_cache.store(
+                    db,
+                    document.file_hash,
+                    ocr,
+                    analysis_result.get('extracted_text', ''),
+                    analysis_result.get('metadata', {}),
+                    pdf_path=state.get('pdf_path')
+                )
+                db.commit()
+
+        # Update all fields
+        db_fields = self.analysis_service.prepare_database_fields(analysis_result)
+        for field, value in db_fields.items():
+            setattr(document, field, value)
+
+        # OCR text is kept in extracted_text; checkpoint the rest
+        state['analysis'] = {
+            'ocr_confidence': analysis_result.get('ocr_confidence'),
+            'ocr_method': analysis_result.get('ocr_method'),
+            'metadata': analysis_result.get('metadata', {})
+        }
+
+        importance_str = f"{document.importance_score:.1f}" if document.importance_score else "N/A"
+        logger.info(f"Document {document.id} metadata updated: "
+                    f"type={document.document_type}, "
+                    f"importance={importance_str}")
+        return True
+
+    async def _assign_storage_year(self, document: Document, state: Dict[str, Any], writes: List[StageWrite]) -> bool:
+        """Step 5: Determine storage year for filing cabinet."""
+        document.storage_year = self.filing_cabinet_service.determine_storage_year(
+            document.document_date,
+            document.created_at
+        )
+        logger.info(f"Document {document.id} storage year: {document.storage_year}")
+        return True
+
+    async def _file_document(self, document: Document, state: Dict[str, Any], writes: List[StageWrite]) -> bool:
+        """Step 6: Organize files in filing cabinet structure (3-level hierarchy)."""
+        pdf_path = state.get('pdf_path')
+        if not pdf_path or not os.path.exists(pdf_path):
+            return True
+
+        # Use original file (not preprocessed) for storage, but preprocessed was used for OCR/PDF
+        category = state.get('analysis', {}).get('metadata', {}).get('category', 'General')
+        organized_original_path, organized_ocr_path = await self.filing_cabinet_service.store_document(
+            original_file_path=document.file_path,
+            ocr_pdf_path=pdf_path,
+            year=document.storage_year,
+            document_type=document.document_type,
+            original_filename=document.original_filename,
+            category=category
+        )
+
+        document.category = category
+        document.file_path = organized_original_path
+        document.ocr_pdf_path = organized_ocr_path
+
+        logger.info(f"Document {document.id} organized in filing cabinet: "
+                    f"{document.storage_year}/{category}/{document.document_type.value}")
+        return True
+
+    async def _embed_chunks(self, document: Document, state: Dict[str, Any], writes: List[StageWrite]) -> bool:
+        """Step 7: Generate chunks from the OCR text and embeddings for RAG."""
+        state['chunk_ids'] = []
+        if not document.extracted_text:
+            return True
+
+        chunks = self.doc_service.create_chunks(document.extracted_text)
+        rows = await self.embedding_service.embed_chunks(document.id, chunks, user_id=document.user_id)
+        writes.append(self._chunk_writer(document, state, rows))
+        return True
+
+    async def _embed_documents(self, runs: List[PipelineRun]) -> Dict[int, Exception]:
+        """
+        Step 7 for several documents, sharing embedding requests.
+
+        Documents with a chunk in a failed request are not checkpointed (the
+        others are), so a retry of the job embeds only those.
+
+        Returns:
+            Error by ID of the documents whose embedding failed
+        """
+        chunks = {
+            run.document.id: (self.doc_service.create_chunks(run.document.extracted_text), run.document.user_id)
+            for run in runs
+            if run.document.extracted_text
+        }
+        failures: Dict[int, Exception] = {}
+        try:
+            rows = await self.embedding_service.embed_documents(chunks) if chunks else {}
+        except EmbeddingRequestError as e:
+            rows = e.rows
+            failures = {document_id: e for document_id in e.failed_documents}
+
+        for run in runs:
+            if run.document.id in failures:
+                continue
+            writes: List[StageWrite] = []
+            run.state['chunk_ids'] = []
+            if run.document.id in rows:
+                writes.append(self._chunk_writer(run.document, run.state, rows[run.document.id]))
+            self._checkpoint(run.document, ProcessingStage.EMBEDDED, run.state, writes)
+        return failures
+
+    def _chunk_writer(self, document: Document, state: Dict[str, Any], rows: List[Dict[str, Any]]) -> StageWrite:
+        """Checkpoint write replacing the chunks of a document with embedded rows."""
+        def replace_chunks(db: Session):
+            # Drop chunks left behind by an earlier, interrupted attempt
+            db.query(DocumentChunk)\
+                .filter(DocumentChunk.document_id == document.id)\
+                .delete(synchronize_session=False)
+            chunk_objects = self.embedding_service.save_chunks(rows, db)
+            state['chunk_ids'] = [chunk.id for chunk in chunk_objects]
+            logger.info(f"Created {len(chunk_objects)} embeddings for document {document.id}")
+
+        return replace_chunks
+
+    async def _detect_duplicates(self, document: Document, state: Dict[str, Any], writes: List[StageWrite]) -> bool:
+        """Step 8: Detect duplicates - BLOCK if the file is byte-identical, flag near-duplicates."""
+        document_id = document.id
+        # MinHash of the whole text; stored with its LSH bands for later uploads
+        signature = await asyncio.to_thread(self.minhash_service.signature, document.extracted_text)
+        writes.append(lambda db: self.duplicate_service.store_signature(document, signature, db))
+        try:
+            with self.session_factory() as db:
+                is_duplicate, original_id, similarity, method = await self.duplicate_service.detect_duplicate(
+                    document_id=document_id,
+                    file_path=document.file_path,
+                    user_id=document.user_id,
+                    db=db,
+                    extracted_text=document.extracted_text,
+                    metadata=state.get('analysis', {}).get('metadata', {}),
+                    file_hash=document.file_hash,
+                    signature=signature
+                )
+
+            if is_duplicate and method == "exact_hash":
+                # Same bytes (e.g. two concurrent uploads): delete the duplicate, keep the original.
+                # A MinHash estimate (about +-0.03) can't tell two bills of one template apart.
+                logger.warning(f"🚫 EXACT DUPLICATE detected for document {document_id}: "
+                               f"original={original_id}, similarity={similarity:.2f}, method={method}")
+                self._remove_duplicate(document, original_id)
+                return False  # Exit processing
+            elif is_duplicate:
+                # Mark as potential duplicate but keep it
+                document.is_duplicate = True
+                document.duplicate_of_id = original_id
+                document.similarity_score = similarity
+                logger.warning(f"⚠️ Potential duplicate detected for document {document_id}: "
+                               f"original={original_id}, similarity={similarity:.2f}, method={method}")
+            else:
+                logger.info(f"✅ No duplicate found for document {document_id}")
+        except Exception as e:
+            # Don't fail the whole process if duplicate detection fails
+            # (the lookup session was discarded, the document is unchanged)
+            logger.error(f"Error in duplicate detection for document {document_id}: {e}")
+        return True
+
+    def _remove_duplicate(self, document: Document, original_id: int):
+        """Delete an exact duplicate (files and row), keeping the original document."""
+        logger.warning(f"🗑️ Rejecting duplicate and keeping original document {original_id}")
+
+        # Delete files
+        self.filing_cabinet_service.delete_document_files(document)
+        self.remove_work_dir(document.id)
+
+        # Delete from database
+        with self.session_factory() as db:
+            db.add(document)
+            db.delete(document)
+            ProgressService.publish(db, document, REMOVED_EVENT)
+            db.commit()
+
+        logger.info(f"✅ Duplicate document {document.id} removed, original {original_id} kept")
+
+    async def _complete(self, document: Document, state: Dict[str, Any], writes: List[StageWrite]) -> bool:
+        """Step 9: Mark as completed and drop intermediate files."""
+        document.status = DocumentStatus.COMPLETED
+        state.pop('preprocessed_path', None)
+        state.pop('pdf_path', None)
+        self.remove_work_dir(document.id)
+
+        category_str = document.category or 'General'
+        logger.info(f"✅ Document {document.id} processed successfully and filed in "
+                    f"{document.storage_year}/{category_str}/{document.document_type.value}")
+        return True
+
+    def set_status(self, document_id: int, status: DocumentStatus, db: Session):
+        """
+        Set the processing status of a document.
+
+        The stage checkpoint is left untouched so a retry resumes from it.
+
+        Args:
+            document_id: Document ID
+            status: New status
+            db: Database session
+        """
+        document = db.query(Document).filter(Document.id == document_id).first()
+        if document:
+            document.status = status
+            ProgressService.publish(db, document)
+            db.commit()
+
+    def set_batch_status(self, batch_id: int, status: DocumentStatus, db: Session):
+        """
+        Set the processing status of the unfinished documents of a batch.
+
+        Args:
+            batch_id: Batch ID
+            status: New status
+            db: Database session
+        """
+        documents = db.query(Document)\
+            .filter(Document.batch_id == batch_id)\
+            .filter(or_(
+                Document.processing_stage.is_(None),
+                Document.processing_stage != ProcessingStage.COMPLETED.value
+            ))\
+            .all()
+        for document in documents:
+            document.status = status
+            ProgressService.publish(db, document)
+        db.commit()
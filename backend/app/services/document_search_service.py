@@ -0,0 +1,135 @@
+"""Full-text document search service."""
+import re
+from typing import List, Dict, Any
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from loguru import logger
+
+from app.models.document import Document, document_summary_options
+
+
+# Query in the three languages of the search_vector column
+SEARCH_SQL = text("""
+    WITH q AS (
+        SELECT to_tsquery('french', :tsquery)
+            || to_tsquery('german', :tsquery)
+            || to_tsquery('english', :tsquery) AS query
+    )
+    SELECT d.id, ts_rank(d.search_vector, q.query) AS rank
+    FROM documents d, q
+    WHERE d.user_id = :user_id
+        AND (
+            d.search_vector @@ q.query
+            OR d.display_name ILIKE :pattern
+            OR d.original_filename ILIKE :pattern
+        )
+    ORDER BY rank DESC, d.importance_score DESC NULLS LAST, d.created_at DESC
+    OFFSET :skip
+    LIMIT :limit
+""")
+
+# Snippets are only computed for the returned page (ts_headline re-parses the text)
+SNIPPET_SQL = text("""
+    SELECT d.id,
+        ts_headline(
+            'french',
+            left(coalesce(d.extracted_text, ''), 100000),
+            to_tsquery('french', :tsquery)
+                || to_tsquery('german', :tsquery)
+                || to_tsquery('english', :tsquery),
+            'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=20, MinWords=5, FragmentDelimiter=" … "'
+        ) AS snippet
+    FROM documents d
+    WHERE d.id = ANY(:ids)
+""")
+
+
+class DocumentSearchService:
+    """Service for ranked full-text search over a user's documents.
+
+    Uses the generated ``search_vector`` column (GIN index) for words and
+    prefixes, and trigram indexes for substring matches on names.
+    """
+
+    @staticmethod
+    def build_tsquery(query: str, match_all: bool = True, prefix_last: bool = True) -> str:
+        """
+        Turn user input into a to_tsquery expression.
+
+        By default all words must match and the last word is a prefix, so
+        results follow the user while typing.
+
+        Args:
+            query: Raw search input
+            match_all: Require every word (AND) instead of any word (OR)
+            prefix_last: Match the last word as a prefix
+
+        Returns:
+            tsquery expression, or '' if the input has no searchable word
+        """
+        words = re.findall(r"\w+", query.lower())
+        if not words:
+            return ''
+        terms = [f"'{word}'" for word in words]
+        if prefix_last:
+            terms[-1] += ":*"
+        return (" & " if match_all else " | ").join(terms)
+
+    @staticmethod
+    def build_like_pattern(query: str) -> str:
+        """ILIKE pattern matching the input anywhere, with wildcards escaped."""
+        escaped = query.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return f"%{escaped}%"
+
+    def search(
+        self,
+        user_id: int,
+        query: str,
+        db: Session,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Search a user's documents.
+
+        Args:
+            user_id: User ID
+            query: Search input
+            db: Database session
+            skip: Results to skip
+            limit: Maximum number of results
+
+        Returns:
+            List of dicts with 'document', 'rank' and 'snippet', best match first
+        """
+        tsquery = self.build_tsquery(query)
+        if not tsquery:
+            return []
+
+        rows = db.execute(SEARCH_SQL, {
+            "tsquery": tsquery,
+            "pattern": self.build_like_pattern(query),
+            "user_id": user_id,
+            "skip": skip,
+            "limit": limit
+        }).fetchall()
+        if not rows:
+            return []
+
+        ids = [row.id for row in rows]
+        documents = {doc.id: doc for doc in db.query(Document).options(document_summary_options()).filter(Document.id.in_(ids)).all()}
+        snippets = {
+            row.id: row.snippet
+            for row in db.execute(SNIPPET_SQL, {"tsquery": tsquery, "ids": ids}).fetchall()
+        }
+
+        logger.debug(f"Search '{query}' for user {user_id}: {len(rows)} results")
+        return [
+            {
+                'document': documents[row.id],
+                'rank': float(row.rank),
+                'snippet': snippets.get(row.id) or None
+            }
+            for row in rows
+            if row.id in documents
+        ]
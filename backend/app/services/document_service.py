@@ -1,8 +1,9 @@
 """Document processing service."""
+import hashlib
 import os
 import uuid
 from pathlib import Path
-from typing import Tuple, List
+from typing import Any, Tuple, List
 import PyPDF2
 import pytesseract
 from PIL import Image
@@ -11,6 +12,14 @@ from loguru import logger
 from app.config import settings
 
 
+class FileTooLargeError(Exception):
+    """Raised when an upload exceeds the allowed size while it is being saved."""
+    
+    def __init__(self, max_size: int):
+        super().__init__(f"File exceeds the maximum size of {max_size} bytes")
+        self.max_size = max_size
+
+
 class DocumentService:
     """Service for document upload and processing."""
     
@@ -40,6 +49,46 @@ class DocumentService:
         logger.info(f"Saved file: {saved_filename}")
         return str(file_path), saved_filename
     
+    async def save_upload(self, filename: str, source: Any, max_size: int) -> Tuple[str, str, int, str]:
+        """Stream an upload to disk, computing its SHA-256 on the way.
+        
+        The content is copied in UPLOAD_CHUNK_SIZE_KB chunks, so memory use
+        does not depend on the file size, and the copy stops at the first
+        chunk past max_size.
+        
+        Args:
+            filename: Original filename
+            source: Upload with an async read(size) method, such as UploadFile
+            max_size: Maximum file size in bytes
+            
+        Returns:
+            Tuple of (file_path, saved_filename, file_size, file_hash)
+            
+        Raises:
+            FileTooLargeError: If the upload is larger than max_size (nothing is kept on disk)
+        """
+        file_extension = Path(filename).suffix
+        saved_filename = f"{uuid.uuid4()}{file_extension}"
+        file_path = self.upload_dir / saved_filename
+        chunk_size = settings.UPLOAD_CHUNK_SIZE_KB * 1024
+        
+        sha256_hash = hashlib.sha256()
+        file_size = 0
+        try:
+            with open(file_path, "wb") as f:
+                while chunk := await source.read(chunk_size):
+                    file_size += len(chunk)
+                    if file_size > max_size:
+                        raise FileTooLargeError(max_size)
+                    sha256_hash.update(chunk)
+                    f.write(chunk)
+        except BaseException:
+            self.delete_file(str(file_path))
+            raise
+        
+        logger.info(f"Saved file: {saved_filename} ({file_size} bytes)")
+        return str(file_path), saved_filename, file_size, sha256_hash.hexdigest()
+    
     def delete_file(self, file_path: str):
         """Delete a file from disk.
         
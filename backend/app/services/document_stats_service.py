@@ -0,0 +1,185 @@
+"""Per-user document statistics, maintained incrementally."""
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Any, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.models.document import Document, DocumentType
+from app.models.user_document_stats import UserDocumentStats
+
+
+# Document attributes the counters depend on
+STATS_ATTRIBUTES = ('user_id', 'document_type', 'deadline', 'importance_score', 'extracted_amount')
+
+HIGH_IMPORTANCE_SCORE = 80
+UPCOMING_DEADLINE_DAYS = 7
+
+# Stored counters plus the time-relative deadline counts, in one round trip.
+# The deadline counts are a range scan of idx_documents_user_deadline_id.
+STATISTICS_SQL = text("""
+    WITH deadlines AS (
+        SELECT count(*) FILTER (WHERE d.deadline < :today) AS overdue_documents,
+               count(*) FILTER (WHERE d.deadline >= :today) AS upcoming_deadlines
+        FROM documents d
+        WHERE d.user_id = :user_id
+            AND d.deadline <= :upcoming_until
+    )
+    SELECT s.*, deadlines.overdue_documents, deadlines.upcoming_deadlines
+    FROM deadlines
+    LEFT JOIN user_document_stats s ON s.user_id = :user_id
+""")
+
+
+def _load_old_value(target, value, oldvalue, initiator):
+    pass
+
+
+# Load the stored value when one of these attributes is set on an unloaded
+# (e.g. expired after commit) document, so its old contribution is known
+for _attr in STATS_ATTRIBUTES:
+    event.listen(getattr(Document, _attr), "set", _load_old_value, active_history=True)
+
+
+def _type_column(document_type: Optional[DocumentType]) -> str:
+    return f"{(document_type or DocumentType.OTHER).value}_count"
+
+
+@event.listens_for(Session, "before_flush")
+def _update_document_stats(session: Session, flush_context, instances):
+    """Apply counter deltas for documents being inserted, updated or deleted.
+
+    Runs before the flush (deleted rows can still be loaded) and inside the
+    flushing transaction, so the counters commit or roll back together with
+    the document changes, whichever code path made them.
+    """
+    deltas = defaultdict(lambda: defaultdict(int))
+
+    def add(values: Dict[str, Any], sign: int):
+        if values['user_id'] is None:
+            return
+        for column, value in DocumentStatsService.contribution(values).items():
+            deltas[values['user_id']][column] += sign * value
+
+    for obj in session.new:
+        if isinstance(obj, Document):
+            add(DocumentStatsService.current_values(obj), 1)
+    for obj in session.deleted:
+        if isinstance(obj, Document) and inspect(obj).has_identity:
+            add(DocumentStatsService.committed_values(obj), -1)
+    for obj in session.dirty:
+        if not isinstance(obj, Document):
+            continue
+        state = inspect(obj)
+        if not any(state.attrs[attr].history.has_changes() for attr in STATS_ATTRIBUTES):
+            continue
+        add(DocumentStatsService.committed_values(obj), -1)
+        add(DocumentStatsService.current_values(obj), 1)
+
+    for user_id in sorted(deltas):
+        delta = {column: value for column, value in deltas[user_id].items() if value}
+        if not delta:
+            continue
+        statement = pg_insert(UserDocumentStats).values(user_id=user_id, **delta)
+        statement = statement.on_conflict_do_update(
+            index_elements=[UserDocumentStats.user_id],
+            set_={
+                **{column: getattr(UserDocumentStats, column) + value for column, value in delta.items()},
+                'updated_at': datetime.utcnow()
+            }
+        )
+        session.connection().execute(statement)
+
+
+class DocumentStatsService:
+    """Service for the per-user counters of user_document_stats.
+
+    The counters are kept up to date by a Session ``before_flush`` listener,
+    so reading statistics never aggregates the documents table.
+    """
+
+    @staticmethod
+    def contribution(values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Counter values contributed by one document.
+
+        Args:
+            values: Document attribute values (see STATS_ATTRIBUTES)
+
+        Returns:
+            Dict of counter column to value
+        """
+        importance_score = values.get('importance_score')
+        deadline = values.get('deadline')
+        amount = values.get('extracted_amount')
+
+        counters = {
+            'total_documents': 1,
+            _type_column(values.get('document_type')): 1,
+            'documents_with_deadline': 1 if deadline is not None else 0,
+            'high_importance_documents': 1 if importance_score is not None
+                and importance_score > HIGH_IMPORTANCE_SCORE else 0,
+            'importance_score_count': 1 if importance_score is not None else 0,
+            'importance_score_sum': float(importance_score) if importance_score is not None else 0.0,
+            'total_amount_extracted': Decimal(str(amount)) if amount is not None else Decimal(0),
+        }
+        return counters
+
+    @staticmethod
+    def current_values(document: Document) -> Dict[str, Any]:
+        """Attribute values of a document as they will be flushed."""
+        return {attr: getattr(document, attr) for attr in STATS_ATTRIBUTES}
+
+    @staticmethod
+    def committed_values(document: Document) -> Dict[str, Any]:
+        """Attribute values of a document as currently stored in the database."""
+        state = inspect(document)
+        values = {}
+        for attr in STATS_ATTRIBUTES:
+            history = state.attrs[attr].history
+            if history.deleted:
+                values[attr] = history.deleted[0]
+            elif history.added:
+                values[attr] = None  # Attribute was unset before this change
+            else:
+                values[attr] = getattr(document, attr)  # Unchanged (loads expired attributes)
+        return values
+
+    def get_statistics(self, user_id: int, db: Session, today: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Document statistics of a user, in one query.
+
+        Args:
+            user_id: User ID
+            db: Database session
+            today: Reference date for overdue/upcoming deadlines
+
+        Returns:
+            Dict matching the DocumentStatistics schema
+        """
+        today = today or date.today()
+        row = db.execute(STATISTICS_SQL, {
+            "user_id": user_id,
+            "today": today,
+            "upcoming_until": today + timedelta(days=UPCOMING_DEADLINE_DAYS)
+        }).mappings().one()
+
+        documents_by_type = {}
+        for document_type in DocumentType:
+            count = row[_type_column(document_type)] or 0
+            if count:
+                documents_by_type[document_type.value] = count
+
+        importance_count = row['importance_score_count'] or 0
+        return {
+            'total_documents': row['total_documents'] or 0,
+            'documents_by_type': documents_by_type,
+            'documents_with_deadline': row['documents_with_deadline'] or 0,
+            'overdue_documents': row['overdue_documents'] or 0,
+            'upcoming_deadlines': row['upcoming_deadlines'] or 0,
+            'high_importance_documents': row['high_importance_documents'] or 0,
+            'average_importance_score': row['importance_score_sum'] / importance_count if importance_count else 0.0,
+            'total_amount_extracted': float(row['total_amount_extracted'] or 0),
+        }
@@ -2,11 +2,13 @@
 import hashlib
 from typing import Optional, Tuple, List, Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import text, or_, and_
+from sqlalchemy import or_, and_, func
 from loguru import logger
 from datetime import datetime, timedelta
 
-from app.models.document import Document, DocumentChunk
+from app.models.document import Document
+from app.models.minhash_band import DocumentMinHashBand
+from app.services.minhash_service import MinHashService
 
 
 class DuplicateDetectionService:
@@ -17,6 +19,8 @@ class DuplicateDetectionService:
         self.high_similarity_threshold = 0.95  # Very similar content
         self.moderate_similarity_threshold = 0.85  # Likely duplicate
         self.metadata_match_window_days = 30  # Days to check for metadata matches
+        self.max_content_candidates = 10  # Documents sharing the most LSH bands, compared by signature
+        self.minhash_service = MinHashService()
     
     def calculate_file_hash(self, file_path: str) -> str:
         """
@@ -41,6 +45,41 @@ class DuplicateDetectionService:
             logger.error(f"Error calculating file hash: {e}")
             return ""
     
+    def find_exact_duplicates(
+        self,
+        user_id: int,
+        file_hashes: List[str],
+        db: Session,
+        before_id: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Find documents of the user with the same file content.
+        
+        One lookup on the (user_id, file_hash) index, so uploads and the
+        first pipeline stage can reject byte-identical files before any OCR
+        or LLM work.
+        
+        Args:
+            user_id: User ID
+            file_hashes: SHA-256 hashes of the files
+            db: Database session
+            before_id: Only match documents created before this one
+            
+        Returns:
+            ID of the oldest matching document, by file hash (hashes without a match are left out)
+        """
+        file_hashes = [file_hash for file_hash in file_hashes if file_hash]
+        if not file_hashes:
+            return {}
+        
+        query = db.query(Document.file_hash, func.min(Document.id))\
+            .filter(Document.user_id == user_id)\
+            .filter(Document.file_hash.in_(file_hashes))
+        if before_id is not None:
+            query = query.filter(Document.id < before_id)
+        
+        return dict(query.group_by(Document.file_hash).all())
+    
     async def detect_duplicate(
         self,
         document_id: int,
@@ -48,7 +87,9 @@ class DuplicateDetectionService:
         user_id: int,
         db: Session,
         extracted_text: Optional[str] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        file_hash: Optional[str] = None,
+        signature: Optional[List[int]] = None
     ) -> Tuple[bool, Optional[int], float, str]:
         """
         Detect if document is a duplicate.
@@ -60,23 +101,27 @@ class DuplicateDetectionService:
             db: Database session
             extracted_text: Extracted text (optional, for content comparison)
             metadata: Document metadata (optional, for metadata comparison)
+            file_hash: SHA-256 stored at upload (the file is hashed if not given)
+            signature: MinHash signature of extracted_text (computed if not given)
             
         Returns:
             Tuple of (is_duplicate, original_document_id, similarity_score, detection_method)
         """
         try:
             # Strategy 1: Check exact file hash match
-            file_hash = self.calculate_file_hash(file_path)
+            file_hash = file_hash or self.calculate_file_hash(file_path)
             if file_hash:
                 duplicate = self._check_file_hash_duplicate(document_id, file_hash, user_id, db)
                 if duplicate:
                     logger.info(f"Exact duplicate detected via file hash: {duplicate[0].id}")
                     return True, duplicate[0].id, 1.0, "exact_hash"
             
-            # Strategy 2: Check content similarity via embeddings
-            if extracted_text and len(extracted_text) > 100:
-                duplicate = await self._check_content_similarity(
-                    document_id, user_id, db
+            # Strategy 2: Check content similarity via MinHash/LSH over the whole text
+            if signature is None and extracted_text:
+                signature = self.minhash_service.signature(extracted_text)
+            if signature:
+                duplicate = self._check_content_similarity(
+                    document_id, user_id, signature, db
                 )
                 if duplicate:
                     doc_id, similarity = duplicate
@@ -125,72 +170,47 @@ class DuplicateDetectionService:
         
         return duplicates if duplicates else None
     
-    async def _check_content_similarity(
+    def _check_content_similarity(
         self,
         current_doc_id: int,
         user_id: int,
+        signature: List[int],
         db: Session
     ) -> Optional[Tuple[int, float]]:
         """
-        Check content similarity using vector embeddings.
+        Check content similarity using MinHash signatures of the whole text.
+        
+        Candidates are the user's documents sharing an LSH band (one lookup
+        on the band hash index); their signatures give the Jaccard estimate.
         
         Returns:
             Tuple of (document_id, similarity_score) or None
         """
         try:
-            # Get embeddings for current document
-            current_chunks = db.query(DocumentChunk)\
-                .filter(DocumentChunk.document_id == current_doc_id)\
-                .filter(DocumentChunk.embedding.isnot(None))\
+            shared_bands = func.count(DocumentMinHashBand.band)
+            candidates = db.query(DocumentMinHashBand.document_id)\
+                .filter(DocumentMinHashBand.user_id == user_id)\
+                .filter(DocumentMinHashBand.band_hash.in_(self.minhash_service.band_hashes(signature)))\
+                .filter(DocumentMinHashBand.document_id != current_doc_id)\
+                .group_by(DocumentMinHashBand.document_id)\
+                .order_by(shared_bands.desc())\
+                .limit(self.max_content_candidates)\
                 .all()
             
-            if not current_chunks:
+            if not candidates:
                 return None
             
-            # Use first chunk as representative
-            current_embedding = current_chunks[0].embedding
-            
-            # Convert embedding to proper format for pgvector
-            # pgvector needs the embedding as the actual vector type, not a string
-            from pgvector.sqlalchemy import Vector
-            
-            # Find similar documents using vector similarity
-            sql = text("""
-                SELECT DISTINCT
-                    dc.document_id,
-                    1 - (dc.embedding <=> CAST(:current_embedding AS vector)) as similarity
-                FROM document_chunks dc
-                JOIN documents d ON dc.document_id = d.id
-                WHERE d.user_id = :user_id
-                    AND dc.document_id != :current_doc_id
-                    AND dc.embedding IS NOT NULL
-                    AND 1 - (dc.embedding <=> CAST(:current_embedding AS vector)) >= :threshold
-                ORDER BY similarity DESC
-                LIMIT 1
-            """)
-            
-            # Format embedding as pgvector string
-            if hasattr(current_embedding, 'tolist'):
-                embedding_list = current_embedding.tolist()
-            elif isinstance(current_embedding, list):
-                embedding_list = current_embedding
-            else:
-                embedding_list = list(current_embedding)
-            
-            embedding_str = '[' + ','.join(str(x) for x in embedding_list) + ']'
-            
-            result = db.execute(
-                sql,
-                {
-                    "current_embedding": embedding_str,
-                    "user_id": user_id,
-                    "current_doc_id": current_doc_id,
-                    "threshold": self.moderate_similarity_threshold
-                }
-            ).fetchone()
+            signatures = db.query(Document.id, Document.minhash_signature)\
+                .filter(Document.id.in_([document_id for (document_id,) in candidates]))\
+                .all()
+            best = max(
+                ((document_id, self.minhash_service.similarity(signature, other)) for document_id, other in signatures),
+                key=lambda match: match[1],
+                default=None
+            )
             
-            if result:
-                return (result[0], result[1])
+            if best and best[1] >= self.moderate_similarity_threshold:
+                return best
             
             return None
             
@@ -203,6 +223,25 @@ class DuplicateDetectionService:
                 pass
             return None
     
+    def store_signature(self, document: Document, signature: Optional[List[int]], db: Session):
+        """
+        Store the MinHash signature of a document and replace its LSH bands.
+        
+        Args:
+            document: Document (attached to db)
+            signature: Signature from MinHashService.signature (None if the text is too short)
+            db: Database session
+        """
+        document.minhash_signature = signature
+        db.query(DocumentMinHashBand)\
+            .filter(DocumentMinHashBand.document_id == document.id)\
+            .delete(synchronize_session=False)
+        if signature:
+            db.add_all([
+                DocumentMinHashBand(document_id=document.id, band=band, user_id=document.user_id, band_hash=band_hash)
+                for band, band_hash in enumerate(self.minhash_service.band_hashes(signature))
+            ])
+    
     def _check_metadata_similarity(
         self,
         current_doc_id: int,
@@ -0,0 +1,123 @@
+"""Two-tier cache of embedding vectors keyed by normalized text."""
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from app.config import settings
+from app.models.database import SessionLocal
+from app.models.embedding_cache import EmbeddingCacheEntry
+
+
+class EmbeddingCacheService:
+    """Service to reuse embeddings of texts that were already embedded.
+
+    Keys are (model, SHA-256 of the normalized text). Lookups go through an
+    in-process LRU tier first, then the embedding_cache table, so repeated
+    boilerplate chunks and repeated queries never reach the embeddings API.
+    """
+
+    # In-process LRU tier, shared by all instances
+    _memory: "OrderedDict[tuple, List[float]]" = OrderedDict()
+    _lock = threading.Lock()
+
+    def __init__(self, model: str):
+        self.model = model
+        self.enabled = settings.EMBEDDING_CACHE_ENABLED
+        self.memory_size = settings.EMBEDDING_CACHE_MEMORY_SIZE
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normalize text so trivially different copies share a key."""
+        text = unicodedata.normalize("NFKC", text)
+        return re.sub(r"\s+", " ", text).strip()
+
+    @classmethod
+    def text_hash(cls, text: str) -> str:
+        """SHA-256 of the normalized text."""
+        return hashlib.sha256(cls.normalize(text).encode("utf-8")).hexdigest()
+
+    def get_many(self, text_hashes: List[str], db: Optional[Session] = None) -> Dict[str, List[float]]:
+        """
+        Look up embeddings by text hash.
+
+        Args:
+            text_hashes: Hashes from text_hash()
+            db: Database session (a short-lived session is opened if None)
+
+        Returns:
+            Dict of text hash to embedding, for the hashes that were found
+        """
+        if not self.enabled or not text_hashes:
+            return {}
+
+        found = {}
+        with self._lock:
+            for text_hash in text_hashes:
+                key = (self.model, text_hash)
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[text_hash] = self._memory[key]
+
+        missing = [text_hash for text_hash in set(text_hashes) if text_hash not in found]
+        if missing:
+            own_session = db is None
+            db = SessionLocal() if own_session else db
+            try:
+                rows = db.query(EmbeddingCacheEntry.text_hash, EmbeddingCacheEntry.embedding)\
+                    .filter(EmbeddingCacheEntry.model == self.model)\
+                    .filter(EmbeddingCacheEntry.text_hash.in_(missing))\
+                    .all()
+            finally:
+                if own_session:
+                    db.close()
+            from_db = {row.text_hash: [float(x) for x in row.embedding] for row in rows}
+            self._remember(from_db)
+            found.update(from_db)
+
+        return found
+
+    def put_many(self, embeddings: Dict[str, List[float]], db: Optional[Session] = None):
+        """
+        Store embeddings by text hash.
+
+        With a session, the insert joins the caller's transaction; without
+        one, it is committed in a short-lived session. Concurrent inserts of
+        the same key are ignored.
+
+        Args:
+            embeddings: Dict of text hash to embedding
+            db: Database session (a short-lived session is opened if None)
+        """
+        if not self.enabled or not embeddings:
+            return
+
+        self._remember(embeddings)
+
+        rows = [
+            {'model': self.model, 'text_hash': text_hash, 'embedding': embedding}
+            for text_hash, embedding in embeddings.items()
+        ]
+        statement = pg_insert(EmbeddingCacheEntry).on_conflict_do_nothing()
+
+        if db is not None:
+            db.execute(statement, rows)
+        else:
+            with SessionLocal() as own_db:
+                own_db.execute(statement, rows)
+                own_db.commit()
+        logger.debug(f"Stored {len(rows)} embeddings in cache")
+
+    def _remember(self, embeddings: Dict[str, List[float]]):
+        with self._lock:
+            for text_hash, embedding in embeddings.items():
+                key = (self.model, text_hash)
+                self._memory[key] = embedding
+                self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
@@ -1,11 +1,35 @@
 """Embedding service for RAG."""
-from typing import List
+import asyncio
+from typing import Any, Dict, List, Optional, Set, Tuple
 from openai import AsyncOpenAI
 from loguru import logger
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from app.config import settings
 from app.models.document import DocumentChunk
+from app.services.embedding_cache_service import EmbeddingCacheService
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+    logger.warning("tiktoken not installed, embedding batches will use estimated token counts")
+
+
+class EmbeddingRequestError(Exception):
+    """Raised when embedding requests failed; the embeddings of the other requests are cached.
+    
+    Attributes:
+        failed_documents: IDs of the documents with chunks in a failed request
+        rows: Complete DocumentChunk rows of the other documents, as returned by embed_documents
+    """
+    
+    def __init__(self, message: str, failed_documents: Set[int], rows: Dict[int, List[Dict[str, Any]]]):
+        super().__init__(message)
+        self.failed_documents = failed_documents
+        self.rows = rows
 
 
 class EmbeddingService:
@@ -14,69 +38,253 @@ class EmbeddingService:
     def __init__(self):
         self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
         self.model = settings.OPENAI_EMBEDDING_MODEL
+        self.batch_size = settings.EMBEDDING_BATCH_SIZE
+        self.batch_max_tokens = settings.EMBEDDING_BATCH_MAX_TOKENS
+        self.max_concurrency = settings.EMBEDDING_MAX_CONCURRENCY
+        self.cache = EmbeddingCacheService(self.model)
+        self._encoding = None
+        if TIKTOKEN_AVAILABLE:
+            try:
+                self._encoding = tiktoken.encoding_for_model(self.model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("cl100k_base")
     
     async def create_embedding(self, text: str) -> List[float]:
-        """Create embedding vector for text.
+        """Create embedding vector for text, reusing cached embeddings.
         
         Args:
             text: Text to embed
-            
+        
         Returns:
             Embedding vector
         """
+        text_hash = self.cache.text_hash(text)
+        try:
+            cached = await asyncio.to_thread(self.cache.get_many, [text_hash])
+            if text_hash in cached:
+                return cached[text_hash]
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup failed: {e}")
+        
         try:
             response = await self.client.embeddings.create(
                 model=self.model,
                 input=text
             )
-            return response.data[0].embedding
+            embedding = response.data[0].embedding
         except Exception as e:
             logger.error(f"Error creating embedding: {e}")
             raise
+        
+        try:
+            await asyncio.to_thread(self.cache.put_many, {text_hash: embedding})
+        except Exception as e:
+            logger.warning(f"Embedding cache store failed: {e}")
+        return embedding
     
-    async def create_embeddings(
+    async def create_embedding_batch(self, texts: List[str]) -> List[List[float]]:
+        """Create embedding vectors for several texts in one API request.
+        
+        Args:
+            texts: Texts to embed
+        
+        Returns:
+            Embedding vectors, in the order of texts
+        """
+        try:
+            response = await self.client.embeddings.create(
+                model=self.model,
+                input=texts
+            )
+            return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        except Exception as e:
+            logger.error(f"Error creating embedding batch of {len(texts)} texts: {e}")
+            raise
+    
+    def count_tokens(self, text: str) -> int:
+        """Count tokens of a text (estimated when tiktoken is unavailable)."""
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return len(text) // 3 + 1  # Conservative for French/German text
+    
+    def make_batches(self, items: List[Tuple[int, str]]) -> List[List[Tuple[int, str]]]:
+        """Group (key, text) items into batches bounded by size and token count.
+        
+        Args:
+            items: Keys (e.g. chunk indexes) and texts
+        
+        Returns:
+            Batches of items, in order
+        """
+        batches = []
+        current = []
+        current_tokens = 0
+        
+        for item in items:
+            tokens = self.count_tokens(item[1])
+            if current and (len(current) >= self.batch_size or
+                            current_tokens + tokens > self.batch_max_tokens):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(item)
+            current_tokens += tokens
+        
+        if current:
+            batches.append(current)
+        return batches
+    
+    async def embed_chunks(
         self,
         document_id: int,
         chunks: List[str],
-        db: Session
-    ) -> List[DocumentChunk]:
-        """Create embeddings for all chunks and save to database.
+        user_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Create embeddings for all chunks, without holding a database session.
         
         Args:
             document_id: ID of parent document
             chunks: List of text chunks
-            db: Database session
-            
+            user_id: Owner of the document (denormalized onto chunks for search)
+        
         Returns:
-            List of created DocumentChunk objects
+            DocumentChunk rows for save_chunks
+        
+        Raises:
+            EmbeddingRequestError: If an embeddings request failed
         """
-        chunk_objects = []
+        rows = await self.embed_documents({document_id: (chunks, user_id)})
+        return rows[document_id]
+    
+    async def embed_documents(
+        self,
+        documents: Dict[int, Tuple[List[str], Optional[int]]]
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """Create embeddings for the chunks of several documents at once.
+        
+        Chunks of all documents share the request batches (EMBEDDING_BATCH_SIZE
+        texts, at most EMBEDDING_BATCH_MAX_TOKENS tokens per request), with up
+        to EMBEDDING_MAX_CONCURRENCY requests in flight. Chunks whose
+        normalized text is in the embedding cache are not sent at all, and
+        identical chunks are embedded once. The cache is read and written in
+        its own short sessions, so no connection is held during API requests.
+        
+        Args:
+            documents: Chunks and owner (user_id) by document ID
+        
+        Returns:
+            DocumentChunk rows for save_chunks by document ID
+        
+        Raises:
+            EmbeddingRequestError: If a request failed (429, timeout, ...). The
+                embeddings of the successful requests are cached first, so a
+                retry only sends the failed chunks.
+        """
+        items = [
+            (document_id, idx, chunk_text)
+            for document_id, (chunks, _) in documents.items()
+            for idx, chunk_text in enumerate(chunks)
+            if chunk_text.strip()
+        ]
+        if not items:
+            return {document_id: [] for document_id in documents}
+        
+        hashes = {(document_id, idx): self.cache.text_hash(chunk_text) for document_id, idx, chunk_text in items}
+        embeddings_by_hash = await asyncio.to_thread(self.cache.get_many, list(set(hashes.values())))
+        
+        # Embed each uncached text once
+        to_embed = {}
+        for document_id, idx, chunk_text in items:
+            text_hash = hashes[(document_id, idx)]
+            if text_hash not in embeddings_by_hash and text_hash not in to_embed:
+                to_embed[text_hash] = (text_hash, chunk_text)
         
-        for idx, chunk_text in enumerate(chunks):
-            if not chunk_text.strip():
+        batches = self.make_batches(list(to_embed.values()))
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def embed_batch(batch: List[Tuple[str, str]]) -> List[List[float]]:
+            async with semaphore:
+                return await self.create_embedding_batch([text for _, text in batch])
+        
+        results = await asyncio.gather(*(embed_batch(batch) for batch in batches), return_exceptions=True)
+        
+        new_embeddings = {}
+        errors = []
+        for batch, embeddings in zip(batches, results):
+            if isinstance(embeddings, BaseException):
+                logger.error(f"Error creating embeddings for a batch of {len(batch)} chunks "
+                             f"of documents {sorted(documents)}: {embeddings}")
+                errors.append(embeddings)
                 continue
-            
-            try:
-                # Create embedding
-                embedding = await self.create_embedding(chunk_text)
-                
-                # Create chunk object
-                chunk = DocumentChunk(
-                    document_id=document_id,
-                    content=chunk_text,
-                    chunk_index=idx,
-                    embedding=embedding
-                )
-                db.add(chunk)
-                chunk_objects.append(chunk)
-                
-                logger.debug(f"Created embedding for chunk {idx} of document {document_id}")
-                
-            except Exception as e:
-                logger.error(f"Error creating embedding for chunk {idx}: {e}")
+            for (text_hash, _), embedding in zip(batch, embeddings):
+                new_embeddings[text_hash] = embedding
+        if new_embeddings:
+            await asyncio.to_thread(self.cache.put_many, new_embeddings)
+        embeddings_by_hash.update(new_embeddings)
+        
+        logger.info(f"Embedded {len(items)} chunks of {len(documents)} document(s) "
+                    f"in {len(batches)} requests ({len(items) - len(to_embed)} reused)")
+        
+        rows = {document_id: [] for document_id in documents}
+        failed_documents = set()
+        for document_id, idx, chunk_text in items:
+            text_hash = hashes[(document_id, idx)]
+            if text_hash not in embeddings_by_hash:
+                failed_documents.add(document_id)
                 continue
+            rows[document_id].append({
+                'document_id': document_id,
+                'user_id': documents[document_id][1],
+                'content': chunk_text,
+                'chunk_index': idx,
+                'embedding': embeddings_by_hash[text_hash]
+            })
+        
+        if errors:
+            for document_id in failed_documents:
+                del rows[document_id]
+            raise EmbeddingRequestError(
+                f"{len(errors)} of {len(batches)} embedding requests failed "
+                f"(documents {sorted(failed_documents)}): {errors[0]}",
+                failed_documents,
+                rows
+            ) from errors[0]
+        return rows
+    
+    def save_chunks(self, rows: List[Dict[str, Any]], db: Session) -> List[DocumentChunk]:
+        """Insert chunk rows from embed_chunks in one bulk insert (the caller commits).
         
-        db.commit()
-        logger.info(f"Created {len(chunk_objects)} embeddings for document {document_id}")
+        Args:
+            rows: Rows returned by embed_chunks
+            db: Database session
         
-        return chunk_objects
+        Returns:
+            List of created DocumentChunk objects
+        """
+        if not rows:
+            return []
+        return list(db.scalars(insert(DocumentChunk).returning(DocumentChunk), rows))
+    
+    async def create_embeddings(
+        self,
+        document_id: int,
+        chunks: List[str],
+        db: Session,
+        user_id: Optional[int] = None
+    ) -> List[DocumentChunk]:
+        """Create embeddings for all chunks and save to database.
+        
+        See embed_chunks; the chunks are inserted with db and the caller
+        commits, so they land together with the caller's other changes.
+        
+        Args:
+            document_id: ID of parent document
+            chunks: List of text chunks
+            db: Database session
+            user_id: Owner of the document (denormalized onto chunks for search)
+        
+        Returns:
+            List of created DocumentChunk objects
+        """
+        rows = await self.embed_chunks(document_id, chunks, user_id=user_id)
+        return self.save_chunks(rows, db)
@@ -1,18 +1,65 @@
 """Virtual filing cabinet service for hierarchical document organization."""
 import os
+import json
 import uuid
 import shutil
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime, date
 from sqlalchemy.orm import Session
-from sqlalchemy import func, distinct
+from sqlalchemy import func, distinct, event, inspect, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from loguru import logger
 
-from app.models.document import Document, DocumentType
+from app.models.document import Document, DocumentType, document_summary_options
+from app.models.filing_cabinet_cache import FilingCabinetCache
+from app.services.pagination_service import PaginationService, NEWEST_DOCUMENT_DATE_FIRST
 from app.config import settings
 
 
+# Document attributes that place a document in the filing cabinet tree
+TREE_ATTRIBUTES = ('user_id', 'storage_year', 'category', 'document_type')
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_filing_cabinet_cache(session: Session, flush_context):
+    """Bump the tree version of users whose documents were inserted, moved or deleted.
+
+    Runs inside the flushing transaction, so the cached tree is invalidated
+    exactly when the change commits, whichever process made it.
+    """
+    user_ids = set()
+    for obj in session.new:
+        if isinstance(obj, Document):
+            user_ids.add(obj.user_id)
+    for obj in session.deleted:
+        if isinstance(obj, Document):
+            user_ids.add(obj.user_id)
+    for obj in session.dirty:
+        if not isinstance(obj, Document):
+            continue
+        state = inspect(obj)
+        for attr in TREE_ATTRIBUTES:
+            history = state.attrs[attr].history
+            if history.has_changes():
+                user_ids.add(obj.user_id)
+                user_ids.update(value for value in history.deleted if attr == 'user_id')
+                break
+
+    user_ids.discard(None)
+    if not user_ids:
+        return
+
+    statement = pg_insert(FilingCabinetCache).values([
+        {'user_id': user_id, 'version': 1} for user_id in sorted(user_ids)
+    ])
+    statement = statement.on_conflict_do_update(
+        index_elements=[FilingCabinetCache.user_id],
+        set_={'version': FilingCabinetCache.version + 1}
+    )
+    session.connection().execute(statement)
+
+
 class FilingCabinetService:
     """Service for organizing documents in a hierarchical filing cabinet structure."""
     
@@ -147,24 +194,92 @@ class FilingCabinetService:
             logger.error(f"Error storing document in filing cabinet: {e}")
             raise
     
-    def get_years_with_documents(self, user_id: int, db: Session) -> List[int]:
+    def get_document_tree(self, user_id: int, db: Session) -> Dict[int, Dict[str, Dict[str, int]]]:
         """
-        Get list of years that have documents for a user.
+        Get document counts by year, category and type for a user.
+        
+        Served from the per-user cache when it is current; otherwise built
+        from a single grouped query and cached.
         
         Args:
             user_id: User ID
             db: Database session
             
         Returns:
-            List of years (sorted descending)
+            Dictionary of {year: {category: {document_type: count}}}
         """
-        years = db.query(distinct(Document.storage_year))\
+        cached = db.execute(
+            select(FilingCabinetCache.version, FilingCabinetCache.tree_version, FilingCabinetCache.tree)
+            .where(FilingCabinetCache.user_id == user_id)
+        ).first()
+        version = cached.version if cached else 0
+        
+        if cached and cached.tree is not None and cached.tree_version == version:
+            tree = json.loads(cached.tree)
+            return {int(year): categories for year, categories in tree.items()}
+        
+        tree = self._build_document_tree(user_id, db)
+        
+        # Store unless a document changed meanwhile (version moved on)
+        statement = pg_insert(FilingCabinetCache).values(
+            user_id=user_id,
+            version=version,
+            tree_version=version,
+            tree=json.dumps(tree)
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[FilingCabinetCache.user_id],
+            set_={
+                'tree': statement.excluded.tree,
+                'tree_version': statement.excluded.tree_version,
+                'updated_at': datetime.utcnow()
+            },
+            where=FilingCabinetCache.version == statement.excluded.tree_version
+        )
+        try:
+            db.execute(statement)
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Could not cache filing cabinet tree for user {user_id}: {e}")
+            db.rollback()
+        
+        return tree
+    
+    def _build_document_tree(self, user_id: int, db: Session) -> Dict[int, Dict[str, Dict[str, int]]]:
+        """Build the Year > Category > Type counts with one GROUP BY query."""
+        results = db.query(
+            Document.storage_year,
+            Document.category,
+            Document.document_type,
+            func.count(Document.id)
+        )\
             .filter(Document.user_id == user_id)\
             .filter(Document.storage_year.isnot(None))\
-            .order_by(Document.storage_year.desc())\
+            .group_by(Document.storage_year, Document.category, Document.document_type)\
             .all()
         
-        return [year[0] for year in years]
+        tree = {}
+        for year, category, doc_type, count in results:
+            # Normalize category: NULL or 'General' becomes 'Non classé'
+            categories = tree.setdefault(year, {})
+            types_counts = categories.setdefault(self._normalize_category(category), {})
+            type_key = doc_type.value if doc_type else DocumentType.OTHER.value
+            types_counts[type_key] = types_counts.get(type_key, 0) + count
+        
+        return tree
+    
+    def get_years_with_documents(self, user_id: int, db: Session) -> List[int]:
+        """
+        Get list of years that have documents for a user.
+        
+        Args:
+            user_id: User ID
+            db: Database session
+            
+        Returns:
+            List of years (sorted descending)
+        """
+        return sorted(self.get_document_tree(user_id, db).keys(), reverse=True)
     
     def get_document_stats_by_year(
         self,
@@ -183,16 +298,15 @@ class FilingCabinetService:
         Returns:
             Dictionary of {document_type: count}
         """
-        stats = db.query(
-            Document.document_type,
-            func.count(Document.id)
-        )\
-            .filter(Document.user_id == user_id)\
-            .filter(Document.storage_year == year)\
-            .group_by(Document.document_type)\
-            .all()
-        
-        return {doc_type.value: count for doc_type, count in stats}
+        categories = self.get_document_tree(user_id, db).get(year, {})
+        return self._sum_types(categories)
+    
+    def _sum_types(self, categories: Dict[str, Dict[str, int]]) -> Dict[str, int]:
+        stats = {}
+        for types_counts in categories.values():
+            for doc_type, count in types_counts.items():
+                stats[doc_type] = stats.get(doc_type, 0) + count
+        return stats
     
     def get_documents_by_year_type(
         self,
@@ -201,8 +315,9 @@ class FilingCabinetService:
         document_type: Optional[DocumentType],
         db: Session,
         skip: int = 0,
-        limit: int = 100
-    ) -> List[Document]:
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Document], Optional[str]]:
         """
         Get documents for specific year and optionally type.
         
@@ -211,26 +326,27 @@ class FilingCabinetService:
             year: Storage year
             document_type: Optional document type filter
             db: Database session
-            skip: Pagination offset
+            skip: Pagination offset (ignored with a cursor)
             limit: Pagination limit
+            cursor: Cursor of the previous page
             
         Returns:
-            List of documents
+            Tuple of (documents, cursor of the next page or None)
+            
+        Raises:
+            ValueError: If the cursor is invalid
         """
         query = db.query(Document)\
+            .options(document_summary_options())\
             .filter(Document.user_id == user_id)\
             .filter(Document.storage_year == year)
         
         if document_type:
             query = query.filter(Document.document_type == document_type)
         
-        documents = query\
-            .order_by(Document.document_date.desc().nullslast(), Document.created_at.desc())\
-            .offset(skip)\
-            .limit(limit)\
-            .all()
-        
-        return documents
+        return PaginationService().paginate(
+            query, NEWEST_DOCUMENT_DATE_FIRST, limit, cursor=cursor, skip=skip
+        )
     
     def get_filing_cabinet_overview(self, user_id: int, db: Session) -> Dict:
         """
@@ -243,16 +359,16 @@ class FilingCabinetService:
         Returns:
             Dictionary with years and stats
         """
-        years = self.get_years_with_documents(user_id, db)
+        tree = self.get_document_tree(user_id, db)
         
         overview = {
             'years': [],
             'total_documents': 0,
-            'total_years': len(years)
+            'total_years': len(tree)
         }
         
-        for year in years:
-            stats = self.get_document_stats_by_year(user_id, year, db)
+        for year in sorted(tree.keys(), reverse=True):
+            stats = self._sum_types(tree[year])
             year_total = sum(stats.values())
             
             overview['years'].append({
@@ -275,30 +391,22 @@ class FilingCabinetService:
         Returns:
             Dictionary with hierarchical structure
         """
-        years = self.get_years_with_documents(user_id, db)
+        tree = self.get_document_tree(user_id, db)
         
         overview = {
             'years': [],
             'total_documents': 0,
-            'total_years': len(years)
+            'total_years': len(tree)
         }
         
-        for year in years:
-            categories_data = self.get_categories_by_year(user_id, year, db)
-            year_total = 0
+        for year in sorted(tree.keys(), reverse=True):
+            year_total = sum(sum(types_counts.values()) for types_counts in tree[year].values())
             
-            year_data = {
+            overview['years'].append({
                 'year': year,
-                'categories': {},
-                'total': 0
-            }
-            
-            for category, types_counts in categories_data.items():
-                year_data['categories'][category] = types_counts
-                year_total += sum(types_counts.values())
-            
-            year_data['total'] = year_total
-            overview['years'].append(year_data)
+                'categories': tree[year],
+                'total': year_total
+            })
             overview['total_documents'] += year_total
         
         return overview
@@ -320,30 +428,7 @@ class FilingCabinetService:
         Returns:
             Dictionary of {category: {document_type: count}}
         """
-        # Query to get category, document_type, and count
-        results = db.query(
-            Document.category,
-            Document.document_type,
-            func.count(Document.id)
-        )\
-            .filter(Document.user_id == user_id)\
-            .filter(Document.storage_year == year)\
-            .group_by(Document.category, Document.document_type)\
-            .all()
-        
-        # Organize by category > type > count
-        categories_data = {}
-        
-        for category, doc_type, count in results:
-            # Normalize category: NULL or 'General' becomes 'Non classé'
-            normalized_category = self._normalize_category(category)
-            
-            if normalized_category not in categories_data:
-                categories_data[normalized_category] = {}
-            
-            categories_data[normalized_category][doc_type.value] = count
-        
-        return categories_data
+        return self.get_document_tree(user_id, db).get(year, {})
     
     def get_documents_by_year_category_type(
         self,
@@ -353,8 +438,9 @@ class FilingCabinetService:
         document_type: Optional[DocumentType],
         db: Session,
         skip: int = 0,
-        limit: int = 100
-    ) -> List[Document]:
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Document], Optional[str]]:
         """
         Get documents for specific year, category, and optionally type.
         
@@ -364,13 +450,18 @@ class FilingCabinetService:
             category: Category name (use "Non classé" for uncategorized)
             document_type: Optional document type filter
             db: Database session
-            skip: Pagination offset
+            skip: Pagination offset (ignored with a cursor)
             limit: Pagination limit
+            cursor: Cursor of the previous page
             
         Returns:
-            List of documents
+            Tuple of (documents, cursor of the next page or None)
+            
+        Raises:
+            ValueError: If the cursor is invalid
         """
         query = db.query(Document)\
+            .options(document_summary_options())\
             .filter(Document.user_id == user_id)\
             .filter(Document.storage_year == year)
         
@@ -386,13 +477,9 @@ class FilingCabinetService:
         if document_type:
             query = query.filter(Document.document_type == document_type)
         
-        documents = query\
-            .order_by(Document.document_date.desc().nullslast(), Document.created_at.desc())\
-            .offset(skip)\
-            .limit(limit)\
-            .all()
-        
-        return documents
+        return PaginationService().paginate(
+            query, NEWEST_DOCUMENT_DATE_FIRST, limit, cursor=cursor, skip=skip
+        )
     
     def get_all_categories(self, user_id: int, db: Session) -> List[str]:
         """
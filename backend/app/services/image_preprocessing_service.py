@@ -7,6 +7,12 @@ from loguru import logger
 from pathlib import Path
 
 from app.config import settings
+from app.process_pool import run_in_process_pool
+
+
+def _preprocess_for_ocr(image_path: str, output_path: str) -> Tuple[bool, str]:
+    """Run the preprocessing pipeline (executed in the shared process pool)."""
+    return ImagePreprocessingService().preprocess_for_ocr(image_path, output_path)
 
 
 class ImagePreprocessingService:
@@ -20,6 +26,19 @@ class ImagePreprocessingService:
         self.min_area_ratio = getattr(settings, 'MIN_DOCUMENT_AREA_RATIO', 0.1)
         self.deskew_threshold = getattr(settings, 'DESKEW_ANGLE_THRESHOLD', 0.5)
     
+    async def preprocess_for_ocr_async(self, image_path: str, output_path: str) -> Tuple[bool, str]:
+        """
+        Run preprocess_for_ocr in the shared process pool.
+        
+        Args:
+            image_path: Path to original image
+            output_path: Path to save preprocessed image
+            
+        Returns:
+            Tuple of (success, final_path)
+        """
+        return await run_in_process_pool(_preprocess_for_ocr, image_path, output_path)
+    
     def preprocess_for_ocr(self, image_path: str, output_path: str) -> Tuple[bool, str]:
         """
         Complete preprocessing pipeline for OCR optimization.
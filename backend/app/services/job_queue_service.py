@@ -0,0 +1,211 @@
+"""Durable job queue backed by the processing_jobs table."""
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import or_, and_
+from loguru import logger
+
+from app.models.job import ProcessingJob, JobStatus
+from app.config import settings
+
+
+class JobQueueService:
+    """Service to enqueue, claim and settle document processing jobs.
+
+    Workers claim jobs with ``SELECT ... FOR UPDATE SKIP LOCKED`` so any number
+    of worker processes can poll the same table without handing out a job twice.
+    A running job keeps a lease (``locked_at``) that the worker refreshes; jobs
+    whose lease expired (crashed worker) are claimed again, which counts as
+    an attempt. A job whose lease expires on its last attempt is failed.
+    """
+
+    def __init__(self):
+        self.max_attempts = settings.JOB_MAX_ATTEMPTS
+        self.retry_delay = settings.JOB_RETRY_DELAY_SECONDS
+        self.lock_timeout = settings.JOB_LOCK_TIMEOUT_SECONDS
+
+    def enqueue(self, db: Session, document_id: int, commit: bool = True) -> ProcessingJob:
+        """
+        Queue a document for processing.
+
+        Args:
+            db: Database session
+            document_id: Document to process
+            commit: Commit immediately (False to join the caller's transaction)
+
+        Returns:
+            Created job
+        """
+        job = ProcessingJob(
+            document_id=document_id,
+            status=JobStatus.QUEUED,
+            max_attempts=self.max_attempts,
+            run_after=datetime.utcnow()
+        )
+        db.add(job)
+
+        if commit:
+            db.commit()
+            db.refresh(job)
+        else:
+            db.flush()
+
+        logger.info(f"Queued processing job {job.id} for document {document_id}")
+        return job
+
+    def enqueue_batch(self, db: Session, batch_id: int, commit: bool = True) -> ProcessingJob:
+        """
+        Queue all documents of a batch upload as one job.
+
+        Args:
+            db: Database session
+            batch_id: Batch to process
+            commit: Commit immediately (False to join the caller's transaction)
+
+        Returns:
+            Created job
+        """
+        job = ProcessingJob(
+            batch_id=batch_id,
+            status=JobStatus.QUEUED,
+            max_attempts=self.max_attempts,
+            run_after=datetime.utcnow()
+        )
+        db.add(job)
+
+        if commit:
+            db.commit()
+            db.refresh(job)
+        else:
+            db.flush()
+
+        logger.info(f"Queued processing job {job.id} for batch {batch_id}")
+        return job
+
+    def claim_next(self, db: Session, worker_id: str) -> Optional[ProcessingJob]:
+        """
+        Claim the next runnable job for a worker.
+
+        Args:
+            db: Database session
+            worker_id: Identifier of the claiming worker
+
+        Returns:
+            Claimed job (status RUNNING); a job whose lease expired on its last
+            attempt (status FAILED, for the caller to settle its documents);
+            or None if the queue is empty
+        """
+        now = datetime.utcnow()
+        lease_expired_before = now - timedelta(seconds=self.lock_timeout)
+
+        job = db.query(ProcessingJob)\
+            .filter(
+                or_(
+                    and_(
+                        ProcessingJob.status == JobStatus.QUEUED,
+                        ProcessingJob.run_after <= now
+                    ),
+                    and_(
+                        ProcessingJob.status == JobStatus.RUNNING,
+                        ProcessingJob.locked_at < lease_expired_before
+                    )
+                )
+            )\
+            .order_by(ProcessingJob.run_after, ProcessingJob.id)\
+            .with_for_update(skip_locked=True)\
+            .first()
+
+        if not job:
+            db.commit()  # Release the snapshot
+            return None
+
+        if job.status == JobStatus.RUNNING:
+            if job.attempts >= job.max_attempts:
+                # The job keeps taking its worker down (crash, OOM kill): don't run it again
+                job.last_error = f"Lease of {job.locked_by} expired on attempt {job.attempts}/{job.max_attempts}"
+                job.status = JobStatus.FAILED
+                job.locked_by = None
+                job.locked_at = None
+                db.commit()
+                db.refresh(job)
+                logger.error(f"Job {job.id} permanently failed: {job.last_error}")
+                return job
+            logger.warning(f"Reclaiming job {job.id} from {job.locked_by} (lease expired)")
+
+        job.status = JobStatus.RUNNING
+        job.locked_by = worker_id
+        job.locked_at = now
+        job.attempts += 1
+        db.commit()
+        db.refresh(job)
+
+        return job
+
+    def heartbeat(self, db: Session, job_id: int, worker_id: str) -> bool:
+        """
+        Refresh the lease of a running job.
+
+        Returns:
+            False if the job is no longer owned by this worker
+        """
+        updated = db.query(ProcessingJob)\
+            .filter(ProcessingJob.id == job_id)\
+            .filter(ProcessingJob.locked_by == worker_id)\
+            .filter(ProcessingJob.status == JobStatus.RUNNING)\
+            .update({ProcessingJob.locked_at: datetime.utcnow()}, synchronize_session=False)
+        db.commit()
+        return updated > 0
+
+    def mark_completed(self, db: Session, job_id: int, worker_id: str):
+        """Mark a job as completed and release its lease (if the worker still owns it)."""
+        db.query(ProcessingJob)\
+            .filter(ProcessingJob.id == job_id)\
+            .filter(ProcessingJob.locked_by == worker_id)\
+            .update({
+                ProcessingJob.status: JobStatus.COMPLETED,
+                ProcessingJob.locked_by: None,
+                ProcessingJob.locked_at: None,
+                ProcessingJob.last_error: None,
+            }, synchronize_session=False)
+        db.commit()
+
+    def mark_failed(self, db: Session, job_id: int, worker_id: str, error: str) -> Optional[bool]:
+        """
+        Record a failed attempt, re-queueing the job with exponential backoff.
+
+        Args:
+            db: Database session
+            job_id: Job that failed
+            worker_id: Worker that ran the attempt
+            error: Error message
+
+        Returns:
+            True if the job will be retried, False if it is permanently failed,
+            None if the worker no longer owns the job (it was reclaimed)
+        """
+        job = db.query(ProcessingJob)\
+            .filter(ProcessingJob.id == job_id)\
+            .filter(ProcessingJob.locked_by == worker_id)\
+            .with_for_update()\
+            .first()
+        if not job:
+            db.commit()
+            return None
+
+        job.last_error = error[:2000]
+        job.locked_by = None
+        job.locked_at = None
+
+        if job.attempts < job.max_attempts:
+            delay = self.retry_delay * (2 ** (job.attempts - 1))
+            job.status = JobStatus.QUEUED
+            job.run_after = datetime.utcnow() + timedelta(seconds=delay)
+            db.commit()
+            logger.warning(f"Job {job_id} failed (attempt {job.attempts}/{job.max_attempts}), "
+                           f"retrying in {delay}s: {error}")
+            return True
+
+        job.status = JobStatus.FAILED
+        db.commit()
+        logger.error(f"Job {job_id} permanently failed after {job.attempts} attempts: {error}")
+        return False
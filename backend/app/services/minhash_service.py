@@ -0,0 +1,94 @@
+"""MinHash signatures of document text and their LSH bands, for near-duplicate detection."""
+import hashlib
+import re
+import zlib
+from typing import List, Optional
+
+import numpy as np
+
+# Characters per shingle; character shingles tolerate OCR errors inside words
+SHINGLE_SIZE = 5
+
+# Signature length, split into NUM_BANDS bands of ROWS_PER_BAND values. Documents
+# sharing a band are candidates: a pair with Jaccard similarity 0.85 shares one
+# with probability 1 - (1 - 0.85^8)^16 = 0.99, a pair at 0.5 with 0.06.
+# Changing these (or the seed) requires recomputing the stored signatures.
+NUM_BANDS = 16
+ROWS_PER_BAND = 8
+NUM_PERMUTATIONS = NUM_BANDS * ROWS_PER_BAND
+
+# Texts shorter than this (after normalization) get no signature
+MIN_TEXT_LENGTH = 100
+
+# Universal hashing h(x) = (a * x + b) mod p, one (a, b) per permutation
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240601)
+_A = _rng.integers(1, _PRIME, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+# Shingles hashed per numpy block (bounds memory for long texts)
+_BLOCK_SIZE = 8192
+
+
+class MinHashService:
+    """Service computing MinHash signatures over the whole text of a document.
+
+    The fraction of equal signature values estimates the Jaccard similarity
+    of the documents' shingle sets; the LSH band hashes are stored in
+    ``document_minhash_bands`` so candidates are found with indexed
+    equality lookups instead of comparing against every document.
+    """
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Lowercase and collapse punctuation and whitespace (layout differs between scans)."""
+        return re.sub(r"[\W_]+", " ", text.lower()).strip()
+
+    def signature(self, text: Optional[str]) -> Optional[List[int]]:
+        """
+        MinHash signature of a text.
+
+        Args:
+            text: Document text
+
+        Returns:
+            NUM_PERMUTATIONS values, or None if the text is too short
+        """
+        normalized = self.normalize(text or "")
+        if len(normalized) < MIN_TEXT_LENGTH:
+            return None
+
+        shingles = {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+
+        signature = np.full(NUM_PERMUTATIONS, _PRIME, dtype=np.uint64)
+        for start in range(0, len(hashes), _BLOCK_SIZE):
+            block = hashes[start:start + _BLOCK_SIZE, None]
+            np.minimum(signature, ((block * _A + _B) % _PRIME).min(axis=0), out=signature)
+        return signature.astype(np.int64).tolist()
+
+    @staticmethod
+    def band_hashes(signature: List[int]) -> List[int]:
+        """
+        LSH band hashes of a signature (signed 64-bit, for a BIGINT column).
+
+        The band number is part of the hashed value, so equal hashes mean
+        the same band with the same values.
+        """
+        hashes = []
+        for band in range(NUM_BANDS):
+            rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+            digest = hashlib.blake2b(repr((band, rows)).encode(), digest_size=8).digest()
+            hashes.append(int.from_bytes(digest, "big", signed=True))
+        return hashes
+
+    @staticmethod
+    def similarity(first: List[int], second: List[int]) -> float:
+        """Estimated Jaccard similarity of the texts of two signatures."""
+        if not first or not second or len(first) != len(second):
+            return 0.0
+        return sum(a == b for a, b in zip(first, second)) / len(first)
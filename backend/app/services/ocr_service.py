@@ -1,10 +1,11 @@
 """OCR service with Google Cloud Vision API and local fallback."""
 import os
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Tuple
 from loguru import logger
 from PIL import Image
 import pytesseract
+import asyncio
 import io
 
 try:
@@ -16,6 +17,85 @@ except ImportError:
     logger.warning("google-cloud-vision not installed, will use local OCR only")
 
 from app.config import settings
+from app.process_pool import run_in_process_pool
+
+
+def _words_from_tesseract_data(data: Dict[str, List[Any]]) -> Tuple[str, List[Dict[str, Any]], float]:
+    """
+    Rebuild text, word boxes and mean confidence from image_to_data output.
+    
+    Words are joined by spaces within a line, lines by newlines, and
+    paragraphs/blocks are separated by a blank line, matching the layout of
+    image_to_string.
+    
+    Args:
+        data: pytesseract.image_to_data result as a dict of columns
+        
+    Returns:
+        Tuple of (text, words, confidence 0-1)
+    """
+    words = []
+    lines: List[str] = []
+    current_words: List[str] = []
+    current_line = None
+    current_paragraph = None
+    
+    for i, raw_text in enumerate(data.get('text', [])):
+        word = (raw_text or '').strip()
+        try:
+            conf = float(data['conf'][i])
+        except (TypeError, ValueError):
+            conf = -1.0
+        if not word or conf < 0:
+            continue
+        
+        paragraph = (data['page_num'][i], data['block_num'][i], data['par_num'][i])
+        line = paragraph + (data['line_num'][i],)
+        
+        if line != current_line:
+            if current_words:
+                lines.append(' '.join(current_words))
+                current_words = []
+            if current_paragraph is not None and paragraph != current_paragraph:
+                lines.append('')
+            current_line = line
+            current_paragraph = paragraph
+        
+        current_words.append(word)
+        words.append({
+            'text': word,
+            'conf': conf,
+            'left': int(data['left'][i]),
+            'top': int(data['top'][i]),
+            'width': int(data['width'][i]),
+            'height': int(data['height'][i]),
+            'page': int(data['page_num'][i]),
+            'block': int(data['block_num'][i]),
+            'line': int(data['line_num'][i])
+        })
+    
+    if current_words:
+        lines.append(' '.join(current_words))
+    
+    confidence = sum(w['conf'] for w in words) / len(words) / 100.0 if words else 0.0
+    return '\n'.join(lines), words, confidence
+
+
+def _run_tesseract(file_path: str, tesseract_langs: str) -> Dict[str, Any]:
+    """Run Tesseract once on an image (executed in the shared process pool)."""
+    image = Image.open(file_path)
+    
+    # Single pass: text, word boxes and confidence all come from image_to_data
+    data = pytesseract.image_to_data(image, lang=tesseract_langs, output_type=pytesseract.Output.DICT)
+    text, words, avg_confidence = _words_from_tesseract_data(data)
+    
+    return {
+        'text': text,
+        'confidence': avg_confidence,
+        'method': 'tesseract',
+        'pages': 1,
+        'words': words
+    }
 
 
 class OCRService:
@@ -109,8 +189,8 @@ class OCRService:
         
         image = vision.Image(content=content)
         
-        # Perform text detection
-        response = self.vision_client.document_text_detection(image=image)
+        # Perform text detection (blocking gRPC call, keep it off the event loop)
+        response = await asyncio.to_thread(self.vision_client.document_text_detection, image=image)
         
         if response.error.message:
             raise Exception(f"Google Vision API error: {response.error.message}")
@@ -151,29 +231,15 @@ class OCRService:
             languages: List of language codes
             
         Returns:
-            Dict with extracted text and metadata
+            Dict with extracted text, confidence and word boxes
         """
         try:
-            image = Image.open(file_path)
-            
             # Convert language codes to Tesseract format
             lang_map = {'fr': 'fra', 'de': 'deu', 'en': 'eng'}
             tesseract_langs = '+'.join([lang_map.get(lang, lang) for lang in languages])
             
-            # Extract text
-            text = pytesseract.image_to_string(image, lang=tesseract_langs)
-            
-            # Get confidence data
-            data = pytesseract.image_to_data(image, lang=tesseract_langs, output_type=pytesseract.Output.DICT)
-            confidences = [int(conf) for conf in data['conf'] if conf != '-1']
-            avg_confidence = sum(confidences) / len(confidences) / 100.0 if confidences else 0.0
-            
-            return {
-                'text': text,
-                'confidence': avg_confidence,
-                'method': 'tesseract',
-                'pages': 1
-            }
+            # CPU-bound: run in the process pool so the event loop stays responsive
+            return await run_in_process_pool(_run_tesseract, file_path, tesseract_langs)
         except Exception as e:
             logger.error(f"Tesseract OCR error: {e}")
             raise
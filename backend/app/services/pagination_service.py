@@ -0,0 +1,171 @@
+"""Keyset (cursor) pagination for document listings."""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import literal_column, tuple_
+from sqlalchemy.orm import Query
+
+from app.models.document import Document
+
+
+class KeysetOrder:
+    """A listing sort order usable for keyset pagination.
+
+    The key columns must end with a unique column (the id) and all sort in
+    the same direction, so a page boundary is a single row-value comparison
+    that a composite index on the same expressions can seek to.
+    """
+
+    def __init__(self, name: str, columns: List[Any], descending: bool = True):
+        self.name = name
+        self.columns = columns
+        self.descending = descending
+
+    def order_by(self) -> List[Any]:
+        return [column.desc() if self.descending else column.asc() for column in self.columns]
+
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# NULL sort keys are replaced by a constant (NULLS LAST in descending order),
+# spelled the same way as in the index expressions of migration 016
+IMPORTANCE_SORT_KEY = literal_column("coalesce(documents.importance_score, -1)")
+DOCUMENT_DATE_SORT_KEY = literal_column("coalesce(documents.document_date, DATE '0001-01-01')")
+
+NEWEST_FIRST = KeysetOrder("created", [Document.created_at, Document.id])
+MOST_IMPORTANT_FIRST = KeysetOrder("importance", [IMPORTANCE_SORT_KEY, Document.created_at, Document.id])
+CLOSEST_DEADLINE_FIRST = KeysetOrder("deadline", [Document.deadline, Document.id], descending=False)
+NEWEST_DOCUMENT_DATE_FIRST = KeysetOrder("document_date", [DOCUMENT_DATE_SORT_KEY, Document.created_at, Document.id])
+
+
+class PaginationService:
+    """Service for offset and opaque-cursor pagination of document queries."""
+
+    @staticmethod
+    def encode_cursor(order: KeysetOrder, values: List[Any]) -> str:
+        """
+        Encode the sort key values of the last row of a page.
+
+        Args:
+            order: Sort order of the listing
+            values: Key values, in the order of order.columns
+
+        Returns:
+            Opaque URL-safe cursor
+        """
+        encoded = []
+        for value in values:
+            if isinstance(value, datetime):
+                encoded.append({'dt': value.isoformat()})
+            elif isinstance(value, date):
+                encoded.append({'d': value.isoformat()})
+            elif isinstance(value, Decimal):
+                encoded.append(float(value))
+            else:
+                encoded.append(value)
+        payload = json.dumps({'o': order.name, 'k': encoded}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(order: KeysetOrder, cursor: str) -> List[Any]:
+        """
+        Decode a cursor created by encode_cursor.
+
+        Args:
+            order: Sort order of the listing
+            cursor: Cursor from a previous page
+
+        Returns:
+            Key values
+
+        Raises:
+            ValueError: If the cursor is malformed or belongs to another sort order
+        """
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if payload['o'] != order.name or len(payload['k']) != len(order.columns):
+                raise ValueError("cursor does not match this listing")
+
+            values = []
+            for value in payload['k']:
+                if isinstance(value, dict) and 'dt' in value:
+                    values.append(datetime.fromisoformat(value['dt']))
+                elif isinstance(value, dict) and 'd' in value:
+                    values.append(date.fromisoformat(value['d']))
+                elif value is None or isinstance(value, (int, float, str)):
+                    values.append(value)
+                else:
+                    raise ValueError("unexpected cursor value")
+            return values
+        except (KeyError, TypeError, UnicodeDecodeError, json.JSONDecodeError, binascii.Error) as e:
+            raise ValueError(f"Invalid cursor: {e}")
+
+    def page_query(
+        self,
+        query: Query,
+        order: KeysetOrder,
+        limit: int,
+        cursor: Optional[str] = None,
+        skip: int = 0
+    ) -> Query:
+        """
+        Build the query of one page: rows with their key values, plus one
+        extra row that tells whether a next page exists.
+
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        if cursor:
+            values = self.decode_cursor(order, cursor)
+            keys, after = tuple_(*order.columns), tuple_(*values)
+            query = query.filter(keys < after if order.descending else keys > after)
+        elif skip:
+            query = query.offset(skip)
+
+        # Select the key values along with each row so the cursor uses exactly what Postgres compared
+        return query\
+            .add_columns(*[column.label(f"_key_{index}") for index, column in enumerate(order.columns)])\
+            .order_by(*order.order_by())\
+            .limit(limit + 1)
+
+    def paginate(
+        self,
+        query: Query,
+        order: KeysetOrder,
+        limit: int,
+        cursor: Optional[str] = None,
+        skip: int = 0
+    ) -> Tuple[List[Any], Optional[str]]:
+        """
+        Fetch one page of a query.
+
+        With a cursor, the page starts right after the row the cursor was
+        taken from (skip is ignored); otherwise skip rows are skipped as
+        with plain offset paging.
+
+        Args:
+            query: Filtered query of a single entity (not yet ordered)
+            order: Sort order of the listing
+            limit: Page size
+            cursor: Cursor returned with the previous page
+            skip: Offset, when no cursor is given
+
+        Returns:
+            Tuple of (rows, cursor of the next page or None on the last page)
+
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        rows = self.page_query(query, order, limit, cursor=cursor, skip=skip).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self.encode_cursor(order, list(rows[-1][1:]))
+
+        return [row[0] for row in rows], next_cursor
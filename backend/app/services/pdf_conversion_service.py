@@ -3,13 +3,32 @@ import os
 import tempfile
 import shutil
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Dict, Any
 from loguru import logger
 from PIL import Image
 import ocrmypdf
 from ocrmypdf.exceptions import PriorOcrFoundError
 
 from app.config import settings
+from app.process_pool import run_in_process_pool
+
+
+def _image_to_pdf(image_path: str, pdf_path: str):
+    """Convert an image to a single-page PDF (executed in the shared process pool)."""
+    image = Image.open(image_path)
+    
+    # Convert to RGB if necessary
+    if image.mode in ('RGBA', 'LA', 'P'):
+        rgb_image = Image.new('RGB', image.size, (255, 255, 255))
+        if image.mode == 'P':
+            image = image.convert('RGBA')
+        rgb_image.paste(image, mask=image.split()[-1] if image.mode in ('RGBA', 'LA') else None)
+        image = rgb_image
+    elif image.mode != 'RGB':
+        image = image.convert('RGB')
+    
+    # Save as PDF
+    image.save(pdf_path, 'PDF', resolution=300.0)
 
 
 class PDFConversionService:
@@ -28,7 +47,8 @@ class PDFConversionService:
         self,
         input_path: str,
         output_path: str,
-        languages: Optional[list] = None
+        languages: Optional[list] = None,
+        sidecar_path: Optional[str] = None
     ) -> Tuple[bool, str, Optional[str]]:
         """
         Ensure document is a searchable PDF with OCR layer.
@@ -37,6 +57,8 @@ class PDFConversionService:
             input_path: Path to input file (image or PDF)
             output_path: Path for output searchable PDF
             languages: List of language codes (e.g., ['fra', 'deu', 'eng'])
+            sidecar_path: Optional path where OCRmyPDF writes the recognized text
+                (not written when the PDF already had a text layer)
             
         Returns:
             Tuple of (success, output_path, error_message)
@@ -52,10 +74,10 @@ class PDFConversionService:
             
             if file_extension == '.pdf':
                 # Add OCR layer to existing PDF
-                return await self.add_ocr_layer_to_pdf(input_path, output_path, languages)
+                return await self.add_ocr_layer_to_pdf(input_path, output_path, languages, sidecar_path)
             elif file_extension in ['.jpg', '.jpeg', '.png', '.tiff', '.tif', '.bmp']:
                 # Convert image to searchable PDF
-                return await self.convert_image_to_searchable_pdf(input_path, output_path, languages)
+                return await self.convert_image_to_searchable_pdf(input_path, output_path, languages, sidecar_path)
             else:
                 error_msg = f"Unsupported file type: {file_extension}"
                 logger.warning(error_msg)
@@ -70,7 +92,8 @@ class PDFConversionService:
         self,
         image_path: str,
         output_pdf_path: str,
-        languages: list
+        languages: list,
+        sidecar_path: Optional[str] = None
     ) -> Tuple[bool, str, Optional[str]]:
         """
         Convert image to searchable PDF with OCR layer.
@@ -79,6 +102,7 @@ class PDFConversionService:
             image_path: Path to image file
             output_pdf_path: Path for output PDF
             languages: List of language codes
+            sidecar_path: Optional path for the recognized text
             
         Returns:
             Tuple of (success, output_path, error_message)
@@ -92,23 +116,10 @@ class PDFConversionService:
             
             try:
                 # Convert image to PDF using Pillow
-                image = Image.open(image_path)
-                
-                # Convert to RGB if necessary
-                if image.mode in ('RGBA', 'LA', 'P'):
-                    rgb_image = Image.new('RGB', image.size, (255, 255, 255))
-                    if image.mode == 'P':
-                        image = image.convert('RGBA')
-                    rgb_image.paste(image, mask=image.split()[-1] if image.mode in ('RGBA', 'LA') else None)
-                    image = rgb_image
-                elif image.mode != 'RGB':
-                    image = image.convert('RGB')
-                
-                # Save as PDF
-                image.save(temp_pdf_path, 'PDF', resolution=300.0)
+                await run_in_process_pool(_image_to_pdf, image_path, temp_pdf_path)
                 
                 # Now add OCR layer
-                return await self.add_ocr_layer_to_pdf(temp_pdf_path, output_pdf_path, languages)
+                return await self.add_ocr_layer_to_pdf(temp_pdf_path, output_pdf_path, languages, sidecar_path)
                 
             finally:
                 # Clean up temp file
@@ -124,7 +135,8 @@ class PDFConversionService:
         self,
         input_pdf_path: str,
         output_pdf_path: str,
-        languages: list
+        languages: list,
+        sidecar_path: Optional[str] = None
     ) -> Tuple[bool, str, Optional[str]]:
         """
         Add OCR text layer to PDF.
@@ -133,6 +145,7 @@ class PDFConversionService:
             input_pdf_path: Path to input PDF
             output_pdf_path: Path for output PDF with OCR
             languages: List of language codes
+            sidecar_path: Optional path for the recognized text
             
         Returns:
             Tuple of (success, output_path, error_message)
@@ -163,9 +176,13 @@ class PDFConversionService:
                 'rotate_pages': True,  # Auto-rotate pages
                 'rotate_pages_threshold': 14.0,  # Rotation confidence threshold
             }
+            if sidecar_path:
+                # Recognized text as plain text, so the text layer never has to be re-parsed
+                ocrmypdf_options['sidecar'] = sidecar_path
             
-            # Run OCRmyPDF
-            ocrmypdf.ocr(
+            # Run OCRmyPDF in the process pool (CPU-bound, would block the event loop)
+            await run_in_process_pool(
+                ocrmypdf.ocr,
                 input_pdf_path,
                 output_pdf_path,
                 **ocrmypdf_options
@@ -190,6 +207,59 @@ class PDFConversionService:
             except:
                 return False, input_pdf_path, error_msg
     
+    def read_sidecar_text(self, sidecar_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Read the text written by OCRmyPDF's sidecar option.
+        
+        OCRmyPDF does not report word confidences, so confidence is estimated
+        from the share of well-formed words in the recognized text.
+        
+        Args:
+            sidecar_path: Path to the sidecar text file
+            
+        Returns:
+            Dict with 'text', 'confidence', 'method' and 'pages', or None if
+            no sidecar was written (PDF already had a text layer)
+        """
+        if not sidecar_path or not os.path.exists(sidecar_path):
+            return None
+        
+        with open(sidecar_path, 'r', encoding='utf-8', errors='replace') as f:
+            raw_text = f.read()
+        
+        # Pages are separated by form feeds
+        pages = [page.strip() for page in raw_text.split('\f')]
+        text = "\n\n".join(page for page in pages if page)
+        
+        return {
+            'text': text,
+            'confidence': self._estimate_text_confidence(text),
+            'method': 'ocrmypdf',
+            'pages': len(pages)
+        }
+    
+    def _estimate_text_confidence(self, text: str) -> float:
+        """
+        Estimate OCR quality (0-1) as the share of tokens that look like words.
+        
+        Args:
+            text: Recognized text
+            
+        Returns:
+            Estimated confidence
+        """
+        tokens = text.split()
+        if not tokens:
+            return 0.0
+        
+        well_formed = 0
+        for token in tokens:
+            alnum = sum(1 for c in token if c.isalnum())
+            if alnum and alnum / len(token) >= 0.6:
+                well_formed += 1
+        
+        return round(well_formed / len(tokens), 3)
+    
     def extract_text_from_searchable_pdf(self, pdf_path: str) -> str:
         """
         Extract text from searchable PDF.
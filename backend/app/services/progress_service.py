@@ -0,0 +1,163 @@
+"""Document processing progress events (Postgres LISTEN/NOTIFY).
+
+The pipeline publishes an event with ``pg_notify`` inside the transaction
+that records a stage, so it is delivered exactly when the stage is
+committed (and never for a rolled back one). Each API process keeps one
+asyncpg connection LISTENing on the channel and fans the events out to its
+server-sent event streams.
+"""
+import asyncio
+import json
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from app.config import settings
+from app.models.document import Document, DocumentStatus, ProcessingStage
+
+# NOTIFY channel of the progress events
+PROGRESS_CHANNEL = "document_progress"
+
+# Event of a document deleted as an exact duplicate
+REMOVED_EVENT = "removed"
+
+# Events buffered per stream; the oldest are dropped for a client that does not keep up
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def stage_progress(stage: Optional[str]) -> float:
+    """Fraction of the pipeline stages completed, from a processing_stage value."""
+    stages = list(ProcessingStage)
+    try:
+        completed = stages.index(ProcessingStage(stage)) + 1
+    except ValueError:
+        completed = 0  # Not started (or unknown stage)
+    return round(completed / len(stages), 2)
+
+
+def progress_event(document: Document, event: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Progress event of a document in its current state.
+
+    Args:
+        document: Document (or row with its id, user_id, batch_id, status and processing_stage)
+        event: Event name; defaults to the last completed stage ("queued" before the first)
+
+    Returns:
+        Event payload
+    """
+    status = document.status.value if isinstance(document.status, DocumentStatus) else document.status
+    return {
+        "event": event or document.processing_stage or "queued",
+        "document_id": document.id,
+        "user_id": document.user_id,
+        "batch_id": document.batch_id,
+        "status": status,
+        "stage": document.processing_stage,
+        "progress": stage_progress(document.processing_stage),
+    }
+
+
+def is_final(event: Dict[str, Any]) -> bool:
+    """Whether no further event will follow for the document (until it is retried)."""
+    return event["event"] == REMOVED_EVENT or event["status"] in (
+        DocumentStatus.COMPLETED.value, DocumentStatus.FAILED.value
+    )
+
+
+class ProgressService:
+    """Publishes progress events from the processing pipeline."""
+
+    @staticmethod
+    def publish(db: Session, document: Document, event: Optional[str] = None):
+        """
+        Queue a progress event in the session's transaction (sent on commit).
+
+        Args:
+            db: Database session of the transaction recording the change
+            document: Document in its new state
+            event: Event name (see progress_event)
+        """
+        db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": PROGRESS_CHANNEL, "payload": json.dumps(progress_event(document, event))}
+        )
+
+
+class ProgressBroker:
+    """In-process fan-out of the progress notifications to event streams.
+
+    The LISTEN connection is opened with the first subscriber, closed with
+    the last one, and reopened by ensure_listening() if it was lost.
+    Subscribers receive all events of their user and filter them.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._connection: Optional[asyncpg.Connection] = None
+        self._lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: int) -> AsyncIterator[asyncio.Queue]:
+        """
+        Receive the progress events of a user's documents.
+
+        Args:
+            user_id: User ID
+
+        Yields:
+            Queue of event payloads
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers[user_id].add(queue)
+        try:
+            await self.ensure_listening()
+            yield queue
+        finally:
+            self._subscribers[user_id].discard(queue)
+            if not self._subscribers[user_id]:
+                del self._subscribers[user_id]
+            if not self._subscribers:
+                await self._close()
+
+    async def ensure_listening(self):
+        """Open the LISTEN connection if it is not open."""
+        async with self._lock:
+            if self._connection is not None and not self._connection.is_closed():
+                return
+            dsn = make_url(settings.DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+            connection = await asyncpg.connect(dsn, timeout=settings.DB_CONNECT_TIMEOUT)
+            await connection.add_listener(PROGRESS_CHANNEL, self._dispatch)
+            self._connection = connection
+            logger.debug(f"Listening on '{PROGRESS_CHANNEL}'")
+
+    async def _close(self):
+        async with self._lock:
+            if self._subscribers or self._connection is None:
+                return
+            connection, self._connection = self._connection, None
+            try:
+                await connection.close()
+            except Exception as e:
+                logger.warning(f"Error closing the '{PROGRESS_CHANNEL}' listener: {e}")
+
+    def _dispatch(self, connection, pid: int, channel: str, payload: str):
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Invalid progress event: {payload!r}")
+            return
+
+        for queue in list(self._subscribers.get(event.get("user_id"), ())):
+            if queue.full():
+                queue.get_nowait()  # Drop the oldest event; the last one carries the current state
+            queue.put_nowait(event)
+
+
+progress_broker = ProgressBroker()
@@ -1,16 +1,121 @@
 """RAG (Retrieval Augmented Generation) service."""
-from typing import List, Dict, Any
-from sqlalchemy.orm import Session
+import asyncio
+import time
+from typing import List, Dict, Any, Optional
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
 
 from app.models.document import DocumentChunk, Document
+from app.models.database import AsyncSessionLocal
 from app.services.embedding_service import EmbeddingService
+from app.services.document_search_service import DocumentSearchService
 from app.config import settings
 
 
+# Columns shared by both retrieval modes (filing cabinet metadata for agent context)
+DOCUMENT_COLUMNS = """
+    d.filename,
+    d.original_filename,
+    d.display_name,
+    d.document_type,
+    d.storage_year,
+    d.document_date,
+    d.file_path,
+    d.ocr_pdf_path,
+    d.created_at
+"""
+
+# Nearest chunks first (ORDER BY distance + LIMIT can use the HNSW index, or
+# the user_id index for small collections), then the similarity threshold on
+# that short list only. Cosine distance = 1 - cosine_similarity. The embedding
+# is passed as text and cast, as asyncpg has no codec for the vector type.
+#
+# The HNSW index covers all users, so user_id filters its ef_search candidates
+# afterwards: a user owning 0.1% of the chunks keeps about 0.1 of 100 and often
+# gets no results. With hnsw.iterative_scan (pgvector >= 0.8) the scan goes on
+# until LIMIT rows pass the filter, up to hnsw.max_scan_tuples. relaxed_order
+# may return the nearest rows slightly out of order, hence the materialized CTE
+# re-sorted by distance; a user whose chunks are not among the first
+# max_scan_tuples visited still gets fewer rows (the planner picks the user_id
+# index for such small collections). scripts/benchmark_vector_search.py
+# measures the recall of each setting.
+VECTOR_SQL = text(f"""
+    WITH nearest AS MATERIALIZED (
+        SELECT
+            dc.id,
+            dc.content,
+            dc.chunk_index,
+            dc.page_number,
+            dc.document_id,
+            dc.embedding <=> CAST(CAST(:query_embedding AS text) AS vector) AS distance
+        FROM document_chunks dc
+        WHERE dc.user_id = :user_id
+            AND dc.embedding IS NOT NULL
+        ORDER BY dc.embedding <=> CAST(CAST(:query_embedding AS text) AS vector)
+        LIMIT :max_results
+    )
+    SELECT 
+        n.id,
+        n.content,
+        n.chunk_index,
+        n.page_number,
+        n.document_id,
+        {DOCUMENT_COLUMNS},
+        1 - n.distance as similarity
+    FROM nearest n
+    JOIN documents d ON n.document_id = d.id
+    WHERE 1 - n.distance >= :threshold
+    ORDER BY n.distance
+""")
+
+# First pgvector release with hnsw.iterative_scan and hnsw.max_scan_tuples
+ITERATIVE_SCAN_MIN_VERSION = (0, 8)
+
+# Full-text matches on chunk content (exact invoice numbers, IBANs, AHV numbers...)
+LEXICAL_SQL = text(f"""
+    WITH q AS (
+        SELECT to_tsquery('french', :tsquery)
+            || to_tsquery('german', :tsquery)
+            || to_tsquery('english', :tsquery) AS query
+    ),
+    matches AS (
+        SELECT
+            dc.id,
+            dc.content,
+            dc.chunk_index,
+            dc.page_number,
+            dc.document_id,
+            ts_rank_cd(dc.search_vector, q.query) AS lexical_score
+        FROM document_chunks dc, q
+        WHERE dc.user_id = :user_id
+            AND dc.search_vector @@ q.query
+        ORDER BY lexical_score DESC
+        LIMIT :max_results
+    )
+    SELECT 
+        m.id,
+        m.content,
+        m.chunk_index,
+        m.page_number,
+        m.document_id,
+        {DOCUMENT_COLUMNS},
+        m.lexical_score
+    FROM matches m
+    JOIN documents d ON m.document_id = d.id
+    ORDER BY m.lexical_score DESC
+""")
+
+
 class RAGService:
-    """Service for semantic search using RAG."""
+    """Service for semantic search using RAG.
+    
+    Supports vector search (pgvector), full-text search over chunk content,
+    and a hybrid of both fused with reciprocal-rank fusion.
+    """
+    
+    # Whether the installed pgvector has iterative scans (checked once per process)
+    _iterative_scan_supported: Optional[bool] = None
     
     def __init__(self):
         self.embedding_service = EmbeddingService()
@@ -19,98 +124,247 @@ class RAGService:
         self,
         query: str,
         user_id: int,
-        db: Session,
+        db: AsyncSession,
         max_results: int = None,
-        similarity_threshold: float = None
+        similarity_threshold: float = None,
+        mode: str = None
     ) -> List[Dict[str, Any]]:
-        """Search documents using semantic similarity.
+        """Search documents using semantic similarity and/or full-text matching.
         
         Args:
             query: Search query
             user_id: User ID to filter documents
-            db: Database session
+            db: Async database session
             max_results: Maximum number of results (default from settings)
             similarity_threshold: Minimum similarity score (default from settings)
+            mode: 'hybrid', 'vector' or 'lexical' (default from settings)
             
         Returns:
             List of relevant document chunks with metadata
         """
+        search_result = await self.search(query, user_id, db, max_results, similarity_threshold, mode)
+        return search_result['results']
+    
+    async def search(
+        self,
+        query: str,
+        user_id: int,
+        db: AsyncSession,
+        max_results: int = None,
+        similarity_threshold: float = None,
+        mode: str = None
+    ) -> Dict[str, Any]:
+        """Search document chunks and report per-stage timings.
+        
+        In hybrid mode the full-text query (own short-lived session) runs
+        while the query embedding is created and the vector query runs; both
+        candidate lists are then fused with RRF.
+        
+        Args:
+            query: Search query
+            user_id: User ID to filter documents
+            db: Async database session
+            max_results: Maximum number of results (default from settings)
+            similarity_threshold: Minimum similarity score (default from settings)
+            mode: 'hybrid', 'vector' or 'lexical' (default from settings)
+            
+        Returns:
+            Dict with 'results', 'mode' and 'timings' (milliseconds per stage)
+        """
         if max_results is None:
             max_results = settings.MAX_RESULTS
         if similarity_threshold is None:
             similarity_threshold = settings.SIMILARITY_THRESHOLD
+        mode = mode or settings.RAG_SEARCH_MODE
+        
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+        results: List[Dict[str, Any]] = []
         
         try:
-            # Create embedding for query
-            query_embedding = await self.embedding_service.create_embedding(query)
-            
-            # Perform vector similarity search
-            # Using cosine distance (1 - cosine_similarity)
-            # Include filing cabinet metadata for agent context
-            sql = text("""
-                SELECT 
-                    dc.id,
-                    dc.content,
-                    dc.chunk_index,
-                    dc.page_number,
-                    dc.document_id,
-                    d.filename,
-                    d.original_filename,
-                    d.display_name,
-                    d.document_type,
-                    d.storage_year,
-                    d.document_date,
-                    d.file_path,
-                    d.ocr_pdf_path,
-                    d.created_at,
-                    1 - (dc.embedding <=> :query_embedding) as similarity
-                FROM document_chunks dc
-                JOIN documents d ON dc.document_id = d.id
-                WHERE d.user_id = :user_id
-                    AND dc.embedding IS NOT NULL
-                    AND 1 - (dc.embedding <=> :query_embedding) >= :threshold
-                ORDER BY dc.embedding <=> :query_embedding
-                LIMIT :max_results
-            """)
-            
-            results = db.execute(
-                sql,
-                {
-                    "query_embedding": str(query_embedding),
-                    "user_id": user_id,
-                    "threshold": similarity_threshold,
-                    "max_results": max_results
-                }
-            ).fetchall()
-            
-            # Format results with filing cabinet metadata
-            formatted_results = []
-            for row in results:
-                formatted_results.append({
-                    "chunk_id": row.id,
-                    "content": row.content,
-                    "chunk_index": row.chunk_index,
-                    "page_number": row.page_number,
-                    "document_id": row.document_id,
-                    "filename": row.filename,
-                    "original_filename": row.original_filename,
-                    "display_name": row.display_name,
-                    "document_type": row.document_type,
-                    "storage_year": row.storage_year,
-                    "document_date": row.document_date,
-                    "file_path": row.file_path,
-                    "ocr_pdf_path": row.ocr_pdf_path,
-                    "created_at": row.created_at,
-                    "similarity": float(row.similarity),
-                    "filing_location": f"{row.storage_year}/{row.document_type}" if row.storage_year else None
-                })
-            
-            logger.info(f"Found {len(formatted_results)} relevant chunks for query")
-            return formatted_results
+            if mode == "vector":
+                results = await self._vector_search(
+                    query, user_id, db, max_results, similarity_threshold, timings
+                )
+            elif mode == "lexical":
+                results = await self._lexical_search(query, user_id, max_results, timings)
+            else:
+                vector_results, lexical_results = await asyncio.gather(
+                    self._vector_search(
+                        query, user_id, db, settings.RAG_VECTOR_CANDIDATES, similarity_threshold, timings
+                    ),
+                    self._lexical_search(query, user_id, settings.RAG_LEXICAL_CANDIDATES, timings),
+                    return_exceptions=True
+                )
+                candidate_lists = []
+                for label, candidates in (("vector", vector_results), ("lexical", lexical_results)):
+                    if isinstance(candidates, Exception):
+                        logger.error(f"Error in {label} search, using the other mode only: {candidates}")
+                        candidate_lists.append([])
+                    else:
+                        candidate_lists.append(candidates)
+                
+                fusion_started = time.perf_counter()
+                results = self.fuse_results(candidate_lists[0], candidate_lists[1], max_results)
+                timings['fusion_ms'] = self._elapsed_ms(fusion_started)
             
         except Exception as e:
             logger.error(f"Error in RAG search: {e}")
+            results = []
+        
+        timings['total_ms'] = self._elapsed_ms(started)
+        logger.info(f"Found {len(results)} relevant chunks for query (mode={mode}, timings={timings})")
+        return {'results': results, 'mode': mode, 'timings': timings}
+    
+    async def _vector_search(
+        self,
+        query: str,
+        user_id: int,
+        db: AsyncSession,
+        max_results: int,
+        similarity_threshold: float,
+        timings: Dict[str, float]
+    ) -> List[Dict[str, Any]]:
+        """Nearest chunks by embedding similarity."""
+        stage_started = time.perf_counter()
+        # Create embedding for query
+        query_embedding = await self.embedding_service.create_embedding(query)
+        timings['embedding_ms'] = self._elapsed_ms(stage_started)
+        
+        stage_started = time.perf_counter()
+        # HNSW candidate list size and iterative scan for this transaction
+        await db.execute(
+            text("SELECT set_config('hnsw.ef_search', :ef_search, true)"),
+            {"ef_search": str(max(settings.RAG_HNSW_EF_SEARCH, max_results))}
+        )
+        if settings.RAG_HNSW_ITERATIVE_SCAN != "off" and await self._supports_iterative_scan(db):
+            await db.execute(
+                text(
+                    "SELECT set_config('hnsw.iterative_scan', :iterative_scan, true),"
+                    " set_config('hnsw.max_scan_tuples', :max_scan_tuples, true)"
+                ),
+                {
+                    "iterative_scan": settings.RAG_HNSW_ITERATIVE_SCAN,
+                    "max_scan_tuples": str(settings.RAG_HNSW_MAX_SCAN_TUPLES)
+                }
+            )
+        result = await db.execute(
+            VECTOR_SQL,
+            {
+                "query_embedding": str(query_embedding),
+                "user_id": user_id,
+                "threshold": similarity_threshold,
+                "max_results": max_results
+            }
+        )
+        rows = result.fetchall()
+        timings['vector_ms'] = self._elapsed_ms(stage_started)
+        
+        return [self._format_row(row, similarity=float(row.similarity)) for row in rows]
+    
+    @classmethod
+    async def _supports_iterative_scan(cls, db: AsyncSession) -> bool:
+        """Whether pgvector >= 0.8 is installed (older versions reject the hnsw.iterative_scan setting)."""
+        if cls._iterative_scan_supported is None:
+            result = await db.execute(text("SELECT extversion FROM pg_extension WHERE extname = 'vector'"))
+            version = result.scalar()
+            try:
+                parsed = tuple(int(part) for part in version.split(".")[:2])
+            except (AttributeError, ValueError):
+                parsed = (0, 0)
+            cls._iterative_scan_supported = parsed >= ITERATIVE_SCAN_MIN_VERSION
+            if not cls._iterative_scan_supported:
+                logger.warning(f"pgvector {version} has no HNSW iterative scan (needs 0.8), searching without it")
+        return cls._iterative_scan_supported
+    
+    async def _lexical_search(
+        self,
+        query: str,
+        user_id: int,
+        max_results: int,
+        timings: Dict[str, float]
+    ) -> List[Dict[str, Any]]:
+        """Chunks matching any query word, best full-text rank first."""
+        tsquery = DocumentSearchService.build_tsquery(query, match_all=False, prefix_last=False)
+        if not tsquery:
+            timings['lexical_ms'] = 0.0
             return []
+        
+        stage_started = time.perf_counter()
+        # Separate session: runs concurrently with the vector query
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                LEXICAL_SQL,
+                {"tsquery": tsquery, "user_id": user_id, "max_results": max_results}
+            )
+            rows = result.fetchall()
+        timings['lexical_ms'] = self._elapsed_ms(stage_started)
+        
+        return [self._format_row(row) for row in rows]
+    
+    @staticmethod
+    def fuse_results(
+        vector_results: List[Dict[str, Any]],
+        lexical_results: List[Dict[str, Any]],
+        max_results: int,
+        k: int = None
+    ) -> List[Dict[str, Any]]:
+        """Fuse two ranked chunk lists with reciprocal-rank fusion.
+        
+        Each chunk scores sum(1 / (k + rank)) over the lists it appears in, so
+        chunks found by both modes come first.
+        
+        Args:
+            vector_results: Chunks ranked by embedding similarity
+            lexical_results: Chunks ranked by full-text score
+            max_results: Number of chunks to keep
+            k: RRF constant (default from settings)
+            
+        Returns:
+            Fused chunks with 'rrf_score', 'vector_rank' and 'lexical_rank'
+        """
+        if k is None:
+            k = settings.RAG_RRF_K
+        
+        fused: Dict[int, Dict[str, Any]] = {}
+        for rank_key, ranked in (("vector_rank", vector_results), ("lexical_rank", lexical_results)):
+            for rank, result in enumerate(ranked, 1):
+                entry = fused.get(result["chunk_id"])
+                if entry is None:
+                    entry = dict(result, rrf_score=0.0, vector_rank=None, lexical_rank=None)
+                    fused[result["chunk_id"]] = entry
+                elif entry.get("similarity") is None:
+                    entry["similarity"] = result.get("similarity")
+                entry[rank_key] = rank
+                entry["rrf_score"] += 1.0 / (k + rank)
+        
+        return sorted(fused.values(), key=lambda entry: entry["rrf_score"], reverse=True)[:max_results]
+    
+    @staticmethod
+    def _format_row(row, similarity: float = None) -> Dict[str, Any]:
+        """Chunk row with filing cabinet metadata."""
+        return {
+            "chunk_id": row.id,
+            "content": row.content,
+            "chunk_index": row.chunk_index,
+            "page_number": row.page_number,
+            "document_id": row.document_id,
+            "filename": row.filename,
+            "original_filename": row.original_filename,
+            "display_name": row.display_name,
+            "document_type": row.document_type,
+            "storage_year": row.storage_year,
+            "document_date": row.document_date,
+            "file_path": row.file_path,
+            "ocr_pdf_path": row.ocr_pdf_path,
+            "created_at": row.created_at,
+            "similarity": similarity,
+            "filing_location": f"{row.storage_year}/{row.document_type}" if row.storage_year else None
+        }
+    
+    @staticmethod
+    def _elapsed_ms(started: float) -> float:
+        return round((time.perf_counter() - started) * 1000, 1)
     
     def format_context(self, search_results: List[Dict[str, Any]]) -> str:
         """Format search results into context for LLM.
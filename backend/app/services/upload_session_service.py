@@ -0,0 +1,232 @@
+"""Resumable uploads: parts appended to a file in the upload directory."""
+import fcntl
+import hashlib
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import AsyncIterator, Optional, Tuple
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from app.config import settings
+from app.models.document import DocumentType
+from app.models.upload_session import UploadSession
+from app.services.document_service import FileTooLargeError
+
+
+class UploadConflictError(Exception):
+    """Raised when a part does not start at the current offset, or the upload is not complete."""
+
+    def __init__(self, message: str, offset: int):
+        super().__init__(message)
+        self.offset = offset
+
+
+class UploadSessionService:
+    """Service for uploads sent as consecutive byte ranges.
+
+    Parts are appended to ``UPLOAD_DIR/.uploads/<id>.part``; the part file's
+    size is the offset the next part must start at. The SHA-256 is updated
+    as parts arrive and kept in process, so completing an upload does not
+    read the file again (unless its parts went to another API process).
+    """
+
+    # Running hashes by upload id: (bytes hashed, hash object)
+    _hashes: "OrderedDict[str, Tuple[int, object]]" = OrderedDict()
+    _lock = threading.Lock()
+    max_hashes = 1000
+
+    def __init__(self):
+        self.upload_dir = Path(settings.UPLOAD_DIR)
+        self.part_dir = self.upload_dir / ".uploads"
+        self.part_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size = settings.MAX_RESUMABLE_UPLOAD_SIZE_MB * 1024 * 1024
+        self.expiration = timedelta(hours=settings.UPLOAD_SESSION_EXPIRATION_HOURS)
+
+    def part_path(self, upload_id: str) -> Path:
+        """File holding the bytes received so far."""
+        return self.part_dir / f"{upload_id}.part"
+
+    def get_offset(self, upload_id: str) -> int:
+        """Number of bytes received so far."""
+        try:
+            return self.part_path(upload_id).stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def new_session(
+        self,
+        user_id: int,
+        filename: str,
+        total_size: int,
+        mime_type: Optional[str] = None,
+        document_type: DocumentType = DocumentType.OTHER
+    ) -> UploadSession:
+        """
+        Start an upload (the caller adds and commits the returned session).
+
+        Raises:
+            FileTooLargeError: If total_size exceeds MAX_RESUMABLE_UPLOAD_SIZE_MB
+        """
+        if total_size > self.max_size:
+            raise FileTooLargeError(self.max_size)
+
+        upload = UploadSession(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            original_filename=filename,
+            mime_type=mime_type,
+            document_type=document_type,
+            total_size=total_size,
+            expires_at=datetime.utcnow() + self.expiration
+        )
+        self.part_path(upload.id).touch()
+        return upload
+
+    async def append_part(self, upload: UploadSession, offset: int, chunks: AsyncIterator[bytes]) -> int:
+        """
+        Append a byte range to an upload, streaming it to disk.
+
+        Bytes written before an error or a dropped connection are kept (and
+        hashed), so the client resumes from get_offset().
+
+        Args:
+            upload: Upload session
+            offset: Position of the first byte of the part
+            chunks: Part content, e.g. Request.stream()
+
+        Returns:
+            New offset
+
+        Raises:
+            UploadConflictError: If offset is not the current offset, or another part is being written
+            FileTooLargeError: If the part goes past the declared size
+        """
+        with open(self.part_path(upload.id), "ab") as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadConflictError("Another part of this upload is being written", self.get_offset(upload.id))
+
+            current = os.fstat(f.fileno()).st_size
+            if offset != current:
+                raise UploadConflictError(f"Part must start at offset {current}", current)
+
+            sha256_hash = self._take_hash(upload.id, current)
+            try:
+                async for chunk in chunks:
+                    if current + len(chunk) > upload.total_size:
+                        raise FileTooLargeError(upload.total_size)
+                    f.write(chunk)
+                    if sha256_hash is not None:
+                        sha256_hash.update(chunk)
+                    current += len(chunk)
+            finally:
+                f.flush()
+                if sha256_hash is not None:
+                    self._put_hash(upload.id, current, sha256_hash)
+
+        return current
+
+    def complete(self, upload: UploadSession) -> Tuple[str, str, int, str]:
+        """
+        Move a fully received upload into the upload directory.
+
+        Returns:
+            Tuple of (file_path, saved_filename, file_size, file_hash), as DocumentService.save_upload
+
+        Raises:
+            UploadConflictError: If bytes are missing or a part is being written
+        """
+        part_path = self.part_path(upload.id)
+        with open(part_path, "ab") as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadConflictError("A part of this upload is still being written", self.get_offset(upload.id))
+
+            file_size = os.fstat(f.fileno()).st_size
+            if file_size != upload.total_size:
+                raise UploadConflictError(f"Upload incomplete: {file_size} of {upload.total_size} bytes received",
+                                          file_size)
+
+            sha256_hash = self._take_hash(upload.id, file_size)
+            if sha256_hash is None:
+                logger.debug(f"No running hash for upload {upload.id}, hashing the file")
+                sha256_hash = self._hash_file(part_path)
+
+            saved_filename = f"{uuid.uuid4()}{Path(upload.original_filename).suffix}"
+            file_path = self.upload_dir / saved_filename
+            os.replace(part_path, file_path)
+
+        logger.info(f"Completed upload {upload.id}: {saved_filename} ({file_size} bytes)")
+        return str(file_path), saved_filename, file_size, sha256_hash.hexdigest()
+
+    def restore(self, upload_id: str, file_path: str):
+        """Move a completed upload back to its part file, so completing it can be retried."""
+        try:
+            os.replace(file_path, self.part_path(upload_id))
+        except FileNotFoundError:
+            logger.warning(f"Cannot restore upload {upload_id}: {file_path} is gone")
+
+    def discard(self, upload_id: str):
+        """Delete the received bytes of an upload."""
+        self._take_hash(upload_id, None)
+        try:
+            self.part_path(upload_id).unlink()
+        except FileNotFoundError:
+            pass
+
+    def delete_expired(self, db: Session) -> int:
+        """
+        Delete expired upload sessions and their part files.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Number of deleted sessions
+        """
+        expired = db.query(UploadSession.id)\
+            .filter(UploadSession.expires_at < datetime.utcnow())\
+            .all()
+        for (upload_id,) in expired:
+            self.discard(upload_id)
+
+        if expired:
+            db.query(UploadSession)\
+                .filter(UploadSession.id.in_([upload_id for (upload_id,) in expired]))\
+                .delete(synchronize_session=False)
+            db.commit()
+            logger.info(f"Deleted {len(expired)} expired upload sessions")
+        return len(expired)
+
+    @staticmethod
+    def _hash_file(path: Path):
+        sha256_hash = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(settings.UPLOAD_CHUNK_SIZE_KB * 1024), b""):
+                sha256_hash.update(block)
+        return sha256_hash
+
+    @classmethod
+    def _take_hash(cls, upload_id: str, offset: Optional[int]):
+        """Remove and return the running hash of an upload if it covers exactly offset bytes."""
+        with cls._lock:
+            entry = cls._hashes.pop(upload_id, None)
+        if entry is not None and entry[0] == offset:
+            return entry[1]
+        if offset == 0:
+            return hashlib.sha256()
+        return None
+
+    @classmethod
+    def _put_hash(cls, upload_id: str, offset: int, sha256_hash):
+        with cls._lock:
+            cls._hashes[upload_id] = (offset, sha256_hash)
+            cls._hashes.move_to_end(upload_id)
+            while len(cls._hashes) > cls.max_hashes:
+                cls._hashes.popitem(last=False)
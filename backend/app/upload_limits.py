@@ -0,0 +1,77 @@
+"""
+Request body size limit for upload endpoints.
+
+FastAPI parses a multipart body completely (spooling files to disk) before
+the endpoint runs, so an endpoint cannot stop an oversized upload itself.
+This ASGI middleware rejects such requests with 413 from their
+Content-Length, or as soon as more bytes than allowed have been received.
+"""
+from typing import Dict
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Allowance for multipart boundaries and part headers around the file content
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadSizeLimitMiddleware:
+    """Cut off POST bodies larger than the limit of their path."""
+
+    def __init__(self, app: ASGIApp, limits: Dict[str, int]):
+        """
+        Args:
+            app: Wrapped application
+            limits: Maximum body size in bytes, by exact request path
+        """
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" and scope["method"] == "POST" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get("content-length", "")
+        if content_length.isdigit() and int(content_length) > limit:
+            await self._reject(limit, scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    raise ValueError("Request body too large")
+            return message
+
+        async def guarded_send(message: Message):
+            nonlocal response_started
+            if exceeded:
+                return  # Replaced by the 413 below
+            response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except ValueError:
+            if not exceeded:
+                raise
+        if exceeded and not response_started:
+            await self._reject(limit, scope, receive, send)
+
+    @staticmethod
+    async def _reject(limit: int, scope: Scope, receive: Receive, send: Send):
+        response = JSONResponse(
+            {"detail": f"Request body exceeds the maximum allowed size of {limit} bytes"},
+            status_code=413,
+            headers={"Connection": "close"}
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,178 @@
+"""
+Document processing worker.
+
+Claims jobs from the processing_jobs table and runs the ingestion pipeline
+outside the API process. Run as many worker processes as needed; each one
+runs up to WORKER_CONCURRENCY jobs (a document or a batch upload) at a time.
+
+Usage:
+    python -m app.worker [--concurrency N]
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import sys
+import traceback
+from loguru import logger
+
+from app.config import settings
+from app.models.database import SessionLocal, engine, Base
+from app.models.document import DocumentStatus
+from app.models.job import ProcessingJob, JobStatus
+from app.process_pool import shutdown_process_pool
+from app.services.job_queue_service import JobQueueService
+from app.services.document_processing_service import DocumentProcessingService
+
+
+class DocumentWorker:
+    """Pool of concurrent job slots polling the processing queue."""
+
+    def __init__(self, concurrency: int):
+        self.concurrency = max(1, concurrency)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval = settings.WORKER_POLL_INTERVAL_SECONDS
+        self.heartbeat_interval = max(5, settings.JOB_LOCK_TIMEOUT_SECONDS // 3)
+        self.queue = JobQueueService()
+        self._stopping = asyncio.Event()
+
+    def stop(self):
+        """Stop claiming new jobs; running jobs are allowed to finish."""
+        if not self._stopping.is_set():
+            logger.info("Worker shutdown requested, finishing running jobs")
+            self._stopping.set()
+
+    async def run(self):
+        """Run job slots until stopped."""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self.stop)
+
+        logger.info(f"Worker {self.worker_id} started with concurrency={self.concurrency}")
+        await asyncio.gather(*(self._slot(i) for i in range(self.concurrency)))
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    async def _slot(self, index: int):
+        """Claim and run jobs one at a time."""
+        while not self._stopping.is_set():
+            try:
+                job = await asyncio.to_thread(self._claim)
+            except Exception as e:
+                logger.error(f"Slot {index}: error claiming job: {e}")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            if job.status == JobStatus.FAILED:  # Out of attempts after an expired lease
+                await asyncio.to_thread(self._set_status, job, DocumentProcessingService(), DocumentStatus.FAILED)
+                continue
+
+            await self._run_job(job)
+
+    def _claim(self):
+        db = SessionLocal()
+        try:
+            job = self.queue.claim_next(db, self.worker_id)
+            if job:
+                db.expunge(job)
+            return job
+        finally:
+            db.close()
+
+    async def _run_job(self, job: ProcessingJob):
+        """Run one job, keeping its lease alive and settling it afterwards.
+
+        If the lease is lost (the job was reclaimed by another worker), the
+        job is cancelled and left to its new owner.
+        """
+        target = f"batch {job.batch_id}" if job.batch_id else f"document {job.document_id}"
+        logger.info(f"Running job {job.id} for {target} (attempt {job.attempts})")
+
+        # The pipeline opens its own short sessions; no connection is held for the job
+        processing_service = DocumentProcessingService()
+        if job.batch_id:
+            processing = asyncio.create_task(processing_service.process_batch(job.batch_id))
+        else:
+            processing = asyncio.create_task(processing_service.process_document(job.document_id))
+        lease_lost = asyncio.Event()
+        heartbeat = asyncio.create_task(self._heartbeat(job.id, processing, lease_lost))
+        try:
+            await processing
+            await asyncio.to_thread(self._complete, job)
+        except asyncio.CancelledError:
+            if not lease_lost.is_set():
+                raise
+            logger.warning(f"Stopped job {job.id} for {target}: its lease was lost")
+        except Exception as e:
+            logger.error(f"❌ Error processing {target}: {e}")
+            logger.error(traceback.format_exc())
+            await asyncio.to_thread(self._fail, job, processing_service, str(e))
+        finally:
+            heartbeat.cancel()
+
+    def _complete(self, job: ProcessingJob):
+        with SessionLocal() as db:
+            self.queue.mark_completed(db, job.id, self.worker_id)
+
+    def _fail(self, job: ProcessingJob, processing_service: DocumentProcessingService, error: str):
+        with SessionLocal() as db:
+            will_retry = self.queue.mark_failed(db, job.id, self.worker_id, error)
+        if will_retry is not None:  # Otherwise the job belongs to another worker now
+            self._set_status(job, processing_service, DocumentStatus.PENDING if will_retry else DocumentStatus.FAILED)
+
+    def _set_status(self, job: ProcessingJob, processing_service: DocumentProcessingService, status: DocumentStatus):
+        """Set the status of the unfinished documents of a job."""
+        with SessionLocal() as db:
+            if job.batch_id:
+                processing_service.set_batch_status(job.batch_id, status, db)
+            else:
+                processing_service.set_status(job.document_id, status, db)
+
+    async def _heartbeat(self, job_id: int, processing: asyncio.Task, lease_lost: asyncio.Event):
+        """Refresh the lease of a job; cancel it if another worker took it over."""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                owned = await asyncio.to_thread(self._refresh_lease, job_id)
+            except Exception as e:
+                logger.error(f"Heartbeat failed for job {job_id}: {e}")
+                continue
+            if not owned:
+                logger.warning(f"Lost lease on job {job_id}, cancelling it")
+                lease_lost.set()
+                processing.cancel()
+                return
+
+    def _refresh_lease(self, job_id: int) -> bool:
+        with SessionLocal() as db:
+            return self.queue.heartbeat(db, job_id, self.worker_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the document processing worker')
+    parser.add_argument('--concurrency', type=int, default=settings.WORKER_CONCURRENCY,
+                        help='Number of documents processed in parallel')
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(
+        sys.stdout,
+        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan> - <level>{message}</level>",
+        level="INFO" if settings.ENVIRONMENT == "production" else "DEBUG"
+    )
+
+    Base.metadata.create_all(bind=engine)
+    try:
+        asyncio.run(DocumentWorker(args.concurrency).run())
+    finally:
+        shutdown_process_pool()
+
+
+if __name__ == "__main__":
+    main()
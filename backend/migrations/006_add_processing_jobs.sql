@@ -0,0 +1,43 @@
+-- Migration: Add durable processing job queue
+-- Migration: 006_add_processing_jobs
+-- Description: Moves document processing out of the API process into a job table claimed by workers
+
+-- Job status enum (SQLAlchemy stores enum member names)
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'jobstatus') THEN
+        CREATE TYPE jobstatus AS ENUM ('QUEUED', 'RUNNING', 'COMPLETED', 'FAILED');
+    END IF;
+END$$;
+
+-- Create processing_jobs table
+CREATE TABLE IF NOT EXISTS processing_jobs (
+    id SERIAL PRIMARY KEY,
+    document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    status jobstatus NOT NULL DEFAULT 'QUEUED',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    run_after TIMESTAMP NOT NULL DEFAULT NOW(),
+    last_error TEXT,
+    locked_by VARCHAR,
+    locked_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Index for the worker claim query (SELECT ... FOR UPDATE SKIP LOCKED)
+CREATE INDEX IF NOT EXISTS idx_processing_jobs_claim
+ON processing_jobs(status, run_after, id);
+
+CREATE INDEX IF NOT EXISTS ix_processing_jobs_document_id
+ON processing_jobs(document_id);
+
+-- Re-queue documents that were left pending by the old in-process background tasks
+INSERT INTO processing_jobs (document_id, status)
+SELECT d.id, 'QUEUED'
+FROM documents d
+WHERE d.status IN ('PENDING', 'PROCESSING')
+  AND NOT EXISTS (SELECT 1 FROM processing_jobs j WHERE j.document_id = d.id);
+
+COMMENT ON TABLE processing_jobs IS 'Durable queue of document processing jobs, claimed by app.worker';
+COMMENT ON COLUMN processing_jobs.locked_at IS 'Lease timestamp refreshed by the worker heartbeat; expired leases are reclaimed';
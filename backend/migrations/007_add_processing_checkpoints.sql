@@ -0,0 +1,15 @@
+-- Migration: Add processing checkpoints to documents
+-- Migration: 007_add_processing_checkpoints
+-- Description: Records the last completed pipeline stage and its outputs so failed jobs resume instead of restarting
+
+ALTER TABLE documents
+ADD COLUMN IF NOT EXISTS processing_stage VARCHAR,
+ADD COLUMN IF NOT EXISTS processing_state TEXT;
+
+COMMENT ON COLUMN documents.processing_stage IS 'Last completed ingestion stage (hashed, preprocessed, analyzed, ..., completed)';
+COMMENT ON COLUMN documents.processing_state IS 'JSON checkpoint of stage outputs (preprocessed image, LLM metadata, PDF path, chunk ids)';
+
+-- Documents processed before this migration are complete
+UPDATE documents
+SET processing_stage = 'completed'
+WHERE status = 'COMPLETED' AND processing_stage IS NULL;
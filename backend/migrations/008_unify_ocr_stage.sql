@@ -0,0 +1,11 @@
+-- Migration: Unify OCR into a single pipeline stage
+-- Migration: 008_unify_ocr_stage
+-- Description: OCRmyPDF now produces the searchable PDF and the document text in one pass
+-- (stage 'ocr_completed'); the 'pdf_created' and 'text_extracted' stages no longer exist
+
+-- Unfinished documents restart the pipeline from the beginning with the new stage order
+UPDATE documents
+SET processing_stage = NULL,
+    processing_state = NULL
+WHERE processing_stage IS NOT NULL
+  AND processing_stage <> 'completed';
@@ -0,0 +1,27 @@
+-- Migration: Add content-addressed OCR and analysis cache
+-- Migration: 009_add_analysis_cache
+-- Description: Stores OCR text, confidence and DocumentAgent metadata per file hash so identical
+-- files skip OCR and the OpenAI call
+
+CREATE TABLE IF NOT EXISTS analysis_cache (
+    id SERIAL PRIMARY KEY,
+    file_hash VARCHAR NOT NULL,
+    ocr_engine VARCHAR NOT NULL,
+    languages VARCHAR NOT NULL,
+    pipeline_version VARCHAR NOT NULL,
+    extracted_text TEXT,
+    ocr_confidence FLOAT,
+    ocr_method VARCHAR,
+    ocr_pages INTEGER,
+    pdf_path VARCHAR,
+    analysis_metadata TEXT,
+    hit_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT NOW(),
+    last_used_at TIMESTAMP DEFAULT NOW(),
+    CONSTRAINT uq_analysis_cache_key UNIQUE (file_hash, ocr_engine, languages, pipeline_version)
+);
+
+CREATE INDEX IF NOT EXISTS ix_analysis_cache_id ON analysis_cache(id);
+
+COMMENT ON TABLE analysis_cache IS 'OCR and LLM analysis results keyed by file hash, OCR engine, languages and pipeline version';
+COMMENT ON COLUMN analysis_cache.hit_count IS 'Number of times the entry was reused (misses = number of entries)';
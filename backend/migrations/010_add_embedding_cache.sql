@@ -0,0 +1,14 @@
+-- Migration: Add persistent embedding cache
+-- Migration: 010_add_embedding_cache
+-- Description: Embeddings keyed by (model, SHA-256 of normalized text), shared by document ingest
+-- and RAG query embedding so repeated boilerplate and queries skip the embeddings API
+
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    model VARCHAR NOT NULL,
+    text_hash VARCHAR(64) NOT NULL,
+    embedding vector(1536) NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (model, text_hash)
+);
+
+COMMENT ON TABLE embedding_cache IS 'Embedding vectors by model and SHA-256 of the normalized text (Postgres tier behind the in-process LRU)';
@@ -0,0 +1,50 @@
+-- Migration: Add ANN index for RAG vector search
+-- Migration: 011_add_chunk_vector_index
+-- Description: Denormalizes user_id onto document_chunks and adds an HNSW index on the embeddings
+-- so RAGService.search_documents no longer scans every chunk (requires pgvector >= 0.5.0).
+-- Indexes are built CONCURRENTLY (no write lock on document_chunks) and the backfill commits
+-- per batch, so run the file outside a transaction (psql -f does). If a build fails, drop the
+-- INVALID index and run the file again.
+
+-- Owner of each chunk, for per-user filtering without joining documents
+ALTER TABLE document_chunks
+ADD COLUMN IF NOT EXISTS user_id INTEGER REFERENCES users(id);
+
+-- Backfill in id ranges of 10000 chunks, one transaction each (short row locks)
+DO $$
+DECLARE
+    batch_start BIGINT := 0;
+    max_id BIGINT;
+BEGIN
+    SELECT coalesce(max(id), 0) INTO max_id FROM document_chunks;
+    WHILE batch_start < max_id LOOP
+        UPDATE document_chunks dc
+        SET user_id = d.user_id
+        FROM documents d
+        WHERE dc.document_id = d.id
+          AND dc.user_id IS NULL
+          AND dc.id > batch_start
+          AND dc.id <= batch_start + 10000;
+        batch_start := batch_start + 10000;
+        COMMIT;
+    END LOOP;
+END $$;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_document_chunks_user_id
+ON document_chunks(user_id);
+
+-- Chunk lookups by document (re-embedding, duplicate detection)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_document_chunks_document_id
+ON document_chunks(document_id);
+
+-- HNSW index for cosine distance (<=>); recall/speed tuned at query time with hnsw.ef_search
+-- (RAG_HNSW_EF_SEARCH). Building it on a large table benefits from a higher maintenance_work_mem.
+SET maintenance_work_mem = '1GB';
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_document_chunks_embedding_hnsw
+ON document_chunks USING hnsw (embedding vector_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+RESET maintenance_work_mem;
+
+ANALYZE document_chunks;
+
+COMMENT ON COLUMN document_chunks.user_id IS 'Denormalized owner (documents.user_id) for per-user vector search';
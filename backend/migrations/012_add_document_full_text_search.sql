@@ -0,0 +1,38 @@
+-- Migration: Add indexed full-text search on documents
+-- Migration: 012_add_document_full_text_search
+-- Description: Replaces LIKE scans in /api/documents/search with a generated tsvector
+-- (French/German/English, GIN) and trigram indexes for substring matches on names.
+-- Indexes are built CONCURRENTLY (no write lock on documents), so run the file outside a
+-- transaction (psql -f does). If a build fails, drop the INVALID index and run the file again.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS btree_gin;  -- user_id inside GIN indexes
+
+-- Generated search vector (keep in sync with SEARCH_VECTOR_EXPRESSION in app/models/document.py)
+ALTER TABLE documents
+ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('french'::regconfig, coalesce(display_name, '') || ' ' || coalesce(original_filename, '')), 'A') ||
+    setweight(to_tsvector('german'::regconfig, coalesce(display_name, '') || ' ' || coalesce(original_filename, '')), 'A') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(display_name, '') || ' ' || coalesce(original_filename, '')), 'A') ||
+    setweight(to_tsvector('french'::regconfig, coalesce(keywords, '')), 'B') ||
+    setweight(to_tsvector('german'::regconfig, coalesce(keywords, '')), 'B') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(keywords, '')), 'B') ||
+    setweight(to_tsvector('french'::regconfig, left(coalesce(extracted_text, ''), 100000)), 'C') ||
+    setweight(to_tsvector('german'::regconfig, left(coalesce(extracted_text, ''), 100000)), 'C') ||
+    setweight(to_tsvector('english'::regconfig, left(coalesce(extracted_text, ''), 100000)), 'C')
+) STORED;
+
+-- Words and prefixes, scoped to the user
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_search_vector
+ON documents USING gin (user_id, search_vector);
+
+-- Substring matches on names (ILIKE '%...%')
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_display_name_trgm
+ON documents USING gin (user_id, display_name gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_original_filename_trgm
+ON documents USING gin (user_id, original_filename gin_trgm_ops);
+
+ANALYZE documents;
+
+COMMENT ON COLUMN documents.search_vector IS 'Generated full-text vector: names (A), keywords (B), OCR text (C) in french/german/english';
@@ -0,0 +1,22 @@
+-- Migration: Add full-text search on document chunks
+-- Migration: 013_add_chunk_full_text_search
+-- Description: Generated tsvector on document_chunks.content for hybrid (full-text + vector) RAG retrieval.
+-- Indexes are built CONCURRENTLY (no write lock on document_chunks), so run the file outside a
+-- transaction (psql -f does). If a build fails, drop the INVALID index and run the file again.
+
+CREATE EXTENSION IF NOT EXISTS btree_gin;  -- user_id inside GIN indexes
+
+-- Generated search vector (keep in sync with CHUNK_SEARCH_VECTOR_EXPRESSION in app/models/document.py)
+ALTER TABLE document_chunks
+ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    to_tsvector('french'::regconfig, content) ||
+    to_tsvector('german'::regconfig, content) ||
+    to_tsvector('english'::regconfig, content)
+) STORED;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_document_chunks_search_vector
+ON document_chunks USING gin (user_id, search_vector);
+
+ANALYZE document_chunks;
+
+COMMENT ON COLUMN document_chunks.search_vector IS 'Generated full-text vector of the chunk content (french/german/english) for hybrid retrieval';
@@ -0,0 +1,20 @@
+-- Migration: Add cached filing cabinet tree
+-- Migration: 014_add_filing_cabinet_cache
+-- Description: Per-user Year > Category > Type counts built from one GROUP BY query and
+-- invalidated (version bump) in the same transaction as document inserts, moves and deletes
+
+CREATE TABLE IF NOT EXISTS filing_cabinet_cache (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    version INTEGER NOT NULL DEFAULT 0,
+    tree_version INTEGER,
+    tree TEXT,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Covers the grouped tree query, including uncategorized documents
+CREATE INDEX IF NOT EXISTS idx_documents_tree
+ON documents(user_id, storage_year, category, document_type)
+WHERE storage_year IS NOT NULL;
+
+COMMENT ON TABLE filing_cabinet_cache IS 'Cached filing cabinet tree per user; valid while tree_version = version';
+COMMENT ON COLUMN filing_cabinet_cache.version IS 'Bumped by every document insert, move (year/category/type) or delete';
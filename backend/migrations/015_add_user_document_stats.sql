@@ -0,0 +1,73 @@
+-- Migration: Add per-user document counters
+-- Migration: 015_add_user_document_stats
+-- Description: user_document_stats holds document counters updated in the same transaction as
+-- every document insert, update and delete, so /documents/statistics and the dashboard no longer
+-- aggregate the documents table
+
+CREATE TABLE IF NOT EXISTS user_document_stats (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    total_documents INTEGER NOT NULL DEFAULT 0,
+    invoice_count INTEGER NOT NULL DEFAULT 0,
+    letter_count INTEGER NOT NULL DEFAULT 0,
+    contract_count INTEGER NOT NULL DEFAULT 0,
+    receipt_count INTEGER NOT NULL DEFAULT 0,
+    other_count INTEGER NOT NULL DEFAULT 0,
+    documents_with_deadline INTEGER NOT NULL DEFAULT 0,
+    high_importance_documents INTEGER NOT NULL DEFAULT 0,
+    importance_score_count INTEGER NOT NULL DEFAULT 0,
+    importance_score_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    total_amount_extracted NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Backfill (recomputes existing rows too, so the migration can be re-run to repair counters).
+-- The lock keeps documents from changing between the aggregate and the upsert.
+BEGIN;
+LOCK TABLE documents IN SHARE MODE;
+
+INSERT INTO user_document_stats (
+    user_id, total_documents,
+    invoice_count, letter_count, contract_count, receipt_count, other_count,
+    documents_with_deadline, high_importance_documents,
+    importance_score_count, importance_score_sum, total_amount_extracted, updated_at
+)
+SELECT
+    user_id,
+    count(*),
+    count(*) FILTER (WHERE document_type = 'INVOICE'),
+    count(*) FILTER (WHERE document_type = 'LETTER'),
+    count(*) FILTER (WHERE document_type = 'CONTRACT'),
+    count(*) FILTER (WHERE document_type = 'RECEIPT'),
+    count(*) FILTER (WHERE document_type = 'OTHER' OR document_type IS NULL),
+    count(deadline),
+    count(*) FILTER (WHERE importance_score > 80),
+    count(importance_score),
+    coalesce(sum(importance_score), 0),
+    coalesce(sum(extracted_amount), 0),
+    NOW()
+FROM documents
+WHERE user_id IS NOT NULL
+GROUP BY user_id
+ON CONFLICT (user_id) DO UPDATE SET
+    total_documents = EXCLUDED.total_documents,
+    invoice_count = EXCLUDED.invoice_count,
+    letter_count = EXCLUDED.letter_count,
+    contract_count = EXCLUDED.contract_count,
+    receipt_count = EXCLUDED.receipt_count,
+    other_count = EXCLUDED.other_count,
+    documents_with_deadline = EXCLUDED.documents_with_deadline,
+    high_importance_documents = EXCLUDED.high_importance_documents,
+    importance_score_count = EXCLUDED.importance_score_count,
+    importance_score_sum = EXCLUDED.importance_score_sum,
+    total_amount_extracted = EXCLUDED.total_amount_extracted,
+    updated_at = EXCLUDED.updated_at;
+
+COMMIT;
+
+-- The overdue / upcoming deadline counts use idx_documents_user_deadline_id (016).
+
+-- Dashboard spending per category (built without blocking writes; run outside a transaction)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transactions_user_category
+ON transactions(user_id, category) INCLUDE (amount);
+
+COMMENT ON TABLE user_document_stats IS 'Per-user document counters, maintained by the application on every document change';
@@ -0,0 +1,29 @@
+-- Migration: Add indexes for keyset (cursor) pagination
+-- Migration: 016_add_keyset_pagination_indexes
+-- Description: One composite index per listing sort order, on the same expressions as
+-- app/services/pagination_service.py, so a cursor page is an index seek instead of an OFFSET scan.
+-- Indexes are built CONCURRENTLY (no write lock on documents), so run the file outside a
+-- transaction (psql -f does). If a build fails, drop the INVALID index and run the file again.
+
+-- GET /documents (newest first)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_user_created
+ON documents(user_id, created_at DESC, id DESC);
+
+-- GET /documents/by-importance (NULL scores last)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_user_importance
+ON documents(user_id, (coalesce(importance_score, -1)) DESC, created_at DESC, id DESC);
+
+-- GET /documents/by-deadline; also serves the overdue/upcoming counts of /documents/statistics
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_user_deadline_id
+ON documents(user_id, deadline, id)
+WHERE deadline IS NOT NULL;
+
+-- Replaces the (user_id, deadline) index created by earlier versions of migration 015
+DROP INDEX CONCURRENTLY IF EXISTS idx_documents_user_deadline;
+
+-- Filing cabinet listings by year (NULL document dates last)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_user_year_document_date
+ON documents(user_id, storage_year, (coalesce(document_date, DATE '0001-01-01')) DESC, created_at DESC, id DESC)
+WHERE storage_year IS NOT NULL;
+
+ANALYZE documents;
@@ -0,0 +1,27 @@
+-- Migration: Add composite indexes for the remaining per-user query shapes
+-- Migration: 017_add_query_shape_indexes
+-- Description: Every document query filters on user_id first; these indexes cover the shapes
+-- not handled by idx_documents_tree (014) and the keyset indexes (016).
+-- tests/test_query_plans.py checks that no endpoint query seq-scans documents.
+-- Built CONCURRENTLY like 016: run outside a transaction.
+
+-- /documents/urgent: "deadline <= ? OR importance_score > 80" is a BitmapOr of
+-- idx_documents_user_deadline_id (016) and this index
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_user_importance_score
+ON documents(user_id, importance_score)
+WHERE importance_score IS NOT NULL;
+
+-- /documents/duplicates and /documents/duplicates/cleanup
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_user_duplicates
+ON documents(user_id, similarity_score DESC)
+WHERE is_duplicate;
+
+-- Exact duplicate check (same user, same SHA-256)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_user_file_hash
+ON documents(user_id, file_hash)
+WHERE file_hash IS NOT NULL;
+
+-- Superseded: a boolean index across all users is never selective enough
+DROP INDEX CONCURRENTLY IF EXISTS idx_documents_is_duplicate;
+
+ANALYZE documents;
@@ -0,0 +1,23 @@
+-- Migration: Add resumable upload sessions
+-- Migration: 018_add_upload_sessions
+-- Description: Files uploaded in parts through /api/uploads before they become documents
+
+CREATE TABLE IF NOT EXISTS upload_sessions (
+    id VARCHAR(36) PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    original_filename VARCHAR NOT NULL,
+    mime_type VARCHAR,
+    document_type documenttype NOT NULL DEFAULT 'OTHER',
+    total_size BIGINT NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW(),
+    expires_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_upload_sessions_user_id
+ON upload_sessions(user_id);
+
+-- Expired sessions are removed together with their part files
+CREATE INDEX IF NOT EXISTS ix_upload_sessions_expires_at
+ON upload_sessions(expires_at);
+
+COMMENT ON TABLE upload_sessions IS 'Resumable uploads in progress; received bytes are in UPLOAD_DIR/.uploads/<id>.part';
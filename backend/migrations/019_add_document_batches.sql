@@ -0,0 +1,39 @@
+-- Migration: Add batch uploads
+-- Migration: 019_add_document_batches
+-- Description: Documents uploaded together through /api/documents/upload/batch, processed by one batch job
+
+CREATE TABLE IF NOT EXISTS document_batches (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    total_documents INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS ix_document_batches_user_id
+ON document_batches(user_id);
+
+-- Batch of a document (progress endpoint and batch job)
+ALTER TABLE documents
+ADD COLUMN IF NOT EXISTS batch_id INTEGER REFERENCES document_batches(id) ON DELETE SET NULL;
+
+CREATE INDEX IF NOT EXISTS idx_documents_batch
+ON documents(batch_id)
+WHERE batch_id IS NOT NULL;
+
+-- A job targets one document or a whole batch
+ALTER TABLE processing_jobs
+ADD COLUMN IF NOT EXISTS batch_id INTEGER REFERENCES document_batches(id) ON DELETE CASCADE;
+
+ALTER TABLE processing_jobs
+ALTER COLUMN document_id DROP NOT NULL;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'ck_processing_jobs_target') THEN
+        ALTER TABLE processing_jobs
+        ADD CONSTRAINT ck_processing_jobs_target CHECK (document_id IS NOT NULL OR batch_id IS NOT NULL);
+    END IF;
+END$$;
+
+COMMENT ON COLUMN documents.batch_id IS 'Batch upload the document came with (NULL for single uploads)';
+COMMENT ON COLUMN processing_jobs.batch_id IS 'Batch whose documents the job processes together (document_id is NULL)';
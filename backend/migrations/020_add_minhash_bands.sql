@@ -0,0 +1,23 @@
+-- Migration: Add MinHash near-duplicate index
+-- Migration: 020_add_minhash_bands
+-- Description: MinHash signature of each document's text and its LSH bands, replacing the first-chunk embedding comparison
+
+ALTER TABLE documents
+ADD COLUMN IF NOT EXISTS minhash_signature INTEGER[];
+
+CREATE TABLE IF NOT EXISTS document_minhash_bands (
+    document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    band SMALLINT NOT NULL,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    band_hash BIGINT NOT NULL,
+    PRIMARY KEY (document_id, band)
+);
+
+-- Candidate lookup: documents of a user sharing a band hash
+CREATE INDEX IF NOT EXISTS idx_minhash_bands_user_hash
+ON document_minhash_bands(user_id, band_hash);
+
+COMMENT ON COLUMN documents.minhash_signature IS 'MinHash signature of the extracted text (128 values, see minhash_service)';
+COMMENT ON TABLE document_minhash_bands IS 'LSH bands of the MinHash signatures; equal band hashes mark near-duplicate candidates';
+
+-- Existing documents get their signature from scripts/backfill_minhash_signatures.py
@@ -0,0 +1,54 @@
+"""Script to compute MinHash signatures and LSH bands of existing documents (after migration 020)."""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.orm import Session, load_only
+from app.models.database import SessionLocal
+from app.models.document import Document, DocumentStatus
+from app.services.duplicate_detection_service import DuplicateDetectionService
+from app.services.minhash_service import MinHashService
+from loguru import logger
+
+BATCH_SIZE = 100
+
+
+def backfill_minhash_signatures():
+    """Store signatures for completed documents that have none, BATCH_SIZE per transaction."""
+    db: Session = SessionLocal()
+    duplicate_service = DuplicateDetectionService()
+    minhash_service = MinHashService()
+    last_id = 0
+    stored = 0
+
+    try:
+        while True:
+            documents = db.query(Document)\
+                .options(load_only(Document.id, Document.user_id, Document.extracted_text))\
+                .filter(Document.id > last_id)\
+                .filter(Document.status == DocumentStatus.COMPLETED)\
+                .filter(Document.minhash_signature == None)\
+                .filter(Document.extracted_text != None)\
+                .order_by(Document.id)\
+                .limit(BATCH_SIZE)\
+                .all()
+            if not documents:
+                break
+
+            for doc in documents:
+                signature = minhash_service.signature(doc.extracted_text)
+                if signature:
+                    duplicate_service.store_signature(doc, signature, db)
+                    stored += 1
+            db.commit()
+            last_id = documents[-1].id
+            logger.info(f"Processed documents up to {last_id} ({stored} signatures stored)")
+
+        logger.info(f"✅ MinHash backfill complete: {stored} signatures stored")
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    backfill_minhash_signatures()
@@ -0,0 +1,223 @@
+"""
+Benchmark for the RAG vector search query.
+
+This script:
+1. Fills a scratch table with random chunk embeddings (1M by default)
+2. Builds the same indexes as migration 011 (user_id + HNSW)
+3. Times the old query (threshold in WHERE, sequential scan) and the new
+   query (ORDER BY distance LIMIT k, then threshold) for several ef_search
+   values, with and without hnsw.iterative_scan (pgvector >= 0.8), and
+   reports latency percentiles and recall against exact search. The HNSW
+   index post-filters user_id, so without iterative scan the per-user
+   recall drops with the share of chunks a user owns.
+
+Production tables are never touched. The statement timeout of the app
+(DB_STATEMENT_TIMEOUT_MS) is disabled on the benchmark connection.
+
+Usage:
+    python scripts/benchmark_vector_search.py [--chunks 1000000] [--users 1000] [--queries 50]
+"""
+import sys
+import time
+import random
+import argparse
+import statistics
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from loguru import logger
+
+from app.models.database import engine
+
+TABLE = "benchmark_document_chunks"
+
+OLD_QUERY = f"""
+    SELECT id
+    FROM {TABLE}
+    WHERE user_id = :user_id
+        AND 1 - (embedding <=> CAST(:query_embedding AS vector)) >= :threshold
+    ORDER BY embedding <=> CAST(:query_embedding AS vector)
+    LIMIT :k
+"""
+
+NEW_QUERY = f"""
+    WITH nearest AS MATERIALIZED (
+        SELECT id, embedding <=> CAST(:query_embedding AS vector) AS distance
+        FROM {TABLE}
+        WHERE user_id = :user_id
+        ORDER BY embedding <=> CAST(:query_embedding AS vector)
+        LIMIT :k
+    )
+    SELECT id FROM nearest WHERE 1 - distance >= :threshold ORDER BY distance
+"""
+
+GLOBAL_QUERY = f"""
+    SELECT id
+    FROM {TABLE}
+    ORDER BY embedding <=> CAST(:query_embedding AS vector)
+    LIMIT :k
+"""
+
+
+def create_table(conn, chunks: int, users: int, dims: int, batch_size: int):
+    """Create and fill the scratch table with random normalized-ish vectors."""
+    conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+    conn.execute(text(f"""
+        CREATE TABLE {TABLE} (
+            id BIGSERIAL PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            embedding vector({dims}) NOT NULL
+        )
+    """))
+    conn.commit()
+
+    inserted = 0
+    started = time.perf_counter()
+    while inserted < chunks:
+        count = min(batch_size, chunks - inserted)
+        # Correlated subquery so every row gets its own random vector
+        conn.execute(text(f"""
+            INSERT INTO {TABLE} (user_id, embedding)
+            SELECT (random() * :users)::int,
+                   (SELECT array_agg(random() - 0.5) FROM generate_series(1, :dims) WHERE g > 0)::vector
+            FROM generate_series(1, :count) g
+        """), {"users": users, "dims": dims, "count": count})
+        conn.commit()
+        inserted += count
+        logger.info(f"  Inserted {inserted}/{chunks} rows ({time.perf_counter() - started:.0f}s)")
+
+
+def create_indexes(conn):
+    """Build the indexes from migration 011."""
+    conn.execute(text(f"CREATE INDEX ON {TABLE}(user_id)"))
+    conn.commit()
+
+    logger.info("Building HNSW index (m=16, ef_construction=64)...")
+    started = time.perf_counter()
+    conn.execute(text("SET maintenance_work_mem = '1GB'"))
+    conn.execute(text(f"""
+        CREATE INDEX ON {TABLE} USING hnsw (embedding vector_cosine_ops)
+        WITH (m = 16, ef_construction = 64)
+    """))
+    conn.execute(text(f"ANALYZE {TABLE}"))
+    conn.commit()
+    logger.info(f"  HNSW index built in {time.perf_counter() - started:.0f}s")
+
+
+def random_vector(dims: int) -> str:
+    return "[" + ",".join(f"{random.random() - 0.5:.6f}" for _ in range(dims)) + "]"
+
+
+def run_queries(conn, sql: str, queries, k: int, threshold: float, settings_sql=()):
+    """Run each query once, returning latencies (ms) and result id lists."""
+    latencies = []
+    results = []
+    for user_id, embedding in queries:
+        for statement in settings_sql:
+            conn.execute(text(statement))
+        started = time.perf_counter()
+        rows = conn.execute(text(sql), {
+            "user_id": user_id,
+            "query_embedding": embedding,
+            "threshold": threshold,
+            "k": k
+        }).fetchall()
+        latencies.append((time.perf_counter() - started) * 1000)
+        results.append([row[0] for row in rows])
+        conn.rollback()  # Drop SET LOCAL settings
+    return latencies, results
+
+
+def recall(results, exact) -> float:
+    hits = sum(len(set(r) & set(e)) for r, e in zip(results, exact))
+    total = sum(len(e) for e in exact)
+    return hits / total if total else 1.0
+
+
+def report(label: str, latencies, recall_value=None):
+    ordered = sorted(latencies)
+    p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+    recall_str = f"  recall={recall_value:.3f}" if recall_value is not None else ""
+    logger.info(f"{label:<40} p50={statistics.median(ordered):8.1f}ms  p95={p95:8.1f}ms{recall_str}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark RAG vector search')
+    parser.add_argument('--chunks', type=int, default=1_000_000, help='Number of chunks')
+    parser.add_argument('--users', type=int, default=1000, help='Number of distinct users')
+    parser.add_argument('--dims', type=int, default=1536, help='Embedding dimensions')
+    parser.add_argument('--queries', type=int, default=50, help='Queries per configuration')
+    parser.add_argument('--k', type=int, default=5, help='Results per query (MAX_RESULTS)')
+    parser.add_argument('--threshold', type=float, default=0.0, help='Similarity threshold')
+    parser.add_argument('--ef-search', type=int, nargs='+', default=[40, 100, 200],
+                        help='hnsw.ef_search values to try')
+    parser.add_argument('--iterative-scan', nargs='+', default=['off', 'relaxed_order'],
+                        choices=['off', 'strict_order', 'relaxed_order'],
+                        help='hnsw.iterative_scan modes to try (pgvector >= 0.8 for modes other than off)')
+    parser.add_argument('--max-scan-tuples', type=int, default=20000,
+                        help='hnsw.max_scan_tuples for iterative scans')
+    parser.add_argument('--batch-size', type=int, default=50_000, help='Rows per insert batch')
+    parser.add_argument('--reuse', action='store_true', help='Reuse an existing benchmark table')
+    parser.add_argument('--keep', action='store_true', help='Keep the benchmark table afterwards')
+    args = parser.parse_args()
+
+    logger.info("=" * 80)
+    logger.info(f"VECTOR SEARCH BENCHMARK: {args.chunks} chunks, {args.users} users, {args.dims} dims")
+    logger.info("=" * 80)
+
+    with engine.connect() as conn:
+        # Index builds, bulk inserts and sequential scans run far longer than the app's statement timeout
+        conn.execute(text("SET statement_timeout = 0"))
+        conn.commit()
+        try:
+            if not args.reuse:
+                create_table(conn, args.chunks, args.users, args.dims, args.batch_size)
+                create_indexes(conn)
+
+            queries = [(random.randint(0, args.users), random_vector(args.dims)) for _ in range(args.queries)]
+            seqscan = ("SET LOCAL enable_indexscan = off", "SET LOCAL enable_bitmapscan = off")
+
+            # Exact answers (sequential scan), used as ground truth for recall
+            old_latencies, exact = run_queries(conn, OLD_QUERY, queries, args.k, args.threshold, seqscan)
+            report("old query (seq scan)", old_latencies)
+
+            latencies, results = run_queries(conn, OLD_QUERY, queries, args.k, args.threshold)
+            report("old query (planner choice)", latencies, recall(results, exact))
+
+            # Index scans only: the planner would pick the user_id index for small users
+            hnsw_only = ("SET LOCAL enable_bitmapscan = off",)
+            for iterative_scan in args.iterative_scan:
+                scan_settings = hnsw_only
+                if iterative_scan != "off":
+                    scan_settings += (
+                        f"SET LOCAL hnsw.iterative_scan = {iterative_scan}",
+                        f"SET LOCAL hnsw.max_scan_tuples = {int(args.max_scan_tuples)}",
+                    )
+                for ef in args.ef_search:
+                    latencies, results = run_queries(
+                        conn, NEW_QUERY, queries, args.k, args.threshold,
+                        scan_settings + (f"SET LOCAL hnsw.ef_search = {int(ef)}",)
+                    )
+                    report(f"new query (ef={ef}, iterative={iterative_scan})", latencies, recall(results, exact))
+
+            # Whole-table nearest neighbours, where the HNSW index always applies
+            global_queries = [(None, embedding) for _, embedding in queries]
+            _, global_exact = run_queries(conn, GLOBAL_QUERY, global_queries, args.k, args.threshold, seqscan)
+            for ef in args.ef_search:
+                latencies, results = run_queries(
+                    conn, GLOBAL_QUERY, global_queries, args.k, args.threshold,
+                    (f"SET LOCAL hnsw.ef_search = {int(ef)}",)
+                )
+                report(f"all users, HNSW (ef_search={ef})", latencies, recall(results, global_exact))
+        finally:
+            if not args.keep:
+                conn.rollback()
+                conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+                conn.commit()
+
+
+if __name__ == "__main__":
+    main()
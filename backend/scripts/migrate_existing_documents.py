@@ -23,10 +23,12 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from sqlalchemy.orm import Session
 from loguru import logger
 
-from app.database import SessionLocal
+from app.models.database import SessionLocal
 from app.models.document import Document
 from app.services.pdf_conversion_service import PDFConversionService
 from app.services.filing_cabinet_service import FilingCabinetService
+from app.services.analysis_cache_service import AnalysisCacheService
+from app.services.document_processing_service import OCR_ENGINE, OCR_LANGUAGES
 
 
 async def migrate_document(
@@ -34,7 +36,8 @@ async def migrate_document(
     db: Session,
     pdf_service: PDFConversionService,
     filing_service: FilingCabinetService,
-    dry_run: bool = False
+    dry_run: bool = False,
+    analysis_cache: AnalysisCacheService = None
 ) -> bool:
     """
     Migrate a single document to filing cabinet structure.
@@ -45,6 +48,7 @@ async def migrate_document(
         pdf_service: PDF conversion service
         filing_service: Filing cabinet service
         dry_run: If True, only simulate the migration
+        analysis_cache: Optional cache of searchable PDFs by file hash
         
     Returns:
         True if migration successful, False otherwise
@@ -78,11 +82,18 @@ async def migrate_document(
                 temp_ocr_path = temp_ocr.name
             
             try:
-                success, ocr_pdf_path, error = await pdf_service.ensure_searchable_pdf(
-                    document.file_path,
-                    temp_ocr_path,
-                    languages=['fra', 'deu', 'eng']
-                )
+                # Reuse the searchable PDF of identical content when cached
+                entry = analysis_cache.lookup(db, document.file_hash) if analysis_cache else None
+                cached_pdf = analysis_cache.copy_cached_pdf(entry, temp_ocr_path) if entry else None
+                
+                if cached_pdf:
+                    success, ocr_pdf_path, error = True, cached_pdf, None
+                else:
+                    success, ocr_pdf_path, error = await pdf_service.ensure_searchable_pdf(
+                        document.file_path,
+                        temp_ocr_path,
+                        languages=OCR_LANGUAGES
+                    )
                 
                 if not success:
                     logger.warning(f"  OCR PDF creation failed: {error}")
@@ -168,6 +179,7 @@ async def main():
     # Initialize services
     pdf_service = PDFConversionService()
     filing_service = FilingCabinetService()
+    analysis_cache = AnalysisCacheService(OCR_ENGINE, OCR_LANGUAGES)
     
     # Get database session
     db = SessionLocal()
@@ -215,7 +227,8 @@ async def main():
                 db,
                 pdf_service,
                 filing_service,
-                dry_run=args.dry_run
+                dry_run=args.dry_run,
+                analysis_cache=analysis_cache
             )
             
             if success:
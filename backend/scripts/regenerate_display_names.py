@@ -5,17 +5,11 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import asyncio
 from sqlalchemy.orm import Session
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from app.models.database import SessionLocal
 from app.models.document import Document, DocumentStatus
 from app.agents.document_agent import DocumentAgent
-from app.config import settings
 from loguru import logger
 
-# Create session
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
 
 async def regenerate_display_names():
     """Regenerate display names for documents that don't have one."""
@@ -0,0 +1,96 @@
+"""Tests for batch processing in the document pipeline."""
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.models.document import ProcessingStage
+from app.services.document_processing_service import DocumentProcessingService, PipelineRun, PIPELINE_STAGES
+from app.services.embedding_service import EmbeddingRequestError
+
+
+@pytest.fixture
+def processing_service():
+    """DocumentProcessingService for a batch of documents 1 and 2, recording checkpoints and stages."""
+    service = DocumentProcessingService.__new__(DocumentProcessingService)
+    service.session_factory = MagicMock()
+    db = service.session_factory.return_value.__enter__.return_value
+    db.query.return_value.filter.return_value.order_by.return_value = [(1,), (2,)]
+
+    service.doc_service = SimpleNamespace(create_chunks=lambda text: [text])
+    service._start = lambda document_id: PipelineRun(
+        SimpleNamespace(id=document_id, user_id=3, extracted_text=f"Document {document_id}"), {}, PIPELINE_STAGES
+    )
+
+    service.checkpoints = []
+    service._checkpoint = lambda document, stage, state, writes: service.checkpoints.append((document.id, stage))
+
+    service.stages_run = []
+
+    async def run_stages(document, state, stages):
+        service.stages_run.append((document.id, stages))
+        return True
+    service._run_stages = run_stages
+    return service
+
+
+class TestProcessBatch:
+    """Test suite for DocumentProcessingService.process_batch."""
+
+    @pytest.mark.asyncio
+    async def test_failed_embedding_request_fails_only_its_documents(self, processing_service):
+        """Test that a failed embeddings request stops only the documents it carried."""
+        async def embed_documents(chunks):
+            rows = {1: [{'document_id': 1, 'chunk_index': 0}]}
+            raise EmbeddingRequestError("429 Too Many Requests", {2}, rows)
+        processing_service.embedding_service = SimpleNamespace(embed_documents=embed_documents)
+
+        with pytest.raises(RuntimeError, match="1 of 2 documents"):
+            await processing_service.process_batch(5)
+
+        assert processing_service.checkpoints == [(1, ProcessingStage.EMBEDDED)]
+        after_embedding = [
+            document_id for document_id, stages in processing_service.stages_run
+            if ProcessingStage.COMPLETED in stages
+        ]
+        assert after_embedding == [1]
+
+
+class TestDetectDuplicates:
+    """Test suite for DocumentProcessingService._detect_duplicates."""
+
+    @pytest.fixture
+    def service(self):
+        service = DocumentProcessingService.__new__(DocumentProcessingService)
+        service.session_factory = MagicMock()
+        service.minhash_service = SimpleNamespace(signature=lambda text: [1, 2, 3])
+        service.removed = []
+        service._remove_duplicate = lambda document, original_id: service.removed.append(original_id)
+        return service
+
+    @staticmethod
+    def detected(*result):
+        async def detect_duplicate(**kwargs):
+            return result
+        return SimpleNamespace(detect_duplicate=detect_duplicate)
+
+    @pytest.mark.asyncio
+    async def test_near_duplicate_is_flagged_and_kept(self, service):
+        """Test that a MinHash match, however high, only flags the document."""
+        service.duplicate_service = self.detected(True, 3, 0.97, "content_similarity")
+        document = SimpleNamespace(id=8, user_id=1, file_path="b.pdf", file_hash="ab", extracted_text="Facture")
+
+        assert await service._detect_duplicates(document, {}, [])
+
+        assert service.removed == []
+        assert (document.is_duplicate, document.duplicate_of_id, document.similarity_score) == (True, 3, 0.97)
+
+    @pytest.mark.asyncio
+    async def test_identical_file_is_removed(self, service):
+        """Test that a byte-identical file stops processing and is removed."""
+        service.duplicate_service = self.detected(True, 3, 1.0, "exact_hash")
+        document = SimpleNamespace(id=8, user_id=1, file_path="b.pdf", file_hash="ab", extracted_text="Facture")
+
+        assert not await service._detect_duplicates(document, {}, [])
+
+        assert service.removed == [3]
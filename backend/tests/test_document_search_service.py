@@ -0,0 +1,26 @@
+"""Tests for full-text search query building."""
+from app.services.document_search_service import DocumentSearchService
+
+
+class TestBuildTsquery:
+    """Test suite for DocumentSearchService.build_tsquery."""
+    
+    def test_last_word_is_prefix(self):
+        """Test search-as-you-type on the last word."""
+        assert DocumentSearchService.build_tsquery("Facture élec") == "'facture' & 'élec':*"
+    
+    def test_strips_tsquery_syntax(self):
+        """Test that operators and quotes in user input cannot break the query."""
+        assert DocumentSearchService.build_tsquery("impôts' | !2024 &") == "'impôts' & '2024':*"
+    
+    def test_no_words(self):
+        """Test that punctuation-only input gives an empty query."""
+        assert DocumentSearchService.build_tsquery("?! --") == ""
+
+
+class TestBuildLikePattern:
+    """Test suite for DocumentSearchService.build_like_pattern."""
+    
+    def test_escapes_wildcards(self):
+        """Test that % and _ are matched literally."""
+        assert DocumentSearchService.build_like_pattern(" 50%_off ") == "%50\\%\\_off%"
@@ -0,0 +1,61 @@
+"""Tests for streaming uploads to disk."""
+import hashlib
+import io
+
+import pytest
+
+from app.config import settings
+from app.services.document_service import DocumentService, FileTooLargeError
+
+
+class FakeUpload:
+    """In-memory upload with the async read() of UploadFile."""
+    
+    def __init__(self, content: bytes):
+        self.buffer = io.BytesIO(content)
+        self.reads = []
+    
+    async def read(self, size: int = -1) -> bytes:
+        chunk = self.buffer.read(size)
+        self.reads.append(len(chunk))
+        return chunk
+
+
+@pytest.fixture
+def doc_service(tmp_path, monkeypatch):
+    """DocumentService writing to a temporary directory in 1 KB chunks."""
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE_KB", 1)
+    return DocumentService()
+
+
+class TestSaveUpload:
+    """Test suite for DocumentService.save_upload."""
+    
+    @pytest.mark.asyncio
+    async def test_saves_and_hashes_in_chunks(self, doc_service):
+        """Test that the file is written and hashed chunk by chunk."""
+        content = b"facture " * 1000
+        upload = FakeUpload(content)
+        
+        file_path, saved_filename, file_size, file_hash = await doc_service.save_upload(
+            "facture.pdf", upload, max_size=len(content)
+        )
+        
+        assert saved_filename.endswith(".pdf")
+        assert file_size == len(content)
+        assert file_hash == hashlib.sha256(content).hexdigest()
+        with open(file_path, "rb") as f:
+            assert f.read() == content
+        assert max(upload.reads) == 1024
+    
+    @pytest.mark.asyncio
+    async def test_stops_at_size_limit(self, doc_service, tmp_path):
+        """Test that an oversized upload is cut off and nothing is kept."""
+        upload = FakeUpload(b"x" * 10 * 1024)
+        
+        with pytest.raises(FileTooLargeError):
+            await doc_service.save_upload("scan.jpg", upload, max_size=2 * 1024)
+        
+        assert len(upload.reads) == 3
+        assert list(tmp_path.iterdir()) == []
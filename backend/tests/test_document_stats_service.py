@@ -0,0 +1,49 @@
+"""Tests for per-user document counters."""
+from datetime import date
+from decimal import Decimal
+
+from app.models.document import DocumentType
+from app.services.document_stats_service import DocumentStatsService
+
+
+class TestContribution:
+    """Test suite for DocumentStatsService.contribution."""
+    
+    def test_full_document(self):
+        """Test the counters of an analyzed invoice."""
+        counters = DocumentStatsService.contribution({
+            'user_id': 1,
+            'document_type': DocumentType.INVOICE,
+            'deadline': date(2024, 3, 31),
+            'importance_score': 85.0,
+            'extracted_amount': Decimal('120.50')
+        })
+        
+        assert counters['total_documents'] == 1
+        assert counters['invoice_count'] == 1
+        assert counters['documents_with_deadline'] == 1
+        assert counters['high_importance_documents'] == 1
+        assert counters['importance_score_count'] == 1
+        assert counters['importance_score_sum'] == 85.0
+        assert counters['total_amount_extracted'] == Decimal('120.50')
+    
+    def test_unanalyzed_document(self):
+        """Test that a document without type or metadata counts as 'other' only."""
+        counters = DocumentStatsService.contribution({
+            'user_id': 1,
+            'document_type': None,
+            'deadline': None,
+            'importance_score': None,
+            'extracted_amount': None
+        })
+        
+        assert counters['total_documents'] == 1
+        assert counters['other_count'] == 1
+        assert counters['documents_with_deadline'] == 0
+        assert counters['importance_score_count'] == 0
+        assert counters['total_amount_extracted'] == 0
+    
+    def test_threshold_is_exclusive(self):
+        """Test that a score of exactly 80 is not high importance."""
+        counters = DocumentStatsService.contribution({'user_id': 1, 'importance_score': 80.0})
+        assert counters['high_importance_documents'] == 0
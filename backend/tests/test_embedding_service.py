@@ -0,0 +1,150 @@
+"""Tests for embedding batching and caching."""
+import pytest
+
+from app.services.embedding_service import EmbeddingService, EmbeddingRequestError
+from app.services.embedding_cache_service import EmbeddingCacheService
+
+
+@pytest.fixture
+def embedding_service():
+    """Create an EmbeddingService with estimated token counts."""
+    service = EmbeddingService()
+    service._encoding = None  # len(text) // 3 + 1 tokens
+    return service
+
+
+class TestMakeBatches:
+    """Test suite for EmbeddingService.make_batches."""
+    
+    def test_splits_on_batch_size(self, embedding_service):
+        """Test that batches hold at most batch_size texts."""
+        embedding_service.batch_size = 2
+        embedding_service.batch_max_tokens = 10000
+        items = [(i, "texte") for i in range(5)]
+        
+        batches = embedding_service.make_batches(items)
+        
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert [item for batch in batches for item in batch] == items
+    
+    def test_splits_on_token_limit(self, embedding_service):
+        """Test that a batch never exceeds the token budget."""
+        embedding_service.batch_size = 100
+        embedding_service.batch_max_tokens = 25
+        items = [(i, "x" * 30) for i in range(4)]  # 11 tokens each
+        
+        batches = embedding_service.make_batches(items)
+        
+        assert [len(batch) for batch in batches] == [2, 2]
+    
+    def test_oversized_text_gets_own_batch(self, embedding_service):
+        """Test that a text above the budget is still sent, alone."""
+        embedding_service.batch_size = 100
+        embedding_service.batch_max_tokens = 10
+        items = [(0, "court"), (1, "x" * 300), (2, "court")]
+        
+        batches = embedding_service.make_batches(items)
+        
+        assert [[idx for idx, _ in batch] for batch in batches] == [[0], [1], [2]]
+    
+    def test_empty_input(self, embedding_service):
+        """Test that no items give no batches."""
+        assert embedding_service.make_batches([]) == []
+
+
+class TestEmbeddingCache:
+    """Test suite for EmbeddingCacheService keys and memory tier."""
+    
+    def test_hash_ignores_whitespace_differences(self):
+        """Test that copies differing only in whitespace share a key."""
+        a = EmbeddingCacheService.text_hash("Conditions générales\n\nd'assurance ")
+        b = EmbeddingCacheService.text_hash("  Conditions   générales d'assurance")
+        assert a == b
+    
+    def test_hash_keeps_content_differences(self):
+        """Test that different texts get different keys."""
+        a = EmbeddingCacheService.text_hash("Facture 2023")
+        b = EmbeddingCacheService.text_hash("Facture 2024")
+        assert a != b
+    
+    def test_memory_tier_evicts_least_recently_used(self):
+        """Test LRU eviction in the in-process tier."""
+        cache = EmbeddingCacheService("test-model")
+        cache.memory_size = 2
+        EmbeddingCacheService._memory.clear()
+        
+        cache._remember({"a": [1.0], "b": [2.0]})
+        cache._remember({"a": [1.0]})  # Touch "a"
+        cache._remember({"c": [3.0]})
+        
+        keys = [text_hash for _, text_hash in EmbeddingCacheService._memory]
+        assert keys == ["a", "c"]
+        EmbeddingCacheService._memory.clear()
+
+
+class TestEmbedChunks:
+    """Test suite for embedding chunks without a database session."""
+    
+    @pytest.mark.asyncio
+    async def test_cached_chunks_need_no_request(self, embedding_service):
+        """Test that chunks found in the cache become rows without an API request."""
+        EmbeddingCacheService._memory.clear()
+        embedding_service.cache._remember({
+            embedding_service.cache.text_hash("Facture 2024"): [0.5, 0.5]
+        })
+        
+        async def fail(texts):
+            raise AssertionError("embeddings API called")
+        embedding_service.create_embedding_batch = fail
+        
+        rows = await embedding_service.embed_chunks(7, ["Facture 2024", "  ", "Facture  2024"], user_id=3)
+        
+        assert [(row['chunk_index'], row['embedding']) for row in rows] == [(0, [0.5, 0.5]), (2, [0.5, 0.5])]
+        assert all(row['document_id'] == 7 and row['user_id'] == 3 for row in rows)
+        EmbeddingCacheService._memory.clear()
+    
+    @pytest.mark.asyncio
+    async def test_documents_share_requests(self, embedding_service):
+        """Test that chunks of several documents are embedded in shared requests, once per text."""
+        embedding_service.cache.enabled = False
+        requests = []
+        
+        async def embed(texts):
+            requests.append(texts)
+            return [[float(len(text))] for text in texts]
+        embedding_service.create_embedding_batch = embed
+        
+        rows = await embedding_service.embed_documents({
+            1: (["Conditions générales", "Facture janvier"], 3),
+            2: (["Conditions générales", "Facture février"], 3),
+        })
+        
+        assert len(requests) == 1
+        assert sorted(requests[0]) == ["Conditions générales", "Facture février", "Facture janvier"]
+        assert [row['content'] for row in rows[2]] == ["Conditions générales", "Facture février"]
+        assert rows[1][0]['embedding'] == rows[2][0]['embedding']
+    
+    @pytest.mark.asyncio
+    async def test_failed_request_raises_after_caching_others(self, embedding_service):
+        """Test that a failed request raises for its documents once the other embeddings are cached."""
+        embedding_service.cache.enabled = False
+        embedding_service.batch_size = 1
+        cached = {}
+        embedding_service.cache.put_many = lambda embeddings, db=None: cached.update(embeddings)
+        
+        async def embed(texts):
+            if texts == ["Facture février"]:
+                raise RuntimeError("429 Too Many Requests")
+            return [[1.0] for _ in texts]
+        embedding_service.create_embedding_batch = embed
+        
+        with pytest.raises(EmbeddingRequestError) as error:
+            await embedding_service.embed_documents({
+                1: (["Facture janvier"], 3),
+                2: (["Conditions générales", "Facture février"], 3),
+            })
+        
+        assert error.value.failed_documents == {2}
+        assert [row['content'] for row in error.value.rows[1]] == ["Facture janvier"]
+        assert 2 not in error.value.rows
+        assert len(cached) == 2  # "Facture janvier" and "Conditions générales"
@@ -0,0 +1,42 @@
+"""Tests for MinHash near-duplicate signatures."""
+import random
+
+import pytest
+
+from app.services.minhash_service import MinHashService, NUM_PERMUTATIONS, NUM_BANDS
+
+
+@pytest.fixture
+def text():
+    """Letter-length text of random words."""
+    rng = random.Random(7)
+    return " ".join("".join(rng.choice("abcdefghijklmnop") for _ in range(6)) for _ in range(600))
+
+
+class TestMinHash:
+    """Test suite for MinHashService."""
+    
+    def test_rescanned_copy_is_near_duplicate(self, text):
+        """Test that a different header and layout keep the copy a candidate with high similarity."""
+        service = MinHashService()
+        original = service.signature(text)
+        rescan = service.signature("COPIE - Reçu le 12.03.2024\n\n" + text.replace(" ", "  \n", 50).upper())
+        
+        assert len(original) == NUM_PERMUTATIONS
+        assert service.similarity(original, rescan) >= 0.85
+        assert set(service.band_hashes(original)) & set(service.band_hashes(rescan))
+    
+    def test_different_text_is_not_candidate(self, text):
+        """Test that an unrelated text shares no band."""
+        service = MinHashService()
+        words = text.split()
+        other = service.signature(" ".join(reversed(words[:300])) + " facture electricite")
+        original = service.signature(text)
+        
+        assert service.similarity(original, other) < 0.5
+        assert len(service.band_hashes(original)) == NUM_BANDS
+        assert not set(service.band_hashes(original)) & set(service.band_hashes(other))
+    
+    def test_short_text_has_no_signature(self):
+        """Test that too little text gives no signature."""
+        assert MinHashService().signature("Total CHF 42.00") is None
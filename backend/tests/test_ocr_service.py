@@ -0,0 +1,61 @@
+"""Tests for OCR service helpers."""
+import pytest
+
+from app.services.ocr_service import _words_from_tesseract_data
+
+
+def make_tesseract_data(rows):
+    """Build an image_to_data style dict from (page, block, par, line, text, conf) rows."""
+    data = {key: [] for key in (
+        'page_num', 'block_num', 'par_num', 'line_num', 'text', 'conf',
+        'left', 'top', 'width', 'height'
+    )}
+    for i, (page, block, par, line, text, conf) in enumerate(rows):
+        data['page_num'].append(page)
+        data['block_num'].append(block)
+        data['par_num'].append(par)
+        data['line_num'].append(line)
+        data['text'].append(text)
+        data['conf'].append(conf)
+        data['left'].append(10 * i)
+        data['top'].append(5 * line)
+        data['width'].append(40)
+        data['height'].append(12)
+    return data
+
+
+class TestTesseractData:
+    """Test suite for rebuilding OCR output from image_to_data."""
+    
+    def test_rebuilds_lines_and_paragraphs(self):
+        """Test words are joined per line and paragraphs separated by a blank line."""
+        data = make_tesseract_data([
+            (1, 1, 1, 0, '', '-1'),  # Block header row without text
+            (1, 1, 1, 1, 'Facture', '96'),
+            (1, 1, 1, 1, 'No', '90'),
+            (1, 1, 1, 2, '2024-001', '88'),
+            (1, 2, 1, 1, 'Total', '94'),
+        ])
+        text, words, confidence = _words_from_tesseract_data(data)
+        
+        assert text == "Facture No\n2024-001\n\nTotal"
+        assert len(words) == 4
+        assert confidence == pytest.approx((96 + 90 + 88 + 94) / 4 / 100)
+    
+    def test_keeps_word_boxes(self):
+        """Test word boxes carry position and confidence."""
+        data = make_tesseract_data([(1, 1, 1, 1, 'CHF', 91.5)])
+        _, words, _ = _words_from_tesseract_data(data)
+        
+        assert words[0]['text'] == 'CHF'
+        assert words[0]['conf'] == 91.5
+        assert (words[0]['left'], words[0]['top'], words[0]['width'], words[0]['height']) == (0, 5, 40, 12)
+    
+    def test_empty_result(self):
+        """Test image without recognized words."""
+        data = make_tesseract_data([(1, 1, 1, 0, '', -1), (1, 1, 1, 1, '  ', 0)])
+        text, words, confidence = _words_from_tesseract_data(data)
+        
+        assert text == ""
+        assert words == []
+        assert confidence == 0.0
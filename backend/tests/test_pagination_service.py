@@ -0,0 +1,46 @@
+"""Tests for keyset pagination cursors."""
+from datetime import date, datetime
+
+import pytest
+
+from app.services.pagination_service import (
+    PaginationService, NEWEST_FIRST, MOST_IMPORTANT_FIRST, CLOSEST_DEADLINE_FIRST
+)
+
+
+class TestCursor:
+    """Test suite for PaginationService cursor encoding."""
+    
+    def test_round_trip(self):
+        """Test that key values survive encoding with their types."""
+        values = [datetime(2024, 5, 17, 9, 30, 12, 123456), 42]
+        cursor = PaginationService.encode_cursor(NEWEST_FIRST, values)
+        
+        assert PaginationService.decode_cursor(NEWEST_FIRST, cursor) == values
+    
+    def test_round_trip_date_and_score(self):
+        """Test dates and float scores."""
+        assert PaginationService.decode_cursor(
+            CLOSEST_DEADLINE_FIRST,
+            PaginationService.encode_cursor(CLOSEST_DEADLINE_FIRST, [date(2024, 12, 31), 7])
+        ) == [date(2024, 12, 31), 7]
+        
+        values = [87.5, datetime(2024, 1, 1), 3]
+        cursor = PaginationService.encode_cursor(MOST_IMPORTANT_FIRST, values)
+        assert PaginationService.decode_cursor(MOST_IMPORTANT_FIRST, cursor) == values
+    
+    def test_is_url_safe(self):
+        """Test that cursors can be passed as query parameters as-is."""
+        cursor = PaginationService.encode_cursor(NEWEST_FIRST, [datetime(2024, 5, 17), 1])
+        assert all(c.isalnum() or c in "-_" for c in cursor)
+    
+    def test_rejects_cursor_of_other_listing(self):
+        """Test that a cursor only works with the sort order it was made for."""
+        cursor = PaginationService.encode_cursor(NEWEST_FIRST, [datetime(2024, 5, 17), 1])
+        with pytest.raises(ValueError):
+            PaginationService.decode_cursor(CLOSEST_DEADLINE_FIRST, cursor)
+    
+    def test_rejects_garbage(self):
+        """Test that malformed cursors raise ValueError."""
+        with pytest.raises(ValueError):
+            PaginationService.decode_cursor(NEWEST_FIRST, "not-a-cursor")
@@ -0,0 +1,64 @@
+"""Tests for processing progress events."""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.document import DocumentStatus, ProcessingStage
+from app.services import progress_service
+from app.services.progress_service import ProgressBroker, progress_event, is_final
+
+
+def notify(broker: ProgressBroker, **event):
+    """Deliver a notification as the LISTEN connection would."""
+    broker._dispatch(None, 0, progress_service.PROGRESS_CHANNEL, json.dumps(event))
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    """ProgressBroker without a database connection."""
+    async def listening(self):
+        pass
+    monkeypatch.setattr(ProgressBroker, "ensure_listening", listening)
+    return ProgressBroker()
+
+
+class TestProgressEvents:
+    """Test suite for progress events and their fan-out."""
+
+    def test_event_of_checkpointed_stage(self):
+        """Test the payload published by a stage checkpoint."""
+        document = SimpleNamespace(
+            id=7, user_id=1, batch_id=None,
+            status=DocumentStatus.PROCESSING, processing_stage=ProcessingStage.EMBEDDED.value
+        )
+        event = progress_event(document)
+
+        assert event["event"] == "embedded"
+        assert event["status"] == "processing"
+        assert 0 < event["progress"] < 1
+        assert not is_final(event)
+        assert is_final(progress_event(document, progress_service.REMOVED_EVENT))
+
+    @pytest.mark.asyncio
+    async def test_events_reach_subscribers_of_their_user(self, broker):
+        """Test that each stream receives only its user's events."""
+        async with broker.subscribe(1) as first, broker.subscribe(2) as second:
+            notify(broker, user_id=1, document_id=7, event="hashed")
+            notify(broker, user_id=3, document_id=9, event="hashed")
+
+            assert first.get_nowait()["document_id"] == 7
+            assert first.empty()
+            assert second.empty()
+
+        assert not broker._subscribers
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_keeps_latest_events(self, broker, monkeypatch):
+        """Test that a full queue drops its oldest event."""
+        monkeypatch.setattr(progress_service, "SUBSCRIBER_QUEUE_SIZE", 2)
+        async with broker.subscribe(1) as queue:
+            for document_id in (1, 2, 3):
+                notify(broker, user_id=1, document_id=document_id, event="hashed")
+
+            assert [queue.get_nowait()["document_id"] for _ in range(2)] == [2, 3]
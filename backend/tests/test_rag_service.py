@@ -0,0 +1,100 @@
+"""Tests for hybrid retrieval fusion and vector search."""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.config import settings
+from app.services.rag_service import RAGService, VECTOR_SQL
+
+
+def chunk(chunk_id, similarity=None):
+    """Minimal search result for a chunk."""
+    return {"chunk_id": chunk_id, "content": f"chunk {chunk_id}", "similarity": similarity}
+
+
+class TestFuseResults:
+    """Test suite for RAGService.fuse_results (reciprocal-rank fusion)."""
+    
+    def test_chunks_found_by_both_modes_come_first(self):
+        """Test that agreement between modes wins over a single first place."""
+        vector = [chunk(1, 0.9), chunk(2, 0.8)]
+        lexical = [chunk(3), chunk(2)]
+        
+        fused = RAGService.fuse_results(vector, lexical, max_results=3, k=60)
+        
+        assert [result["chunk_id"] for result in fused] == [2, 1, 3]
+        assert fused[0]["vector_rank"] == 2
+        assert fused[0]["lexical_rank"] == 2
+        assert fused[0]["rrf_score"] == 1 / 62 + 1 / 62
+    
+    def test_keeps_vector_similarity(self):
+        """Test that lexical-first chunks still report their vector similarity."""
+        fused = RAGService.fuse_results([chunk(5, 0.75)], [chunk(5)], max_results=5, k=60)
+        
+        assert fused[0]["similarity"] == 0.75
+        
+        fused = RAGService.fuse_results([], [chunk(7)], max_results=5, k=60)
+        assert fused[0]["similarity"] is None
+        assert fused[0]["vector_rank"] is None
+    
+    def test_truncates_to_max_results(self):
+        """Test that only max_results chunks are returned."""
+        vector = [chunk(i, 0.9) for i in range(10)]
+        
+        fused = RAGService.fuse_results(vector, [], max_results=3, k=60)
+        
+        assert [result["chunk_id"] for result in fused] == [0, 1, 2]
+
+
+
+class TestVectorSearch:
+    """Test suite for the HNSW settings of RAGService vector search."""
+
+    @pytest.fixture
+    def rag_service(self, monkeypatch):
+        monkeypatch.setattr(RAGService, "_iterative_scan_supported", None)
+        service = RAGService.__new__(RAGService)
+        service.embedding_service = SimpleNamespace(create_embedding=AsyncMock(return_value=[0.1, 0.2]))
+        return service
+
+    @staticmethod
+    def database(pgvector_version):
+        """Async session mock reporting the installed pgvector version."""
+        db = AsyncMock()
+        db.execute.return_value = MagicMock(
+            fetchall=MagicMock(return_value=[]),
+            scalar=MagicMock(return_value=pgvector_version)
+        )
+        return db
+
+    @staticmethod
+    def settings_sent(db):
+        statements = [str(call.args[0]) for call in db.execute.await_args_list]
+        assert statements[-1] == str(VECTOR_SQL)
+        return any("hnsw.iterative_scan" in statement for statement in statements)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("iterative_scan", ["relaxed_order", "off"])
+    async def test_iterative_scan_setting(self, rag_service, monkeypatch, iterative_scan):
+        """Test that the per-user filter gets an iterative HNSW scan unless disabled."""
+        monkeypatch.setattr(settings, "RAG_HNSW_ITERATIVE_SCAN", iterative_scan)
+        db = self.database("0.8.0")
+
+        await rag_service._vector_search("invoice", 3, db, 5, 0.7, {})
+
+        assert self.settings_sent(db) == (iterative_scan != "off")
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("pgvector_version", ["0.5.1", "0.7.4", None])
+    async def test_iterative_scan_skipped_on_old_pgvector(self, rag_service, monkeypatch, pgvector_version):
+        """Test that pgvector before 0.8 (which rejects the settings) is searched without them, checked once."""
+        monkeypatch.setattr(settings, "RAG_HNSW_ITERATIVE_SCAN", "relaxed_order")
+        db = self.database(pgvector_version)
+
+        await rag_service._vector_search("invoice", 3, db, 5, 0.7, {})
+        await rag_service._vector_search("bail", 3, db, 5, 0.7, {})
+
+        assert not self.settings_sent(db)
+        statements = [str(call.args[0]) for call in db.execute.await_args_list]
+        assert sum("pg_extension" in statement for statement in statements) == 1
@@ -0,0 +1,96 @@
+"""Tests for resumable uploads."""
+import hashlib
+
+import pytest
+
+from app.config import settings
+from app.services.document_service import FileTooLargeError
+from app.services.upload_session_service import UploadSessionService, UploadConflictError
+
+CONTENT = b"%PDF-1.7 contrat de bail " * 400
+
+
+async def stream(*chunks):
+    """Async iterator over chunks, like Request.stream()."""
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.fixture
+def upload_service(tmp_path, monkeypatch):
+    """UploadSessionService writing to a temporary directory."""
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    UploadSessionService._hashes.clear()
+    return UploadSessionService()
+
+
+@pytest.fixture
+def upload(upload_service):
+    """Upload session for CONTENT."""
+    return upload_service.new_session(1, "bail.pdf", len(CONTENT), mime_type="application/pdf")
+
+
+class TestResumableUpload:
+    """Test suite for UploadSessionService."""
+    
+    @pytest.mark.asyncio
+    async def test_parts_are_appended_and_hashed(self, upload_service, upload):
+        """Test that consecutive parts produce the file and its SHA-256."""
+        offset = await upload_service.append_part(upload, 0, stream(CONTENT[:4000], CONTENT[4000:6000]))
+        offset = await upload_service.append_part(upload, offset, stream(CONTENT[6000:]))
+        
+        file_path, saved_filename, file_size, file_hash = upload_service.complete(upload)
+        
+        assert offset == file_size == len(CONTENT)
+        assert saved_filename.endswith(".pdf")
+        assert file_hash == hashlib.sha256(CONTENT).hexdigest()
+        with open(file_path, "rb") as f:
+            assert f.read() == CONTENT
+        assert not upload_service.part_path(upload.id).exists()
+    
+    @pytest.mark.asyncio
+    async def test_part_must_start_at_offset(self, upload_service, upload):
+        """Test that a resent or skipped range is refused with the current offset."""
+        await upload_service.append_part(upload, 0, stream(CONTENT[:1000]))
+        
+        with pytest.raises(UploadConflictError) as error:
+            await upload_service.append_part(upload, 0, stream(CONTENT[:1000]))
+        
+        assert error.value.offset == 1000
+        assert upload_service.get_offset(upload.id) == 1000
+    
+    @pytest.mark.asyncio
+    async def test_dropped_connection_keeps_received_bytes(self, upload_service, upload):
+        """Test resuming after a part was cut off, with the hash rebuilt from the file."""
+        async def dropped():
+            yield CONTENT[:3000]
+            raise ConnectionError("client disconnected")
+        
+        with pytest.raises(ConnectionError):
+            await upload_service.append_part(upload, 0, dropped())
+        UploadSessionService._hashes.clear()  # Next parts handled by another process
+        
+        await upload_service.append_part(upload, upload_service.get_offset(upload.id), stream(CONTENT[3000:]))
+        
+        assert upload_service.complete(upload)[3] == hashlib.sha256(CONTENT).hexdigest()
+    
+    @pytest.mark.asyncio
+    async def test_incomplete_or_oversized(self, upload_service, upload):
+        """Test that completion needs every byte and parts cannot go past the size."""
+        await upload_service.append_part(upload, 0, stream(CONTENT[:-10]))
+        
+        with pytest.raises(UploadConflictError):
+            upload_service.complete(upload)
+        with pytest.raises(FileTooLargeError):
+            await upload_service.append_part(upload, len(CONTENT) - 10, stream(b"x" * 11))
+
+    @pytest.mark.asyncio
+    async def test_restored_upload_can_be_completed_again(self, upload_service, upload):
+        """Test that a completed upload moved back (failed commit) completes again."""
+        await upload_service.append_part(upload, 0, stream(CONTENT))
+        file_path = upload_service.complete(upload)[0]
+        
+        upload_service.restore(upload.id, file_path)
+        
+        assert upload_service.get_offset(upload.id) == len(CONTENT)
+        assert upload_service.complete(upload)[3] == hashlib.sha256(CONTENT).hexdigest()
@@ -0,0 +1,45 @@
+"""Tests for the document processing worker."""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from app import worker as worker_module
+from app.worker import DocumentWorker
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    """DocumentWorker with a fast heartbeat and a queue that reports the lease as lost."""
+    monkeypatch.setattr(worker_module, "SessionLocal", MagicMock())
+    document_worker = DocumentWorker(concurrency=1)
+    document_worker.heartbeat_interval = 0.01
+    document_worker.queue = MagicMock()
+    document_worker.queue.heartbeat.return_value = False
+    return document_worker
+
+
+class TestDocumentWorker:
+    """Test suite for DocumentWorker job runs."""
+
+    @pytest.mark.asyncio
+    async def test_lost_lease_cancels_job(self, worker, monkeypatch):
+        """Test that a job whose lease was lost is cancelled and not settled."""
+        cancelled = asyncio.Event()
+
+        class ProcessingService:
+            async def process_document(self, document_id):
+                try:
+                    await asyncio.sleep(60)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+        monkeypatch.setattr(worker_module, "DocumentProcessingService", ProcessingService)
+
+        job = SimpleNamespace(id=4, batch_id=None, document_id=7, attempts=1)
+        await asyncio.wait_for(worker._run_job(job), timeout=5)
+
+        assert cancelled.is_set()
+        worker.queue.mark_completed.assert_not_called()
+        worker.queue.mark_failed.assert_not_called()
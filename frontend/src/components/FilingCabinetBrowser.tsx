@@ -96,11 +96,11 @@ export function FilingCabinetBrowser() {
     queryFn: getAllCategories,
   });
 
-  // Fetch search results
+  // Fetch search results (full-text search on the server; lists do not include the extracted text)
   const { data: searchResults, isLoading: isSearching } = useQuery<Document[]>({
     queryKey: ["search-documents", searchQuery],
     queryFn: () => searchDocuments(searchQuery),
-    enabled: searchMode === "global" && searchQuery.length >= 2,
+    enabled: searchQuery.length >= 2,
   });
 
   // Update category mutation
@@ -124,9 +124,10 @@ export function FilingCabinetBrowser() {
     // Local search filter
     if (searchMode === "local" && searchQuery) {
       const query = searchQuery.toLowerCase();
+      const textMatches = new Set((searchResults || []).map(doc => doc.id));
       docs = docs.filter(doc => {
         const matchesName = (doc.display_name || doc.original_filename).toLowerCase().includes(query);
-        const matchesText = doc.extracted_text?.toLowerCase().includes(query);
+        const matchesText = textMatches.has(doc.id);
         return matchesName || matchesText;
       });
     }